@@ -29,6 +29,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "blog.middleware.StaticFilesMiddleware",
+    "blog.middleware.LoadSheddingMiddleware",
+    "blog.middleware.PublicProfileMiddleware",
+    "blog.middleware.ServerTimingMiddleware",
+    "blog.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -38,6 +43,32 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Public read-only serving profile (blog.middleware.PublicProfileMiddleware)
+# GET/HEAD requests to these URL names run PUBLIC_MIDDLEWARE instead of the
+# rest of MIDDLEWARE: no session, CSRF, auth or messages middleware, so the
+# responses set no cookies and can be stored by shared caches and CDNs.
+
+PUBLIC_URL_NAMES = [
+    "article_list",
+    "article_detail",
+    "article_archive_year",
+    "article_archive_month",
+    "author_detail",
+    "tag_detail",
+]
+
+PUBLIC_MIDDLEWARE = [
+    "blog.middleware.ServerTimingMiddleware",
+    "blog.middleware.ProfilingMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",
+    "blog.middleware.PublicCacheControlMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+PUBLIC_CACHE_MAX_AGE = 300
+
 ROOT_URLCONF = "app.urls"
 
 TEMPLATES = [
@@ -59,6 +90,57 @@ TEMPLATES = [
 WSGI_APPLICATION = "app.wsgi.application"
 
 
+# Request instrumentation (blog.middleware.ServerTimingMiddleware)
+# Aggregated metrics are served in the Prometheus text format at /metrics.
+# Every worker process writes its metrics to METRICS_DIR at most every
+# METRICS_FLUSH_INTERVAL seconds, and /metrics adds up those of all workers.
+
+SERVER_TIMING_HEADER = True
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_DIR = BASE_DIR / "metrics"
+METRICS_FLUSH_INTERVAL = 1.0
+
+
+# Load shedding (blog.middleware.LoadSheddingMiddleware)
+# Requests run in the pool of the first LOAD_SHEDDING_ROUTES rule matching
+# their view name (a pattern) and method (None for any). Each pool admits
+# `limit` concurrent requests across all the worker processes sharing
+# LOAD_SHEDDING_DIR; up to `max_queue` more wait up to `queue_timeout` seconds
+# for a slot, and the rest get a 503 with a `retry_after` seconds Retry-After
+# header. Counters are served at /metrics.
+
+LOAD_SHEDDING_ENABLED = True
+LOAD_SHEDDING_DIR = BASE_DIR / "shedding"
+LOAD_SHEDDING_POOLS = {
+    "reads": {"limit": 32, "max_queue": 64, "queue_timeout": 2.0, "retry_after": 1},
+    "writes": {"limit": 2, "max_queue": 4, "queue_timeout": 0.5, "retry_after": 5},
+    "admin": {"limit": 4, "max_queue": 8, "queue_timeout": 5.0, "retry_after": 5},
+    "default": {"limit": 8, "max_queue": 16, "queue_timeout": 1.0, "retry_after": 2},
+}
+LOAD_SHEDDING_ROUTES = [
+    ("admin:*", None, "admin"),
+    ("contact_form", ("POST",), "writes"),
+    ("comment_form", ("POST",), "writes"),
+    ("article_*", ("GET", "HEAD"), "reads"),
+    ("author_detail", ("GET", "HEAD"), "reads"),
+    ("tag_detail", ("GET", "HEAD"), "reads"),
+]
+LOAD_SHEDDING_DEFAULT_POOL = "default"
+
+
+# Sampled request profiling (blog.middleware.ProfilingMiddleware)
+# PROFILING_SAMPLE_RATE profiles that fraction of requests; setting
+# PROFILING_SLOW_THRESHOLD (seconds) profiles every request and keeps the slow
+# ones. Summarize the dumps with `manage.py profile_summary`.
+
+PROFILING_ENABLED = False
+PROFILING_SAMPLE_RATE = 0.01
+PROFILING_SLOW_THRESHOLD = None
+PROFILING_DIR = BASE_DIR / "profiles"
+PROFILING_MAX_DUMPS = 200
+PROFILING_MAX_QUERIES = 500
+
+
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
@@ -70,6 +152,46 @@ DATABASES = {
 }
 
 
+# Cache
+# The memory-mapped cache is shared by all worker processes on the machine, so
+# an article saved in one process invalidates the cached pages of all of them.
+
+CACHES = {
+    "default": {
+        "BACKEND": "blog.mmap_cache.MmapCache",
+        "LOCATION": BASE_DIR / "cache.mmap",
+        "OPTIONS": {"SIZE": 64 * 1024 * 1024},
+    }
+}
+
+# The tests run with scratch caches in a temporary directory instead.
+TEST_RUNNER = "blog.runner.TestRunner"
+
+PAGE_CACHE_ALIAS = "default"
+# Set to False to render every page, e.g. to benchmark the views themselves.
+PAGE_CACHE_ENABLED = True
+# Pages are fresh for PAGE_CACHE_TIMEOUT seconds, then served stale for up to
+# PAGE_CACHE_STALE_TIMEOUT more seconds while a single request regenerates them.
+PAGE_CACHE_TIMEOUT = 600
+PAGE_CACHE_STALE_TIMEOUT = 86400
+# A request regenerating a page holds its lock for up to PAGE_CACHE_LOCK_TIMEOUT
+# seconds; requests without any copy to serve wait up to PAGE_CACHE_LOCK_WAIT
+# seconds for the page before getting a 503.
+PAGE_CACHE_LOCK_TIMEOUT = 30
+PAGE_CACHE_LOCK_WAIT = 10.0
+# zlib level cached pages are compressed with, once, when they are stored.
+PAGE_CACHE_COMPRESS_LEVEL = 6
+
+# Comments are shown only once approved in the admin, like contact requests
+# are reviewed there. Set to False to show new comments right away.
+COMMENTS_REQUIRE_APPROVAL = True
+# Number of comments per page of an article's discussion.
+COMMENTS_PER_PAGE = 100
+
+# Number of tags shown in the tag cloud, the ones with the most articles.
+TAG_CLOUD_SIZE = 50
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -105,6 +227,19 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic fingerprints the assets and writes a gzipped copy of the text
+# ones; blog.middleware.StaticFilesMiddleware serves them from STATIC_ROOT with
+# immutable caching. Files not in the manifest are cached for
+# STATIC_CACHE_MAX_AGE seconds.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "blog.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+STATIC_CACHE_MAX_AGE = 60
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -119,3 +254,17 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = "your_email@gmail.com"
 EMAIL_HOST_PASSWORD = "your_email_password"
+
+
+# Contact request notifications (blog.notifications)
+# "immediate" mails every contact request as it is submitted; "digest" mails
+# them together once CONTACT_DIGEST_SIZE are pending or the oldest has waited
+# CONTACT_DIGEST_INTERVAL seconds; run `manage.py send_contact_digest`
+# periodically as well. Requests matching a (field, regular expression) rule
+# of CONTACT_URGENT_RULES are always mailed right away.
+CONTACT_NOTIFICATION_MODE = "immediate"
+CONTACT_DIGEST_SIZE = 50
+CONTACT_DIGEST_INTERVAL = 900
+CONTACT_URGENT_RULES = [
+    ("content", r"(?i)\b(urgent|security|vulnerability|outage)\b"),
+]
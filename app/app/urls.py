@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from blog.views import MetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("blog/", include("blog.urls")),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
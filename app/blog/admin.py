@@ -1,18 +1,225 @@
-from django.contrib import admin
-from .models import Article, ContactRequest
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Length
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .caching import invalidate_pages_on_commit
+from .forms import AddTagsForm
+from .models import Article, Comment, ContactRequest, Tag
+from .revisions import unified_diff
 
 
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
-    list_display = ("title", "author", "publication_datetime", "is_online")
-    list_filter = ("is_online",)
+    list_display = (
+        "title",
+        "author",
+        "publication_datetime",
+        "modified_datetime",
+        "is_online",
+        "publish_at",
+        "unpublish_at",
+    )
+    list_filter = ("is_online", "tags")
     search_fields = ("title", "author__username")
+    filter_horizontal = ("tags",)
+    actions = ["add_tags"]
+
+    @admin.action(description="Add tags to selected articles", permissions=["change"])
+    def add_tags(self, request, queryset):
+        """
+        Asks for tags and adds them to the selected articles in bulk.
+        """
+        form = AddTagsForm(request.POST if "apply" in request.POST else None)
+        if form.is_valid():
+            created = queryset.add_tags(form.cleaned_data["tags"])
+            invalidate_pages_on_commit()
+            self.message_user(
+                request, f"Added {created} tag(s) to articles.", messages.SUCCESS
+            )
+            return None
+        return TemplateResponse(
+            request,
+            "admin/blog/article/add_tags.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": "Add tags to selected articles",
+                "opts": self.model._meta,
+                "form": form,
+                "selected": list(queryset.values_list("pk", flat=True)),
+                "action_checkbox_name": admin.helpers.ACTION_CHECKBOX_NAME,
+            },
+        )
+
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path(
+                "<path:object_id>/revisions/",
+                self.admin_site.admin_view(self.revisions_view),
+                name="%s_%s_revisions" % info,
+            ),
+            path(
+                "<path:object_id>/revisions/<int:number>/",
+                self.admin_site.admin_view(self.revision_diff_view),
+                name="%s_%s_revision_diff" % info,
+            ),
+        ] + super().get_urls()
+
+    def get_revision_article(self, request, object_id):
+        """
+        Returns the article whose revisions are shown, checking that the user
+        may view it.
+        """
+        article = self.get_object(request, object_id)
+        if article is None:
+            raise Http404("The article does not exist.")
+        if not self.has_view_or_change_permission(request, article):
+            raise PermissionDenied
+        return article
+
+    def revisions_view(self, request, object_id):
+        """
+        Lists the revisions of an article, with how much space each one takes.
+        """
+        article = self.get_revision_article(request, object_id)
+        revisions = (
+            article.revisions.defer("data")
+            .annotate(stored_size=Length("data"))
+            .order_by("-number")
+        )
+        return TemplateResponse(
+            request,
+            "admin/blog/article/revisions.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": f"Revisions of {article}",
+                "opts": self.opts,
+                "original": article,
+                "revisions": revisions,
+            },
+        )
+
+    def revision_diff_view(self, request, object_id, number):
+        """
+        Shows the changes between a revision and an earlier one, by default
+        the previous revision.
+        """
+        article = self.get_revision_article(request, object_id)
+        revision = get_object_or_404(article.revisions, number=number)
+        try:
+            against = int(request.GET.get("against", number - 1))
+        except ValueError:
+            raise Http404("Invalid revision number.")
+        old_title, old_content, old_name = "", "", "/dev/null"
+        if against:
+            previous = get_object_or_404(article.revisions, number=against)
+            old_title, old_content = previous.title, previous.get_content()
+            old_name = f"revision {against}"
+        return TemplateResponse(
+            request,
+            "admin/blog/article/revision_diff.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": f"Changes in revision {number} of {article}",
+                "opts": self.opts,
+                "original": article,
+                "revision": revision,
+                "against": against,
+                "old_title": old_title,
+                "diff": list(
+                    unified_diff(
+                        old_content,
+                        revision.get_content(),
+                        old_name,
+                        f"revision {number}",
+                    )
+                ),
+            },
+        )
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ("name", "slug", "article_count")
+    search_fields = ("name",)
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ("name", "email", "article", "date", "is_approved")
+    list_filter = ("is_approved",)
+    search_fields = ("name", "email", "content")
+    list_select_related = ("article",)
+    raw_id_fields = ("article", "parent")
+    actions = ["approve", "unapprove"]
+
+    # The number of unapproved threads per query, far below SQLite's limit on
+    # the depth of a WHERE clause.
+    moderation_batch_size = 200
+
+    def subtrees(self, queryset):
+        """
+        Returns querysets of the selected comments and their replies, each
+        covering up to `moderation_batch_size` threads.
+        """
+        # A selected reply of a selected comment is already in its thread.
+        roots = []
+        for article_id, path in queryset.order_by("article", "path").values_list(
+            "article", "path"
+        ):
+            if not roots or roots[-1] != (article_id, path[: len(roots[-1][1])]):
+                roots.append((article_id, path))
+        for offset in range(0, len(roots), self.moderation_batch_size):
+            threads = Q()
+            for article_id, path in roots[offset : offset + self.moderation_batch_size]:
+                # Paths are base-36 digits, which all sort before "~".
+                threads |= Q(article_id=article_id, path__gte=path, path__lt=path + "~")
+            yield Comment.objects.filter(threads)
+
+    def moderate(self, request, queryset, approved):
+        """
+        Approves or unapproves the selected comments, and marks their articles
+        modified. Unapproving a comment also unapproves its replies.
+        """
+        updated = 0
+        if queryset.exists():
+            # Hide the replies along with the comments, so that no approved
+            # reply is left under a hidden comment.
+            batches = [queryset] if approved else self.subtrees(queryset)
+            article_ids = set()
+            with transaction.atomic():
+                for comments in batches:
+                    comments = comments.filter(is_approved__in=[not approved])
+                    article_ids.update(comments.values_list("article", flat=True))
+                    updated += comments.update(is_approved=approved)
+            if updated:
+                Article.objects.filter(pk__in=article_ids).touch()
+                invalidate_pages_on_commit()
+        self.message_user(
+            request,
+            f"{'Approved' if approved else 'Unapproved'} {updated} comment(s).",
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Approve selected comments", permissions=["change"])
+    def approve(self, request, queryset):
+        self.moderate(request, queryset, True)
+
+    @admin.action(description="Unapprove selected comments", permissions=["change"])
+    def unapprove(self, request, queryset):
+        self.moderate(request, queryset, False)
 
 
 @admin.register(ContactRequest)
 class ContactRequestAdmin(admin.ModelAdmin):
-    list_display = ("email", "name", "date")
-    readonly_fields = ("email", "name", "content", "date")
+    list_display = ("email", "name", "date", "notified_at")
+    readonly_fields = ("email", "name", "content", "date", "notified_at")
 
     def has_add_permission(self, request, obj=None):
         return False
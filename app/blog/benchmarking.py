@@ -0,0 +1,306 @@
+"""
+Helpers shared by the benchmark management commands.
+
+The endpoint benchmarks drive the project's WSGI application in-process, so
+the numbers include URL resolution, the full middleware stack, ORM queries and
+template rendering, but no network or web server overhead.
+"""
+import json
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from io import BytesIO
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import override_settings
+
+
+def percentile(sorted_values, pct):
+    """
+    Returns the nearest-rank percentile of an already sorted sequence.
+
+    Parameters:
+    - sorted_values (list): The values, sorted in ascending order.
+    - pct (float): The percentile to compute, between 0 and 100.
+
+    Returns:
+    float: The percentile value, or 0.0 for an empty sequence.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+@contextmanager
+def temporary_caches():
+    """
+    Points every configured cache at its own memory-mapped file in a temporary
+    directory, so that pages rendered from a temporary database, or by the
+    tests, never end up in the cache file shared with the running site.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        scratch = {
+            alias: {
+                **config,
+                "BACKEND": "blog.mmap_cache.MmapCache",
+                "LOCATION": os.path.join(directory, f"{alias}.mmap"),
+            }
+            for alias, config in settings.CACHES.items()
+        }
+        with override_settings(CACHES=scratch):
+            yield
+
+
+@contextmanager
+def temporary_database(using=DEFAULT_DB_ALIAS):
+    """
+    Replaces a database with a freshly migrated, empty one for the duration
+    of a benchmark, like the test runner does. SQLite databases are created
+    on disk in a temporary directory rather than in memory. The caches are
+    replaced by empty ones as well, see `temporary_caches`, and the metrics and
+    request slots of the benchmarked requests are kept apart from those of the
+    site.
+    """
+    connection = connections[using]
+    old_name = connection.settings_dict["NAME"]
+    with ExitStack() as stack:
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        stack.enter_context(temporary_caches())
+        stack.enter_context(
+            override_settings(
+                METRICS_DIR=os.path.join(directory, "metrics"),
+                LOAD_SHEDDING_DIR=os.path.join(directory, "shedding"),
+            )
+        )
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(
+                directory, "benchmark.sqlite3"
+            )
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def summarize(latencies, elapsed, queries=0, errors=0):
+    """
+    Builds the result dictionary reported for one benchmarked endpoint.
+
+    Parameters:
+    - latencies (list): Per-request latencies in seconds.
+    - elapsed (float): Wall-clock duration of the whole run in seconds.
+    - queries (int): Total number of SQL queries executed during the run.
+    - errors (int): Number of requests answered with a 4xx/5xx status.
+
+    Returns:
+    dict: Request count, throughput, latency percentiles in milliseconds and
+    queries per request.
+    """
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput": count / elapsed if elapsed else 0.0,
+        "mean_ms": sum(ordered) / count * 1000 if count else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000 if count else 0.0,
+        "queries_per_request": queries / count if count else 0.0,
+    }
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the queries run on a connection.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class WSGIDriver:
+    """
+    Minimal in-process WSGI client used to issue benchmark requests.
+
+    Attributes:
+    - application (callable): The WSGI application to call.
+    - host (str): The value sent as the Host header; must be allowed by ALLOWED_HOSTS.
+    """
+
+    def __init__(self, application, host="localhost"):
+        self.application = application
+        self.host = host
+
+    def request(self, path, method="GET", headers=None):
+        """
+        Issues a single request and consumes the response body.
+
+        Parameters:
+        - path (str): The request path, optionally with a query string.
+        - method (str): The HTTP method.
+        - headers (dict): Extra WSGI environ entries, e.g. {"HTTP_ACCEPT_ENCODING": "gzip"}.
+
+        Returns:
+        int: The HTTP status code of the response.
+        """
+        return self.fetch(path, method, headers)[0]
+
+    def fetch(self, path, method="GET", headers=None):
+        """
+        Like `request`, but also returns the response headers.
+
+        Returns:
+        tuple: (status code, dict of response headers).
+        """
+        path_info, _, query_string = path.partition("?")
+        environ = {
+            "PATH_INFO": path_info,
+            "QUERY_STRING": query_string,
+            "REMOTE_ADDR": "127.0.0.1",
+            "REQUEST_METHOD": method,
+            "SCRIPT_NAME": "",
+            "SERVER_NAME": self.host,
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "HTTP_HOST": self.host,
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": BytesIO(b""),
+            "wsgi.errors": BytesIO(),
+            "wsgi.multiprocess": False,
+            "wsgi.multithread": True,
+            "wsgi.run_once": False,
+            **(headers or {}),
+        }
+        statuses = []
+        response_headers = {}
+
+        def start_response(status, headers, exc_info=None):
+            statuses.append(status)
+            response_headers.update(headers)
+
+        response = self.application(environ, start_response)
+        try:
+            for _ in response:
+                pass
+        finally:
+            if hasattr(response, "close"):
+                response.close()
+        return int(statuses[0].split(" ", 1)[0]), response_headers
+
+
+def run_requests(driver, paths, total, concurrency=1, headers=None):
+    """
+    Issues `total` requests cycling over `paths` from `concurrency` clients.
+
+    With a concurrency of 1 the requests run in the calling thread, which
+    keeps them inside any transaction the caller has open.
+
+    Parameters:
+    - driver (WSGIDriver): The client used to issue the requests.
+    - paths (list): The request paths to cycle over.
+    - total (int): The total number of requests to issue.
+    - concurrency (int): The number of concurrent client threads.
+    - headers (dict): Extra WSGI environ entries sent with every request.
+
+    Returns:
+    dict: The summary produced by `summarize`.
+    """
+
+    def worker(offset):
+        latencies = []
+        errors = 0
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            for index in range(offset, total, concurrency):
+                start = time.perf_counter()
+                status = driver.request(paths[index % len(paths)], headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if status >= 400:
+                    errors += 1
+        if concurrency > 1:
+            connections.close_all()
+        return latencies, counter.count, errors
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        results = [worker(0)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for result in results for latency in result[0]]
+    queries = sum(result[1] for result in results)
+    errors = sum(result[2] for result in results)
+    return summarize(latencies, elapsed, queries, errors)
+
+
+def save_results(path, results):
+    """
+    Writes benchmark results to a JSON file.
+    """
+    with open(path, "w") as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """
+    Reads benchmark results previously written by `save_results`.
+    """
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def compare(
+    results,
+    baseline,
+    metrics=("throughput", "p95_ms", "queries_per_request"),
+    section="endpoints",
+):
+    """
+    Compares the per-endpoint (or per-backend, etc.) results of two runs.
+
+    Parameters:
+    - results (dict): The current run, as produced by a benchmark command.
+    - baseline (dict): The stored baseline run.
+    - metrics (tuple): The metrics to compare.
+    - section (str): The key of the results holding the compared entries.
+
+    Returns:
+    list: (entry, metric, baseline value, current value, regression in percent)
+    tuples. The regression is positive when the current run is worse.
+    """
+    rows = []
+    for endpoint, current in results[section].items():
+        previous = baseline.get(section, {}).get(endpoint)
+        if previous is None:
+            continue
+        for metric in metrics:
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            if old:
+                change = (new - old) / old * 100
+            else:
+                change = 0.0 if not new else math.inf
+            if metric == "throughput":
+                change = -change
+            rows.append((endpoint, metric, old, new, change))
+    return rows
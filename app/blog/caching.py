@@ -0,0 +1,472 @@
+"""
+Page caching for the public article views.
+
+Rendered pages are stored in the PAGE_CACHE_ALIAS cache under a key made of
+the request path, together with the generation they were rendered in.
+Saving or deleting an article bumps the generation, which marks every cached
+page as stale at once, in every worker process sharing the cache.
+
+The time of the next scheduled publish or unpublish is stored next to the
+generation. The first request after that time updates the articles' listed
+flags and bumps the generation, so pages expire exactly when an article's
+visibility changes, and the public Cache-Control max-age never extends past it.
+
+Pages are served with stale-while-revalidate semantics: a page is fresh for
+PAGE_CACHE_TIMEOUT seconds and while its generation is current. Once stale, it
+is kept for another PAGE_CACHE_STALE_TIMEOUT seconds, during which one request
+(the one that wins the regeneration lock) renders a new copy while all others
+keep receiving the stale one. When there is no copy at all, the other requests
+wait up to PAGE_CACHE_LOCK_WAIT seconds for the winner instead of rendering
+the same page concurrently, and get a 503 if it is still not done. Only the
+winner releases the lock, which holds a token for that purpose; if it gives
+the lock up without storing the page, a waiting request takes over.
+
+Page bodies are stored as a raw deflate stream together with their CRC-32 and
+Adler-32 checksums, so a cached page is sent to clients accepting gzip or
+deflate by only adding the few bytes of gzip or zlib framing around it,
+without compressing it again. Clients accepting neither get the page
+decompressed.
+
+Views define their HTTP validators through `get_validators`. They are stored
+with each page and sent as ETag and Last-Modified headers, and conditional
+requests are answered with 304 Not Modified from the validators alone, before
+the cache is read or the page rendered.
+"""
+import secrets
+import struct
+import time
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+
+from .metrics import record_cache
+from .models import Article
+
+# Holds the (generation, next scheduled visibility change) state.
+GENERATION_KEY = "blog:pages:state"
+# Bumped whenever the stored CachedPage layout changes, so that pages cached by
+# an older release sharing the cache file are never unpickled.
+PAGE_FORMAT = 3
+
+# Fixed gzip member header: deflate, no flags, no mtime, unknown OS.
+GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+# zlib stream header: deflate with a 32K window and the default level.
+ZLIB_HEADER = b"\x78\x9c"
+
+
+def page_cache():
+    return caches[getattr(settings, "PAGE_CACHE_ALIAS", "default")]
+
+
+def acquire_lock(cache, key):
+    """
+    Takes the lock `key` for PAGE_CACHE_LOCK_TIMEOUT seconds, unless another
+    request holds it.
+
+    Returns:
+    str: The token to release the lock with, or None if it is held.
+    """
+    token = secrets.token_hex(8)
+    timeout = getattr(settings, "PAGE_CACHE_LOCK_TIMEOUT", 30)
+    return token if cache.add(key, token, timeout) else None
+
+
+def release_lock(cache, key, token):
+    """
+    Releases the lock `key` if it is still held with `token`, and not by a
+    request that took it over after it expired.
+    """
+    if token is not None and cache.get(key) == token:
+        cache.delete(key)
+
+
+def get_page_state():
+    """
+    Returns the current page generation and the time of the next scheduled
+    visibility change, moving to a new generation once that time has passed.
+
+    Like page regeneration, the move is made by the one request winning a
+    lock; the others keep the current state until it is done, rather than all
+    updating the listed flags at once.
+
+    Returns:
+    tuple: (generation, next_change), where next_change is a timestamp or None.
+    """
+    cache = page_cache()
+    state = cache.get(GENERATION_KEY)
+    if state is None or (state[1] is not None and state[1] <= time.time()):
+        lock_key = f"{GENERATION_KEY}:lock"
+        token = acquire_lock(cache, lock_key)
+        if token is None and state is not None:
+            return state
+        try:
+            Article.objects.sync_listed()
+            state = invalidate_pages()
+        finally:
+            release_lock(cache, lock_key, token)
+    return state
+
+
+def get_generation():
+    """
+    Returns the current page generation, initializing it if needed.
+    """
+    return get_page_state()[0]
+
+
+def invalidate_pages():
+    """
+    Marks every cached page as stale by moving to a new generation, and looks
+    up the next scheduled visibility change.
+
+    Generations are nanosecond timestamps, so the current one also tells when
+    the articles last changed. A lost generation is recreated from the clock
+    and therefore never reuses an old value.
+
+    Returns:
+    tuple: The new (generation, next_change) state.
+    """
+    cache = page_cache()
+    current = cache.get(GENERATION_KEY)
+    next_change = Article.objects.next_visibility_change()
+    state = (
+        max(time.time_ns(), current[0] + 1 if current else 0),
+        next_change.timestamp() if next_change else None,
+    )
+    cache.set(GENERATION_KEY, state, None)
+    return state
+
+
+def invalidate_pages_on_commit():
+    """
+    Invalidates the cached pages once the current transaction is committed,
+    or right away outside of a transaction.
+
+    Moving to a new generation before the commit would let a request arriving
+    in between render the old rows and store them as fresh under the new
+    generation, so changes made in a transaction must use this instead of
+    `invalidate_pages`.
+    """
+    transaction.on_commit(invalidate_pages)
+
+
+def page_cache_key(request):
+    return f"blog:pages:v{PAGE_FORMAT}:{request.get_full_path()}"
+
+
+def make_etag(validator, encoding):
+    # Each content coding is a different representation with its own ETag.
+    return '"%s-%s"' % (validator, encoding or "identity")
+
+
+def set_validators(response, etag, last_modified, encoding):
+    """
+    Sets the ETag and Last-Modified headers of a page response.
+
+    Parameters:
+    - response (HttpResponse): The response to update.
+    - etag (str): The unquoted ETag validator of the page, or None.
+    - last_modified (float): The modification timestamp of the page, or None.
+    - encoding (str): The content coding of the response body.
+    """
+    if etag is not None:
+        response["ETag"] = make_etag(etag, encoding)
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+
+
+def limit_max_age(response, next_change):
+    """
+    Shortens the public max-age of a response so that shared caches do not
+    keep it past the next scheduled visibility change.
+    """
+    if next_change is None:
+        return
+    remaining = max(0, int(next_change - time.time()))
+    if remaining < getattr(settings, "PUBLIC_CACHE_MAX_AGE", 300):
+        patch_cache_control(response, public=True, max_age=remaining)
+
+
+def busy_response():
+    """
+    Returns the 503 response sent when a page is still being rendered by
+    another request after waiting PAGE_CACHE_LOCK_WAIT seconds for it.
+    """
+    response = HttpResponse(
+        "The server is busy, please retry shortly.",
+        status=503,
+        content_type="text/plain; charset=utf-8",
+    )
+    response["Retry-After"] = "1"
+    patch_cache_control(response, no_store=True)
+    return response
+
+
+def accepted_encoding(request):
+    """
+    Picks the content coding to send a cached page with.
+
+    Parameters:
+    - request (HttpRequest): The request whose Accept-Encoding header is used.
+
+    Returns:
+    str: "gzip" or "deflate", or None when the client accepts neither.
+    """
+    qualities = {}
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    for coding in ("gzip", "deflate"):
+        if qualities.get(coding, qualities.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class CachedPage:
+    """
+    A rendered page as stored in the page cache.
+
+    Attributes:
+    - body (bytes): The response body as a raw deflate stream.
+    - length (int): The size of the uncompressed body.
+    - crc32 (int): The CRC-32 of the uncompressed body, for gzip framing.
+    - adler32 (int): The Adler-32 of the uncompressed body, for zlib framing.
+    - content_type (str): The Content-Type header of the response.
+    - generation (int): The page generation the page was rendered in.
+    - fresh_until (float): Timestamp after which the page is stale.
+    - etag (str): The unquoted ETag validator of the page, or None.
+    - last_modified (float): The modification timestamp of the page, or None.
+    """
+
+    __slots__ = (
+        "body",
+        "length",
+        "crc32",
+        "adler32",
+        "content_type",
+        "generation",
+        "fresh_until",
+        "etag",
+        "last_modified",
+    )
+
+    def __init__(
+        self,
+        content,
+        content_type,
+        generation,
+        fresh_until,
+        level=6,
+        etag=None,
+        last_modified=None,
+    ):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.body = compressor.compress(content) + compressor.flush()
+        self.length = len(content)
+        self.crc32 = zlib.crc32(content)
+        self.adler32 = zlib.adler32(content)
+        self.content_type = content_type
+        self.generation = generation
+        self.fresh_until = fresh_until
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def is_fresh(self, generation, now):
+        return self.generation == generation and now < self.fresh_until
+
+    def encode(self, encoding):
+        """
+        Returns the body in the given content coding.
+
+        Parameters:
+        - encoding (str): "gzip", "deflate" or None for the identity coding.
+
+        Returns:
+        bytes: The encoded body.
+        """
+        if encoding == "gzip":
+            trailer = struct.pack("<II", self.crc32, self.length & 0xFFFFFFFF)
+            return GZIP_HEADER + self.body + trailer
+        if encoding == "deflate":
+            return ZLIB_HEADER + self.body + struct.pack(">I", self.adler32)
+        return zlib.decompress(self.body, -zlib.MAX_WBITS)
+
+    def to_response(self, encoding):
+        response = HttpResponse(self.encode(encoding), content_type=self.content_type)
+        if encoding:
+            response["Content-Encoding"] = encoding
+        patch_vary_headers(response, ("Accept-Encoding",))
+        set_validators(response, self.etag, self.last_modified, encoding)
+        return response
+
+
+class CachedPageMixin:
+    """
+    View mixin serving GET requests from the page cache with
+    stale-while-revalidate semantics and single-flight regeneration.
+
+    Only successful responses are cached. Freshly rendered pages are sent
+    compressed as well when the client accepts it. The public max-age of the
+    responses ends at the next scheduled visibility change.
+    """
+
+    def get_validators(self, generation):
+        """
+        Returns the validators of the requested page.
+
+        It is called before rendering to answer conditional requests, so it
+        must not rely on the view state set up by `get`, and again after
+        rendering, where it may use that state instead of querying.
+
+        Parameters:
+        - generation (int): The current page generation.
+
+        Returns:
+        tuple: (etag, last_modified) with an unquoted ETag validator and an
+        aware datetime, or None when the page has no validators.
+        """
+        return None
+
+    def get_not_modified(self, request, generation, encoding):
+        """
+        Returns a 304 response if the client's copy of the page is current.
+        """
+        if not (
+            "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+        ):
+            return None
+        validators = self.get_validators(generation)
+        if validators is None:
+            return None
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request,
+            etag=make_etag(etag, encoding),
+            last_modified=int(last_modified.timestamp()),
+        )
+        if response is not None:
+            patch_vary_headers(response, ("Accept-Encoding",))
+            set_validators(response, etag, last_modified.timestamp(), encoding)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        generation, next_change = get_page_state()
+        response = self.get_page(request, generation, *args, **kwargs)
+        if response.status_code in (200, 304):
+            limit_max_age(response, next_change)
+        return response
+
+    def get_page(self, request, generation, *args, **kwargs):
+        """
+        Returns the page response: 304, cached, stale or freshly rendered.
+        """
+        cache = page_cache()
+        key = page_cache_key(request)
+        lock_key = f"{key}:lock"
+        encoding = accepted_encoding(request)
+        not_modified = self.get_not_modified(request, generation, encoding)
+        if not_modified is not None:
+            return not_modified
+        if not getattr(settings, "PAGE_CACHE_ENABLED", True):
+            return super().get(request, *args, **kwargs)
+
+        entry = cache.get(key)
+
+        if entry is not None and entry.is_fresh(generation, time.time()):
+            record_cache(True)
+            return entry.to_response(encoding)
+
+        token = acquire_lock(cache, lock_key)
+        if token is None:
+            # Another request is regenerating this page.
+            if entry is None:
+                entry, token = self.wait_for_page(cache, key, lock_key, generation)
+            if entry is not None:
+                record_cache(True)
+                return entry.to_response(encoding)
+            if token is None:
+                return busy_response()
+
+        record_cache(False)
+        try:
+            response = super().get(request, *args, **kwargs)
+        except BaseException:
+            release_lock(cache, lock_key, token)
+            raise
+        if response.status_code != 200:
+            release_lock(cache, lock_key, token)
+            return response
+
+        def store(response):
+            fresh_timeout = getattr(settings, "PAGE_CACHE_TIMEOUT", 600)
+            stale_timeout = getattr(settings, "PAGE_CACHE_STALE_TIMEOUT", 86400)
+            etag, last_modified = self.get_validators(generation) or (None, None)
+            page = CachedPage(
+                response.content,
+                response["Content-Type"],
+                generation,
+                time.time() + fresh_timeout,
+                getattr(settings, "PAGE_CACHE_COMPRESS_LEVEL", 6),
+                etag,
+                last_modified.timestamp() if last_modified else None,
+            )
+            cache.set(key, page, fresh_timeout + stale_timeout)
+            release_lock(cache, lock_key, token)
+            if encoding:
+                response.content = page.encode(encoding)
+                response["Content-Encoding"] = encoding
+            patch_vary_headers(response, ("Accept-Encoding",))
+            set_validators(response, page.etag, page.last_modified, encoding)
+
+        response.add_post_render_callback(store)
+        return response
+
+    def wait_for_page(self, cache, key, lock_key, generation):
+        """
+        Polls for the page being rendered by another request, for up to
+        PAGE_CACHE_LOCK_WAIT seconds. If that request gives up the lock
+        without storing the page, e.g. because it failed, the lock is taken
+        over to render the page instead.
+
+        Returns:
+        tuple: (page, token), with the CachedPage or None, and the token of
+        the lock taken over or None.
+        """
+        deadline = time.monotonic() + getattr(settings, "PAGE_CACHE_LOCK_WAIT", 10.0)
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            entry = cache.get(key)
+            if entry is not None and entry.generation == generation:
+                return entry, None
+            token = acquire_lock(cache, lock_key)
+            if token is not None:
+                # The page may have been stored just before the lock was freed.
+                entry = cache.get(key)
+                if entry is not None and entry.generation == generation:
+                    release_lock(cache, lock_key, token)
+                    return entry, None
+                return None, token
+        return None, None
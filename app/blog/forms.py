@@ -1,5 +1,5 @@
 from django import forms
-from .models import ContactRequest
+from .models import Comment, ContactRequest, Tag
 
 
 class ContactForm(forms.ModelForm):
@@ -32,3 +32,52 @@ class ContactForm(forms.ModelForm):
             "name": forms.TextInput(attrs={"class": "form-control"}),
             "content": forms.Textarea(attrs={"class": "form-control"}),
         }
+
+
+class CommentForm(forms.ModelForm):
+    """
+    A Django Form for posting comments, built like the contact form.
+
+    Model:
+    - Comment: Model for storing comments; the instance passed in must have its article set.
+
+    Fields:
+    - parent (ModelChoiceField): The approved comment replied to, if any (hidden).
+    - email (EmailField): The email address of the commenter.
+    - name (CharField): The name of the commenter (maximum length: 255 characters).
+    - content (CharField): The content of the comment.
+    """
+
+    class Meta:
+        model = Comment
+        fields = [
+            "parent",
+            "email",
+            "name",
+            "content",
+        ]
+        widgets = {
+            "parent": forms.HiddenInput(),
+            "email": forms.EmailInput(attrs={"class": "form-control"}),
+            "name": forms.TextInput(attrs={"class": "form-control"}),
+            "content": forms.Textarea(attrs={"class": "form-control"}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["parent"].queryset = Comment.objects.approved().filter(
+            article=self.instance.article
+        )
+
+
+class AddTagsForm(forms.Form):
+    """
+    A Django Form for choosing the tags the admin bulk action adds to articles.
+
+    Fields:
+    - tags (ModelMultipleChoiceField): The tags to add.
+    """
+
+    tags = forms.ModelMultipleChoiceField(
+        queryset=Tag.objects.all(), widget=forms.CheckboxSelectMultiple
+    )
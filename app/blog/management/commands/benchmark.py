@@ -0,0 +1,297 @@
+import math
+import platform
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test.utils import override_settings
+from django.db.models import Count
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.benchmarking import (
+    WSGIDriver,
+    compare,
+    load_results,
+    run_requests,
+    save_results,
+    temporary_database,
+)
+from blog.models import ArchiveMonth, Article, AuthorStats, Tag
+from blog.seeding import seed
+from blog.views import ArticleListView
+
+
+def article_list_paths():
+    return [reverse("article_list")]
+
+
+def article_list_last_page_paths():
+    listed = ArchiveMonth.total()
+    last_page = max(1, math.ceil(listed / ArticleListView.paginate_by))
+    return [f"{reverse('article_list')}?page={last_page}"]
+
+
+def article_detail_paths():
+    articles = Article.objects.listed().order_by("?")[:100]
+    return [
+        reverse("article_detail", kwargs={"slug": slug, "pk": pk})
+        for slug, pk in articles.values_list("slug", "pk")
+    ]
+
+
+def article_thread_paths():
+    article = (
+        Article.objects.listed()
+        .annotate(comment_count=Count("comments"))
+        .filter(comment_count__gt=0)
+        .order_by("-comment_count")
+        .first()
+    )
+    if article is None:
+        return []
+    path = reverse("article_detail", kwargs={"slug": article.slug, "pk": article.pk})
+    # The first pages of the discussion, each starting at the path of its
+    # first comment.
+    starts = article.comments.approved().order_by("path").values_list("path", flat=True)
+    per_page = getattr(settings, "COMMENTS_PER_PAGE", 100)
+    pages = list(starts[: per_page * 10])[per_page::per_page]
+    return [path] + [f"{path}?comments={start}" for start in pages]
+
+
+def archive_month_paths():
+    months = ArchiveMonth.objects.filter(article_count__gt=0)[:12]
+    return [
+        reverse("article_archive_month", kwargs={"year": year, "month": month})
+        for year, month in months.values_list("year", "month")
+    ]
+
+
+def author_detail_paths():
+    authors = AuthorStats.objects.filter(article_count__gt=0).order_by(
+        "-article_count"
+    )[:20]
+    return [
+        reverse("author_detail", kwargs={"username": username})
+        for username in authors.values_list("user__username", flat=True)
+    ]
+
+
+def tag_detail_paths():
+    tags = Tag.objects.filter(article_count__gt=0).order_by("-article_count")[:20]
+    return [
+        reverse("tag_detail", kwargs={"slug": slug})
+        for slug in tags.values_list("slug", flat=True)
+    ]
+
+
+def contact_form_paths():
+    return [reverse("contact_form")]
+
+
+# Number of tags spread over the seeded articles.
+BENCHMARK_TAGS = 100
+
+# Benchmarked endpoints, mapped to a callable returning the paths to request.
+ENDPOINTS = {
+    "article_list": article_list_paths,
+    "article_list_last_page": article_list_last_page_paths,
+    "article_detail": article_detail_paths,
+    "article_thread": article_thread_paths,
+    "archive_month": archive_month_paths,
+    "author_detail": author_detail_paths,
+    "tag_detail": tag_detail_paths,
+    "contact_form": contact_form_paths,
+}
+
+# Page cache modes, see --page-cache.
+PAGE_CACHE_MODES = {"warm": ["warm"], "cold": ["cold"], "both": ["warm", "cold"]}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the blog endpoints in-process with concurrent clients and "
+        "reports throughput, latency percentiles and queries per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--articles",
+            type=int,
+            default=1000,
+            help="Number of articles to seed into the temporary database.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=0,
+            help="Generate the seed data in a pool of this many processes.",
+        )
+        parser.add_argument(
+            "--comments",
+            type=int,
+            default=10_000,
+            help=(
+                "Number of comments seeded as one discussion, requested by the "
+                "article_thread endpoint."
+            ),
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Number of requests issued per endpoint.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Number of concurrent in-process clients.",
+        )
+        parser.add_argument(
+            "--endpoints",
+            nargs="+",
+            choices=sorted(ENDPOINTS),
+            default=list(ENDPOINTS),
+            help="Endpoints to benchmark (default: all).",
+        )
+        parser.add_argument(
+            "--existing",
+            action="store_true",
+            help=(
+                "Benchmark the configured database as-is instead of seeding a "
+                "temporary one."
+            ),
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host header sent with each request; must be in ALLOWED_HOSTS.",
+        )
+        parser.add_argument(
+            "--accept-encoding",
+            default="",
+            help='Accept-Encoding header sent with each request, e.g. "gzip".',
+        )
+        parser.add_argument(
+            "--page-cache",
+            choices=sorted(PAGE_CACHE_MODES),
+            default="both",
+            help=(
+                "Serve pages from the page cache (warm), render every page "
+                "(cold, reported as <endpoint>:cold), or both (default)."
+            ),
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--baseline", help="Compare the results with this stored JSON run."
+        )
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            help=(
+                "Fail when any compared metric regresses by more than this "
+                "percentage against the baseline."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        with self.database(options):
+            results = self.run(options)
+
+        self.report(results)
+        if options["output"]:
+            save_results(options["output"], results)
+            self.stdout.write(f"Results written to {options['output']}")
+        if options["baseline"]:
+            self.compare(results, load_results(options["baseline"]), options)
+
+    @contextmanager
+    def database(self, options):
+        """
+        Provides the database to benchmark: a freshly migrated and seeded
+        temporary database, or the configured one with --existing.
+        """
+        if options["existing"]:
+            yield
+            return
+
+        with temporary_database():
+            self.stdout.write(f"Seeding {options['articles']} articles...")
+            seed(
+                users=max(1, options["articles"] // 100),
+                articles=options["articles"],
+                tags=BENCHMARK_TAGS,
+                comments=options["comments"],
+                processes=options["processes"],
+            )
+            yield
+
+    def run(self, options):
+        driver = WSGIDriver(get_wsgi_application(), host=options["host"])
+        headers = {}
+        if options["accept_encoding"]:
+            headers["HTTP_ACCEPT_ENCODING"] = options["accept_encoding"]
+        results = {
+            "created": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "articles": Article.objects.count(),
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "accept_encoding": options["accept_encoding"],
+            "page_cache": options["page_cache"],
+            "endpoints": {},
+        }
+        modes = PAGE_CACHE_MODES[options["page_cache"]]
+        for name in options["endpoints"]:
+            paths = ENDPOINTS[name]()
+            if not paths:
+                self.stderr.write(f"Skipping {name}: no paths to request.")
+                continue
+            for mode in modes:
+                key = name if mode == "warm" else f"{name}:cold"
+                self.stdout.write(f"Benchmarking {key}...")
+                with override_settings(PAGE_CACHE_ENABLED=mode == "warm"):
+                    # One untimed request per path so that the numbers exclude
+                    # one-off costs such as template loading. With the page
+                    # cache, it also stores the pages.
+                    for path in paths:
+                        driver.request(path, headers=headers)
+                    results["endpoints"][key] = run_requests(
+                        driver,
+                        paths,
+                        options["requests"],
+                        options["concurrency"],
+                        headers,
+                    )
+        return results
+
+    def report(self, results):
+        self.stdout.write(
+            f"{'endpoint':<28}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'p99 ms':>10}{'queries':>10}{'errors':>8}"
+        )
+        for name, result in results["endpoints"].items():
+            self.stdout.write(
+                f"{name:<28}{result['throughput']:>10.1f}{result['p50_ms']:>10.2f}"
+                f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result['queries_per_request']:>10.1f}{result['errors']:>8}"
+            )
+
+    def compare(self, results, baseline, options):
+        regressions = []
+        for endpoint, metric, old, new, change in compare(results, baseline):
+            self.stdout.write(
+                f"{endpoint:<28}{metric:<22}{old:>12.2f}{new:>12.2f}{change:>+9.1f}%"
+            )
+            limit = options["max_regression"]
+            if limit is not None and change > limit:
+                regressions.append(f"{endpoint} {metric} ({change:+.1f}%)")
+        if regressions:
+            raise CommandError(
+                "Regressions against baseline: " + ", ".join(regressions)
+            )
@@ -0,0 +1,161 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from blog.benchmarking import compare, load_results, save_results, summarize
+
+# Benchmarked backends: (backend path, LOCATION relative to the scratch directory).
+BACKENDS = {
+    "mmap": ("blog.mmap_cache.MmapCache", "cache.mmap"),
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "benchmark"),
+    "filebased": ("django.core.cache.backends.filebased.FileBasedCache", "files"),
+}
+
+
+def run_workload(backend, location, keys, operations, value_size, read_ratio, seed):
+    """
+    Runs a mixed get/set workload against a fresh backend instance.
+
+    Returns:
+    list: The latency of every operation in seconds.
+    """
+    path, _ = BACKENDS[backend]
+    cache = import_string(path)(
+        location, {"TIMEOUT": None, "OPTIONS": {"MAX_ENTRIES": keys * 2}}
+    )
+    rng = random.Random(seed)
+    value = os.urandom(value_size)
+    latencies = []
+    for _ in range(operations):
+        key = f"key-{rng.randrange(keys)}"
+        start = time.perf_counter()
+        if rng.random() < read_ratio:
+            if cache.get(key) is None:
+                cache.set(key, value)
+        else:
+            cache.set(key, value)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the memory-mapped cache backend against the local-memory "
+        "and file-based backends with a mixed get/set workload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backends",
+            nargs="+",
+            choices=sorted(BACKENDS),
+            default=list(BACKENDS),
+            help="Backends to benchmark (default: all).",
+        )
+        parser.add_argument(
+            "--keys", type=int, default=1000, help="Distinct keys (default: 1000)."
+        )
+        parser.add_argument(
+            "--operations",
+            type=int,
+            default=20000,
+            help="Operations per process (default: 20000).",
+        )
+        parser.add_argument(
+            "--value-size",
+            type=int,
+            default=4096,
+            help="Size of the cached values in bytes (default: 4096).",
+        )
+        parser.add_argument(
+            "--read-ratio",
+            type=float,
+            default=0.9,
+            help="Fraction of operations that are reads (default: 0.9).",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help=(
+                "Concurrent worker processes sharing the cache (default: 1). "
+                "Each process gets its own local-memory cache."
+            ),
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--baseline", help="Compare the results with this stored JSON run."
+        )
+
+    def handle(self, *args, **options):
+        if options["keys"] < 1 or options["operations"] < 1:
+            raise CommandError("--keys and --operations must be positive.")
+        if options["processes"] < 1:
+            raise CommandError("--processes must be positive.")
+
+        results = {
+            "created": timezone.now().isoformat(),
+            "keys": options["keys"],
+            "value_size": options["value_size"],
+            "read_ratio": options["read_ratio"],
+            "processes": options["processes"],
+            "backends": {},
+        }
+        for backend in options["backends"]:
+            directory = tempfile.mkdtemp()
+            try:
+                location = os.path.join(directory, BACKENDS[backend][1])
+                results["backends"][backend] = self.run(backend, location, options)
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+
+        self.stdout.write(
+            f"{'backend':<12}{'ops/s':>12}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}"
+        )
+        for backend, result in results["backends"].items():
+            self.stdout.write(
+                f"{backend:<12}{result['throughput']:>12.0f}"
+                f"{result['p50_ms'] * 1000:>10.1f}{result['p95_ms'] * 1000:>10.1f}"
+                f"{result['p99_ms'] * 1000:>10.1f}"
+            )
+
+        if options["output"]:
+            save_results(options["output"], results)
+            self.stdout.write(f"Results written to {options['output']}")
+        if options["baseline"]:
+            baseline = load_results(options["baseline"])
+            for backend, metric, old, new, change in compare(
+                results, baseline, ("throughput", "p95_ms"), section="backends"
+            ):
+                self.stdout.write(
+                    f"{backend:<12}{metric:<14}{old:>12.4f}{new:>12.4f}{change:>+9.1f}%"
+                )
+
+    def run(self, backend, location, options):
+        arguments = [
+            (
+                backend,
+                location,
+                options["keys"],
+                options["operations"],
+                options["value_size"],
+                options["read_ratio"],
+                seed,
+            )
+            for seed in range(options["processes"])
+        ]
+        start = time.perf_counter()
+        if options["processes"] == 1:
+            latencies = [run_workload(*arguments[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=options["processes"]) as executor:
+                latencies = list(executor.map(run_workload, *zip(*arguments)))
+        elapsed = time.perf_counter() - start
+        return summarize([value for chunk in latencies for value in chunk], elapsed)
@@ -0,0 +1,176 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from blog.benchmarking import (
+    QueryCounter,
+    compare,
+    load_results,
+    save_results,
+    summarize,
+    temporary_database,
+)
+from blog.models import Article, ArticleRevision
+from blog.seeding import WORDS
+
+
+def paragraph(rng):
+    return " ".join(
+        " ".join(rng.choices(WORDS, k=rng.randint(6, 18))).capitalize() + "."
+        for _ in range(rng.randint(3, 7))
+    )
+
+
+def edit(rng, paragraphs):
+    """
+    Applies one typical edit to a list of paragraphs in place: most edits
+    rewrite a sentence, some add, remove or move a paragraph.
+    """
+    kind = rng.random()
+    index = rng.randrange(len(paragraphs))
+    if kind < 0.6:
+        sentences = paragraphs[index].split(". ")
+        sentences[rng.randrange(len(sentences))] = " ".join(
+            rng.choices(WORDS, k=rng.randint(6, 18))
+        ).capitalize()
+        paragraphs[index] = ". ".join(sentences)
+    elif kind < 0.8 or len(paragraphs) < 2:
+        paragraphs.insert(index, paragraph(rng))
+    elif kind < 0.9:
+        del paragraphs[index]
+    else:
+        paragraphs.insert(rng.randrange(len(paragraphs)), paragraphs.pop(index))
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks article revision storage: saves an article through a "
+        "series of edits, then reports the stored size against full copies "
+        "and the latency of saving and of rebuilding every revision."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--edits",
+            type=int,
+            default=1000,
+            help="Number of edits saved (default: 1000).",
+        )
+        parser.add_argument(
+            "--paragraphs",
+            type=int,
+            default=40,
+            help="Number of paragraphs of the article before the edits (default: 40).",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed of the edits."
+        )
+        parser.add_argument(
+            "--existing",
+            action="store_true",
+            help=(
+                "Run in the configured database instead of a temporary one; "
+                "the benchmark article is deleted afterwards."
+            ),
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--baseline", help="Compare the results with this stored JSON run."
+        )
+
+    def handle(self, *args, **options):
+        if options["edits"] < 1 or options["paragraphs"] < 1:
+            raise CommandError("--edits and --paragraphs must be positive.")
+
+        if options["existing"]:
+            results = self.run(options)
+        else:
+            with temporary_database():
+                results = self.run(options)
+
+        storage = results["storage"]
+        self.stdout.write(
+            f"{storage['revisions']} revisions ({storage['snapshots']} snapshots): "
+            f"{storage['stored_bytes']} bytes stored for "
+            f"{storage['full_bytes']} bytes of full copies "
+            f"({storage['ratio']:.1%})."
+        )
+        self.stdout.write(
+            f"{'operation':<12}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'max ms':>10}{'queries':>10}"
+        )
+        for name, result in results["operations"].items():
+            self.stdout.write(
+                f"{name:<12}{result['throughput']:>10.1f}{result['p50_ms']:>10.2f}"
+                f"{result['p95_ms']:>10.2f}{result['max_ms']:>10.2f}"
+                f"{result['queries_per_request']:>10.1f}"
+            )
+
+        if options["output"]:
+            save_results(options["output"], results)
+            self.stdout.write(f"Results written to {options['output']}")
+        if options["baseline"]:
+            for name, metric, old, new, change in compare(
+                results,
+                load_results(options["baseline"]),
+                ("throughput", "p95_ms"),
+                section="operations",
+            ):
+                self.stdout.write(
+                    f"{name:<12}{metric:<14}{old:>12.4f}{new:>12.4f}{change:>+9.1f}%"
+                )
+
+    def run(self, options):
+        rng = random.Random(options["seed"])
+        paragraphs = [paragraph(rng) for _ in range(options["paragraphs"])]
+        author = User.objects.create(username="revisions-benchmark")
+        article = Article(title="Revisions", author=author)
+        contents = []
+        latencies = []
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            for number in range(options["edits"] + 1):
+                if number:
+                    edit(rng, paragraphs)
+                article.content = "\n\n".join(paragraphs)
+                contents.append(article.content)
+                saved = time.perf_counter()
+                article.save()
+                latencies.append(time.perf_counter() - saved)
+        save = summarize(latencies, time.perf_counter() - start, counter.count)
+
+        latencies = []
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            for number, content in enumerate(contents, 1):
+                rebuilt = time.perf_counter()
+                revision = ArticleRevision.objects.get(article=article, number=number)
+                if revision.get_content() != content:
+                    raise CommandError(f"Revision {number} was not rebuilt correctly.")
+                latencies.append(time.perf_counter() - rebuilt)
+        rebuild = summarize(latencies, time.perf_counter() - start, counter.count)
+
+        storage = article.revisions.aggregate(
+            revisions=Count("pk"),
+            snapshots=Count("pk", filter=Q(is_snapshot=True)),
+            stored_bytes=Sum(Length("data")),
+        )
+        storage["full_bytes"] = sum(len(content.encode()) for content in contents)
+        storage["ratio"] = storage["stored_bytes"] / storage["full_bytes"]
+        # Deletes the article and its revisions along with the author.
+        author.delete()
+        return {
+            "created": timezone.now().isoformat(),
+            "edits": options["edits"],
+            "paragraphs": options["paragraphs"],
+            "storage": storage,
+            "operations": {"save": save, "rebuild": rebuild},
+        }
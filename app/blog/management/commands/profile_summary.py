@@ -0,0 +1,73 @@
+import io
+import json
+import pstats
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarizes the request profiles written by ProfilingMiddleware: the "
+        "slowest requests and the hottest functions across all dumps."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=getattr(settings, "PROFILING_DIR", None),
+            help="Directory containing the dumps (default: PROFILING_DIR).",
+        )
+        parser.add_argument(
+            "--view", help="Only include requests handled by this view name."
+        )
+        parser.add_argument(
+            "--sort",
+            default="tottime",
+            choices=["tottime", "cumulative", "ncalls"],
+            help="Order of the function table (default: tottime).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=25,
+            help="Number of functions and requests to show (default: 25).",
+        )
+
+    def handle(self, *args, **options):
+        if not options["dir"]:
+            raise CommandError("No profile directory given and PROFILING_DIR unset.")
+        directory = Path(options["dir"])
+
+        dumps = []
+        for profile in sorted(directory.glob("*.prof")):
+            details = {}
+            sidecar = profile.with_suffix(".json")
+            if sidecar.exists():
+                with open(sidecar) as handle:
+                    details = json.load(handle)
+            if options["view"] and details.get("view") != options["view"]:
+                continue
+            dumps.append((profile, details))
+        if not dumps:
+            raise CommandError(f"No profiles found in {directory}.")
+
+        self.stdout.write(f"{len(dumps)} profiled requests in {directory}\n")
+        self.stdout.write("Slowest requests:")
+        slowest = sorted(
+            dumps, key=lambda dump: dump[1].get("duration_ms", 0), reverse=True
+        )
+        for _, details in slowest[: options["limit"]]:
+            self.stdout.write(
+                f"  {details.get('duration_ms', 0):9.1f} ms  "
+                f"{details.get('query_count', 0):4} queries "
+                f"{details.get('query_ms', 0):8.1f} ms SQL  "
+                f"{details.get('method', '?')} {details.get('path', '?')}"
+            )
+
+        stream = io.StringIO()
+        stats = pstats.Stats(*(str(profile) for profile, _ in dumps), stream=stream)
+        stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["limit"])
+        self.stdout.write("\nHot functions:")
+        self.stdout.write(stream.getvalue())
@@ -0,0 +1,93 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Populates the database with synthetic users, articles, tags, comments "
+        "and contact requests using bulk inserts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=0, help="Users to create.")
+        parser.add_argument(
+            "--articles", type=int, default=0, help="Articles to create."
+        )
+        parser.add_argument(
+            "--tags",
+            type=int,
+            default=0,
+            help="Tags to create and spread over the new articles.",
+        )
+        parser.add_argument(
+            "--comments",
+            type=int,
+            default=0,
+            help="Comments to add as one discussion under the newest article.",
+        )
+        parser.add_argument(
+            "--contact-requests",
+            type=int,
+            default=0,
+            help="Contact requests to create.",
+        )
+        parser.add_argument(
+            "--online-ratio",
+            type=float,
+            default=0.85,
+            help="Fraction of articles that are online (default: 0.85).",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=5 * 365,
+            help="Spread dates over this many days before now (default: 1825).",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=0,
+            help="Generate rows in a pool of this many processes (default: in-process).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Rows generated and inserted per chunk (default: 10000).",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed for reproducible data."
+        )
+
+    def handle(self, *args, **options):
+        if not 0 <= options["online_ratio"] <= 1:
+            raise CommandError("--online-ratio must be between 0 and 1.")
+        if options["batch_size"] < 1 or options["days"] < 1:
+            raise CommandError("--batch-size and --days must be positive.")
+
+        start = time.perf_counter()
+        created = seed(
+            users=options["users"],
+            articles=options["articles"],
+            tags=options["tags"],
+            comments=options["comments"],
+            contact_requests=options["contact_requests"],
+            online_ratio=options["online_ratio"],
+            days=options["days"],
+            processes=options["processes"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+            stdout=self.stdout if options["verbosity"] > 1 else None,
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Created {users} users, {articles} articles, {tags} tags, "
+                "{comments} comments and "
+                "{contact_requests} contact requests".format(**created)
+                + f" in {elapsed:.1f}s."
+            )
+        )
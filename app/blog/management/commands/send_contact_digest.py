@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.notifications import collect_digest, deliver
+
+
+class Command(BaseCommand):
+    help = (
+        "Mails the pending contact requests as a digest if one is due; meant "
+        'to run periodically with CONTACT_NOTIFICATION_MODE = "digest".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Mail all pending contact requests even if no digest is due.",
+        )
+
+    def handle(self, *args, **options):
+        messages, contact_request_ids = collect_digest(force=options["force"])
+        sent = deliver(messages, contact_request_ids)
+        if messages and not sent:
+            raise CommandError(
+                f"Could not send the digest of {len(contact_request_ids)} "
+                "contact requests; they are left pending."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Sent {len(contact_request_ids)} contact requests in {sent} emails."
+            )
+        )
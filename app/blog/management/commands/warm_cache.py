@@ -0,0 +1,91 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+
+from blog.benchmarking import WSGIDriver
+from blog.warming import article_detail_paths, article_list_paths, warm_pages
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the page cache by rendering the first article list pages and the "
+        "most recent article pages, with bounded concurrency and request rate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--list-pages",
+            type=int,
+            default=5,
+            help="Number of article list pages to warm (default: 5).",
+        )
+        parser.add_argument(
+            "--articles",
+            type=int,
+            default=50,
+            help="Number of most recently published article pages to warm (default: 50).",
+        )
+        parser.add_argument(
+            "--paths-file",
+            help=(
+                "Also warm the paths listed in this file, one per line, e.g. the "
+                "most-read pages from the access logs."
+            ),
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Number of pages rendered at the same time (default: 4).",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=20.0,
+            help="Maximum number of requests started per second; 0 for no limit (default: 20).",
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host header sent with each request; must be in ALLOWED_HOSTS.",
+        )
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be positive.")
+        if options["rate"] < 0 or options["list_pages"] < 0 or options["articles"] < 0:
+            raise CommandError(
+                "--rate, --list-pages and --articles cannot be negative."
+            )
+
+        paths = []
+        if options["list_pages"]:
+            paths += article_list_paths(options["list_pages"])
+        paths += article_detail_paths(options["articles"])
+        if options["paths_file"]:
+            with open(options["paths_file"]) as handle:
+                paths += [line.strip() for line in handle if line.strip()]
+        paths = list(dict.fromkeys(paths))
+
+        driver = WSGIDriver(get_wsgi_application(), host=options["host"])
+        start = time.perf_counter()
+        results = warm_pages(driver, paths, options["concurrency"], options["rate"])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(f"{'status':>6}{'ms':>10}{'queries':>9}{'cache':>7}  path")
+        for result in results:
+            queries = "-" if result["queries"] is None else result["queries"]
+            self.stdout.write(
+                f"{result['status']:>6}{result['ms']:>10.2f}{queries:>9}"
+                f"{result['cache'] or '-':>7}  {result['path']}"
+            )
+        rendered = sum(result["cache"] == "miss" for result in results)
+        errors = sum(result["status"] >= 400 for result in results)
+        message = (
+            f"Warmed {len(results)} pages ({rendered} rendered, {errors} errors) "
+            f"in {elapsed:.2f}s."
+        )
+        self.stdout.write(
+            self.style.ERROR(message) if errors else self.style.SUCCESS(message)
+        )
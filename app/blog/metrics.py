@@ -0,0 +1,495 @@
+"""
+Per-request performance metrics and their Prometheus aggregation.
+
+`ServerTimingMiddleware` creates a `RequestMetrics` for every request and
+makes it available through `current_metrics()`, so that code deeper in the
+stack (for example the page cache) can record what it did without the
+request being passed around. Finished requests are folded into the
+process-wide `registry`, which is exposed in the Prometheus text format by the
+metrics view.
+
+Each worker process writes its aggregates to its own file in METRICS_DIR, at
+most every METRICS_FLUSH_INTERVAL seconds, and the metrics view merges the
+files of all processes, so that it reports the whole server whichever worker
+answers the scrape. The files of exited processes are merged into one archive
+file on the next scrape, so the counters never go backwards while the
+directory only holds one file per running process; a worker reusing the pid
+of an exited one before that starts from its counts. Clear the directory when
+the server is redeployed.
+
+Requests are labelled with their method only for the methods of
+REQUEST_METHODS, and "other" for any other, so that clients cannot add series.
+"""
+import fcntl
+import os
+import pickle
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Methods used as a label as they are; all others are counted as "other".
+REQUEST_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT")
+)
+
+# The file the aggregates of exited processes are merged into, and the file
+# locked while merging.
+ARCHIVE_NAME = "archive.pickle"
+LOCK_NAME = "archive.lock"
+
+_current = ContextVar("blog_request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Timing and counters collected while handling a single request.
+
+    Attributes:
+    - queries (int): The number of SQL queries executed.
+    - query_time (float): Time spent executing SQL queries, in seconds.
+    - template_time (float): Time spent rendering template responses, in seconds.
+    - cache_hits (int): The number of cache lookups that found an entry.
+    - cache_misses (int): The number of cache lookups that did not.
+    - started (float): `time.perf_counter()` value at the start of the request.
+    """
+
+    __slots__ = (
+        "queries",
+        "query_time",
+        "template_time",
+        "cache_hits",
+        "cache_misses",
+        "started",
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.started = time.perf_counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Database execute wrapper timing every query.
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_time += time.perf_counter() - start
+            self.queries += 1
+
+    def server_timing(self, total):
+        """
+        Formats the collected values as a Server-Timing header value.
+        """
+        return ", ".join(
+            (
+                f'db;desc="{self.queries} queries";dur={self.query_time * 1000:.2f}',
+                f"tpl;dur={self.template_time * 1000:.2f}",
+                f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+                f"total;dur={total * 1000:.2f}",
+            )
+        )
+
+
+def activate(metrics):
+    """
+    Makes `metrics` the metrics of the current request and returns a reset token.
+    """
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def current_metrics():
+    """
+    Returns the metrics of the request being handled, or None outside a request.
+    """
+    return _current.get()
+
+
+def record_cache(hit):
+    """
+    Counts a cache lookup against the current request, if any.
+
+    Parameters:
+    - hit (bool): Whether the lookup found an entry.
+    """
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+class _ViewStats:
+    __slots__ = (
+        "buckets",
+        "latency_sum",
+        "count",
+        "queries",
+        "query_time",
+        "template_time",
+        "cache_hits",
+        "cache_misses",
+    )
+
+    def __init__(self, bucket_count):
+        # One slot per bucket plus +Inf; cumulated when rendered.
+        self.buckets = [0] * (bucket_count + 1)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def snapshot(self):
+        copy = _ViewStats(0)
+        for name in self.__slots__:
+            setattr(copy, name, getattr(self, name))
+        copy.buckets = list(self.buckets)
+        return copy
+
+    def add(self, other):
+        for name in self.__slots__:
+            if name != "buckets":
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+
+def _merge(totals, views, requests):
+    """
+    Adds the aggregates of one process to `totals`, a (views, requests) pair.
+    """
+    for view, stats in views.items():
+        if view in totals[0]:
+            totals[0][view].add(stats)
+        else:
+            totals[0][view] = stats.snapshot()
+    for key, count in requests.items():
+        totals[1][key] += count
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@contextmanager
+def _archive_lock(directory):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_NAME), "ab") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        yield
+
+
+def _load(path):
+    """
+    Returns the (views, requests) aggregates stored in `path`, or None if it
+    is gone or unreadable.
+    """
+    try:
+        with open(path, "rb") as file:
+            return pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        # The file of a process that was just archived, or of an
+        # incompatible release.
+        return None
+
+
+def _write(path, state):
+    """
+    Pickles `state` to `path`, replacing it atomically.
+    """
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump(state, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+class MetricsRegistry:
+    """
+    Thread-safe, process-wide aggregation of finished requests.
+
+    A shared registry also writes its aggregates to METRICS_DIR and renders
+    those of every process, see the module docstring.
+    """
+
+    def __init__(self, buckets=None, shared=False):
+        self.buckets = tuple(
+            buckets
+            or getattr(settings, "METRICS_LATENCY_BUCKETS", DEFAULT_LATENCY_BUCKETS)
+        )
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._views = {}
+        self._requests = defaultdict(int)
+        self._collectors = []
+        self._pid = os.getpid()
+        self._resumed = False
+        self._next_flush = 0.0
+
+    def _directory(self):
+        return getattr(settings, "METRICS_DIR", None) if self.shared else None
+
+    def _path(self, directory):
+        return os.path.join(directory, f"{self._pid}.pickle")
+
+    def _check_process(self):
+        # Must be called with the lock held. A forked worker starts empty
+        # instead of reporting the requests of its parent again.
+        if self._pid != os.getpid():
+            self._views.clear()
+            self._requests.clear()
+            self._pid = os.getpid()
+            self._resumed = False
+            self._next_flush = 0.0
+
+    def _state(self):
+        # Must be called with the lock held.
+        views = {view: stats.snapshot() for view, stats in self._views.items()}
+        return views, dict(self._requests)
+
+    def _resume(self, directory):
+        """
+        Adds the counts left by an exited process with the same pid, once.
+        Must be called with the lock held.
+        """
+        self._resumed = True
+        # Under the archive lock, so that the file is not also archived.
+        with _archive_lock(directory):
+            state = _load(self._path(directory))
+            if state is not None:
+                _merge((self._views, self._requests), *state)
+
+    def flush(self):
+        """
+        Writes the aggregates of this process to METRICS_DIR, replacing its
+        previous file atomically. Does nothing for registries that are not shared.
+        """
+        directory = self._directory()
+        if not directory:
+            return
+        with self._lock:
+            self._check_process()
+            if not self._resumed:
+                self._resume(directory)
+            state = self._state()
+            path = self._path(directory)
+            self._next_flush = time.monotonic() + getattr(
+                settings, "METRICS_FLUSH_INTERVAL", 1.0
+            )
+        os.makedirs(directory, exist_ok=True)
+        _write(path, state)
+
+    def _archive(self, directory):
+        """
+        Merges the files of exited processes into the archive file and
+        removes them.
+        """
+        exited = [
+            name
+            for name in os.listdir(directory)
+            if name.endswith(".pickle")
+            and name[: -len(".pickle")].isdigit()
+            and not _is_running(int(name[: -len(".pickle")]))
+        ]
+        if not exited:
+            return
+        with _archive_lock(directory):
+            archive = os.path.join(directory, ARCHIVE_NAME)
+            totals = ({}, defaultdict(int))
+            for name in [ARCHIVE_NAME] + exited:
+                # Files archived by a concurrent scrape are gone by now.
+                state = _load(os.path.join(directory, name))
+                if state is not None:
+                    _merge(totals, *state)
+            _write(archive, (totals[0], dict(totals[1])))
+            for name in exited:
+                try:
+                    os.unlink(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def _load_all(self, directory):
+        """
+        Returns the merged aggregates of the files of all processes, after
+        archiving those of exited processes.
+        """
+        self._archive(directory)
+        totals = ({}, defaultdict(int))
+        for name in os.listdir(directory):
+            if name.endswith(".pickle"):
+                state = _load(os.path.join(directory, name))
+                if state is not None:
+                    _merge(totals, *state)
+        return totals
+
+    def register_collector(self, collector):
+        """
+        Adds a callable returning extra exposition lines to `render`, for
+        metrics kept outside the registry.
+        """
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def observe(self, view, method, status, duration, metrics):
+        """
+        Folds a finished request into the aggregates.
+
+        Parameters:
+        - view (str): The name of the view that handled the request.
+        - method (str): The HTTP method, counted as "other" unless it is one
+          of REQUEST_METHODS.
+        - status (int): The response status code.
+        - duration (float): The total request duration in seconds.
+        - metrics (RequestMetrics): The values collected during the request.
+        """
+        index = bisect_left(self.buckets, duration)
+        if method not in REQUEST_METHODS:
+            method = "other"
+        with self._lock:
+            self._check_process()
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = _ViewStats(len(self.buckets))
+            stats.buckets[index] += 1
+            stats.latency_sum += duration
+            stats.count += 1
+            stats.queries += metrics.queries
+            stats.query_time += metrics.query_time
+            stats.template_time += metrics.template_time
+            stats.cache_hits += metrics.cache_hits
+            stats.cache_misses += metrics.cache_misses
+            self._requests[(view, method, status)] += 1
+            due = self.shared and time.monotonic() >= self._next_flush
+        if due:
+            self.flush()
+
+    def reset(self):
+        """
+        Clears the aggregates of this process, and its file for a shared registry.
+        """
+        directory = self._directory()
+        with self._lock:
+            self._views.clear()
+            self._requests.clear()
+            self._resumed = True
+            if directory:
+                try:
+                    os.unlink(self._path(directory))
+                except FileNotFoundError:
+                    pass
+
+    def render(self):
+        """
+        Renders the aggregates in the Prometheus text exposition format, those
+        of all processes for a shared registry.
+        """
+        directory = self._directory()
+        if directory:
+            self.flush()
+            views, requests = self._load_all(directory)
+        else:
+            with self._lock:
+                views, requests = self._state()
+        with self._lock:
+            collectors = list(self._collectors)
+        views = sorted(views.items())
+        requests = sorted(requests.items())
+
+        lines = [
+            "# HELP blog_requests_total Requests handled, by view, method and status.",
+            "# TYPE blog_requests_total counter",
+        ]
+        for (view, method, status), count in requests:
+            lines.append(
+                f'blog_requests_total{{view="{view}",method="{method}",'
+                f'status="{status}"}} {count}'
+            )
+
+        lines += [
+            "# HELP blog_request_duration_seconds Request latency, by view.",
+            "# TYPE blog_request_duration_seconds histogram",
+        ]
+        for view, stats in views:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, stats.buckets):
+                cumulative += bucket
+                lines.append(
+                    f'blog_request_duration_seconds_bucket{{view="{view}",'
+                    f'le="{bound}"}} {cumulative}'
+                )
+            lines += [
+                f'blog_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} '
+                f"{stats.count}",
+                f'blog_request_duration_seconds_sum{{view="{view}"}} '
+                f"{stats.latency_sum}",
+                f'blog_request_duration_seconds_count{{view="{view}"}} {stats.count}',
+            ]
+
+        for attribute, metric, help_text in VIEW_COUNTERS:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for view, stats in views:
+                lines.append(f'{metric}{{view="{view}"}} {getattr(stats, attribute)}')
+        for collector in collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+# Per-view counters exposed next to the latency histogram.
+VIEW_COUNTERS = (
+    ("queries", "blog_db_queries_total", "SQL queries executed, by view."),
+    (
+        "query_time",
+        "blog_db_query_seconds_total",
+        "Seconds spent executing SQL queries, by view.",
+    ),
+    (
+        "template_time",
+        "blog_template_render_seconds_total",
+        "Seconds spent rendering templates, by view.",
+    ),
+    ("cache_hits", "blog_cache_hits_total", "Cache lookups that hit, by view."),
+    ("cache_misses", "blog_cache_misses_total", "Cache lookups that missed, by view."),
+)
+
+registry = MetricsRegistry(shared=True)
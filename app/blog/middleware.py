@@ -0,0 +1,396 @@
+import cProfile
+import json
+import mimetypes
+import os
+import random
+import threading
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.db import connections
+from django.http import FileResponse, HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.module_loading import import_string
+from django.utils.text import slugify
+
+from . import metrics, shedding
+from .caching import accepted_encoding
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware recording per-request performance metrics.
+
+    For every request it counts and times SQL queries, times template
+    rendering, collects the cache hits and misses reported through
+    `blog.metrics.record_cache` and measures the total time spent below it in
+    the stack. The values are sent in a `Server-Timing` response header and
+    aggregated into `blog.metrics.registry` for the metrics endpoint.
+
+    It should be the outermost middleware of both MIDDLEWARE (after
+    PublicProfileMiddleware) and PUBLIC_MIDDLEWARE so that the total includes
+    the other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header = getattr(settings, "SERVER_TIMING_HEADER", True)
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.activate(request_metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(request_metrics))
+                response = self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+
+        total = time.perf_counter() - request_metrics.started
+        if self.header:
+            response.headers["Server-Timing"] = request_metrics.server_timing(total)
+        match = request.resolver_match
+        metrics.registry.observe(
+            match.view_name if match else "unresolved",
+            request.method,
+            response.status_code,
+            total,
+            request_metrics,
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Times the rendering of template responses through a post-render callback.
+        """
+        request_metrics = metrics.current_metrics()
+        if request_metrics is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                request_metrics.template_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+
+class _QueryLog:
+    """
+    Database execute wrapper keeping the SQL and duration of every query.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.queries = []
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            if len(self.queries) < self.limit:
+                self.queries.append(
+                    {"sql": sql, "ms": (time.perf_counter() - start) * 1000}
+                )
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in middleware profiling a sample of requests with cProfile.
+
+    A request is profiled when it is drawn by PROFILING_SAMPLE_RATE, or on
+    every request when PROFILING_SLOW_THRESHOLD is set, in which case only the
+    requests slower than the threshold (in seconds) are kept. Each kept profile
+    is written to PROFILING_DIR as a `.prof` file next to a `.json` file with the
+    request path, timing and SQL log; only the newest PROFILING_MAX_DUMPS are
+    kept. Use `manage.py profile_summary` to aggregate them.
+
+    Only one request is profiled at a time per process; concurrent requests
+    are served unprofiled.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        self.slow_threshold = getattr(settings, "PROFILING_SLOW_THRESHOLD", None)
+        self.directory = Path(settings.PROFILING_DIR)
+        self.max_dumps = getattr(settings, "PROFILING_MAX_DUMPS", 200)
+        self.max_queries = getattr(settings, "PROFILING_MAX_QUERIES", 500)
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        sampled = random.random() < self.sample_rate
+        if not (sampled or self.slow_threshold is not None):
+            return self.get_response(request)
+        if not self.lock.acquire(blocking=False):
+            return self.get_response(request)
+
+        try:
+            profiler = cProfile.Profile()
+            query_log = _QueryLog(self.max_queries)
+            started = time.perf_counter()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(query_log))
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+            duration = time.perf_counter() - started
+
+            slow = self.slow_threshold is not None and duration >= self.slow_threshold
+            if sampled or slow:
+                self.dump(request, response, profiler, query_log, duration, slow)
+        finally:
+            self.lock.release()
+        return response
+
+    def dump(self, request, response, profiler, query_log, duration, slow):
+        """
+        Writes the profile and its request details, then rotates old dumps.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        stamp = datetime.now(dt_timezone.utc).strftime("%Y%m%dT%H%M%S.%f")
+        name = (
+            f"{stamp}-{os.getpid()}-{slugify(view) or 'view'}-{duration * 1000:.0f}ms"
+        )
+
+        profiler.dump_stats(self.directory / f"{name}.prof")
+        details = {
+            "path": request.get_full_path(),
+            "method": request.method,
+            "view": view,
+            "status": response.status_code,
+            "duration_ms": duration * 1000,
+            "reason": "slow" if slow else "sampled",
+            "query_count": query_log.count,
+            "query_ms": sum(query["ms"] for query in query_log.queries),
+            "queries": query_log.queries,
+        }
+        with open(self.directory / f"{name}.json", "w") as handle:
+            json.dump(details, handle, indent=2)
+
+        dumps = sorted(self.directory.glob("*.prof"))
+        for old in dumps[: max(0, len(dumps) - self.max_dumps)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".json").unlink(missing_ok=True)
+
+
+class PublicHandler(BaseHandler):
+    """
+    Request handler running the PUBLIC_MIDDLEWARE stack instead of MIDDLEWARE.
+    """
+
+    def load_middleware(self, is_async=False):
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        handler = convert_exception_to_response(self._get_response)
+        for middleware_path in reversed(settings.PUBLIC_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            try:
+                mw_instance = middleware(handler)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(mw_instance, "process_view"):
+                self._view_middleware.insert(0, mw_instance.process_view)
+            if hasattr(mw_instance, "process_template_response"):
+                self._template_response_middleware.append(
+                    mw_instance.process_template_response
+                )
+            if hasattr(mw_instance, "process_exception"):
+                self._exception_middleware.append(mw_instance.process_exception)
+            handler = convert_exception_to_response(mw_instance)
+        self._middleware_chain = handler
+
+    def resolve_request(self, request):
+        # PublicProfileMiddleware has already resolved the path.
+        return request.resolver_match or super().resolve_request(request)
+
+    def __call__(self, request):
+        return self._middleware_chain(request)
+
+
+class PublicProfileMiddleware:
+    """
+    Middleware serving public, read-only routes through a lean stack.
+
+    GET and HEAD requests to the URL names in PUBLIC_URL_NAMES are handled by
+    the PUBLIC_MIDDLEWARE stack, which leaves out the session, CSRF,
+    authentication and messages middleware. Their responses set no cookies and
+    carry no `Vary: Cookie`, so shared caches and CDNs can store them. All
+    other requests, including the admin and the contact form, continue through
+    the rest of MIDDLEWARE.
+
+    It must come first in MIDDLEWARE, after StaticFilesMiddleware and
+    LoadSheddingMiddleware only; middleware that should also run for public
+    requests has to be listed in PUBLIC_MIDDLEWARE as well.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.url_names = frozenset(getattr(settings, "PUBLIC_URL_NAMES", ()))
+        self.public_handler = PublicHandler()
+        self.public_handler.load_middleware()
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD"):
+            match = request.resolver_match
+            if match is None:
+                try:
+                    match = resolve(request.path_info)
+                except Resolver404:
+                    pass
+            if match is not None and match.url_name in self.url_names:
+                request.resolver_match = match
+                return self.public_handler(request)
+        return self.get_response(request)
+
+
+class LoadSheddingMiddleware:
+    """
+    Middleware enforcing per-route concurrency limits.
+
+    Each request takes a slot of the pool its route is mapped to, shared by
+    all the worker processes of the machine (see `blog.shedding`), for as long
+    as it is handled below this middleware. When
+    the pool is full and its queue is full or the request waited longer than
+    the pool's queue timeout, it is answered at once with 503 Service
+    Unavailable and a Retry-After header instead of piling up, so that a burst
+    on one route leaves the others (and the admin) responsive.
+
+    It should come right after StaticFilesMiddleware in MIDDLEWARE, so that it
+    covers both the public and the full stack. It is disabled unless
+    LOAD_SHEDDING_ENABLED is set.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "LOAD_SHEDDING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            match = None
+        # Kept for PublicProfileMiddleware, which routes on the same match.
+        request.resolver_match = match
+        pool = shedding.get_pool(shedding.pool_name(match, request.method))
+        slot = pool.acquire()
+        if slot is None:
+            response = HttpResponse(
+                "The server is busy, please retry shortly.",
+                status=503,
+                content_type="text/plain; charset=utf-8",
+            )
+            response["Retry-After"] = str(pool.retry_after)
+            patch_cache_control(response, no_store=True)
+            return response
+        try:
+            return self.get_response(request)
+        finally:
+            pool.release(slot)
+
+
+class PublicCacheControlMiddleware:
+    """
+    Marks successful responses of the public stack as cacheable by shared caches
+    for PUBLIC_CACHE_MAX_AGE seconds, unless the view set Cache-Control itself.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_age = getattr(settings, "PUBLIC_CACHE_MAX_AGE", 300)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.status_code == 200 and not response.has_header("Cache-Control"):
+            patch_cache_control(response, public=True, max_age=self.max_age)
+        return response
+
+
+class StaticFilesMiddleware:
+    """
+    Middleware serving the collected static files from STATIC_ROOT.
+
+    Fingerprinted files listed in the staticfiles manifest never change under
+    their name and are served with `Cache-Control: public, max-age=<one year>,
+    immutable`; other files get STATIC_CACHE_MAX_AGE. Clients accepting gzip
+    get the `.gz` copy written by `collectstatic`, when there is one.
+
+    It should be the first entry of MIDDLEWARE so that static requests skip
+    the rest of the stack. It is disabled when STATIC_ROOT is not set.
+    """
+
+    immutable_max_age = 365 * 24 * 60 * 60
+
+    def __init__(self, get_response):
+        if not getattr(settings, "STATIC_ROOT", None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.root = str(settings.STATIC_ROOT)
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+        self.max_age = getattr(settings, "STATIC_CACHE_MAX_AGE", 60)
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD") and request.path_info.startswith(
+            self.prefix
+        ):
+            response = self.serve(request, request.path_info[len(self.prefix) :])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        """
+        Returns a response for the static file `name`, or None if it does not exist.
+        """
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        content_type, encoding = mimetypes.guess_type(path)
+        content_type = content_type or "application/octet-stream"
+        gzipped = path + ".gz"
+        compressed = os.path.isfile(gzipped)
+        if compressed and accepted_encoding(request) == "gzip":
+            response = FileResponse(open(gzipped, "rb"), content_type=content_type)
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+            if encoding:
+                response["Content-Encoding"] = encoding
+        # Static files are displayed inline, not downloaded.
+        del response["Content-Disposition"]
+        if compressed:
+            patch_vary_headers(response, ("Accept-Encoding",))
+
+        if staticfiles_storage.is_fingerprinted(name):
+            patch_cache_control(
+                response, public=True, max_age=self.immutable_max_age, immutable=True
+            )
+        else:
+            patch_cache_control(response, public=True, max_age=self.max_age)
+        return response
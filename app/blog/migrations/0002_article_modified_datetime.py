@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def copy_publication_datetime(apps, schema_editor):
+    Article = apps.get_model("blog", "Article")
+    Article.objects.update(modified_datetime=F("publication_datetime"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="modified_datetime",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                help_text="The date and time when the article was last modified.",
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_publication_datetime, migrations.RunPython.noop),
+    ]
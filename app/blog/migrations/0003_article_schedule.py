@@ -0,0 +1,32 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0002_article_modified_datetime"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="publish_at",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                help_text="Optionally schedule when the article goes live.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="unpublish_at",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                help_text="Optionally schedule when the article is taken down.",
+                null=True,
+            ),
+        ),
+    ]
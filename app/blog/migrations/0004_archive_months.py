@@ -0,0 +1,119 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:25
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+
+def populate_listing(apps, schema_editor):
+    Article = apps.get_model("blog", "Article")
+    ArchiveMonth = apps.get_model("blog", "ArchiveMonth")
+    now = timezone.now()
+    Article.objects.filter(
+        Q(publish_at__isnull=True) | Q(publish_at__lte=now),
+        Q(unpublish_at__isnull=True) | Q(unpublish_at__gt=now),
+        is_online=True,
+    ).update(is_listed=True)
+    rows = (
+        Article.objects.filter(is_listed=True)
+        .annotate(
+            year=ExtractYear("publication_datetime"),
+            month=ExtractMonth("publication_datetime"),
+        )
+        .values("year", "month")
+        .annotate(article_count=Count("pk"))
+        .order_by()
+    )
+    ArchiveMonth.objects.bulk_create(ArchiveMonth(**row) for row in rows)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0003_article_schedule"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchiveMonth",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("article_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-year", "-month"],
+            },
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="is_listed",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                help_text="Whether the article is currently visible.",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="article",
+            name="publication_datetime",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                db_index=True,
+                help_text="The date and time when the article was published.",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="article",
+            name="publish_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Optionally schedule when the article goes live.",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="article",
+            name="unpublish_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Optionally schedule when the article is taken down.",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["is_listed", "publication_datetime"],
+                name="blog_article_listed_pub_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["is_listed", "publish_at"], name="blog_article_listed_publish"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["is_listed", "unpublish_at"], name="blog_article_listed_unpub"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="archivemonth",
+            constraint=models.UniqueConstraint(
+                fields=("year", "month"), name="blog_archivemonth_unique"
+            ),
+        ),
+        migrations.RunPython(populate_listing, migrations.RunPython.noop),
+    ]
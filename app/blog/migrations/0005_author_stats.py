@@ -0,0 +1,76 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def populate_author_stats(apps, schema_editor):
+    Article = apps.get_model("blog", "Article")
+    AuthorStats = apps.get_model("blog", "AuthorStats")
+    rows = (
+        Article.objects.filter(is_listed=True)
+        .values("author")
+        .annotate(article_count=Count("pk"))
+        .order_by()
+    )
+    AuthorStats.objects.bulk_create(
+        AuthorStats(user_id=row["author"], article_count=row["article_count"])
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("blog", "0004_archive_months"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthorStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("article_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "author stats",
+            },
+        ),
+        migrations.AlterField(
+            model_name="article",
+            name="author",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Select the author of the article.",
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                fields=["author", "is_listed", "publication_datetime"],
+                name="blog_article_author_listed_pub",
+            ),
+        ),
+        migrations.AddField(
+            model_name="authorstats",
+            name="user",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="author_stats",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(populate_author_stats, migrations.RunPython.noop),
+    ]
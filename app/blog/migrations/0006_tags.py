@@ -0,0 +1,56 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0005_author_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Enter the name of the tag.",
+                        max_length=50,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "slug",
+                    models.SlugField(
+                        blank=True,
+                        help_text="A URL-friendly version of the name, automatically generated from the name.",
+                        unique=True,
+                    ),
+                ),
+                ("article_count", models.IntegerField(default=0, editable=False)),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="article",
+            name="tags",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Select the tags of the article.",
+                related_name="articles",
+                to="blog.tag",
+            ),
+        ),
+    ]
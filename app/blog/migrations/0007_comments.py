@@ -0,0 +1,81 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0006_tags"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Comment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("path", models.CharField(editable=False, max_length=250)),
+                (
+                    "email",
+                    models.EmailField(
+                        help_text="Enter your email address.", max_length=254
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(help_text="Enter your name.", max_length=255),
+                ),
+                ("content", models.TextField(help_text="Enter your comment.")),
+                (
+                    "date",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="The date and time of the comment.",
+                    ),
+                ),
+                (
+                    "is_approved",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Check to show the comment under the article.",
+                    ),
+                ),
+                (
+                    "article",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="comments",
+                        to="blog.article",
+                    ),
+                ),
+                (
+                    "parent",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="replies",
+                        to="blog.comment",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["article", "is_approved", "path"],
+                        name="blog_comment_thread_idx",
+                    )
+                ],
+            },
+        ),
+    ]
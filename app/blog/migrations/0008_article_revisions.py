@@ -0,0 +1,49 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0007_comments"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleRevision",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.PositiveIntegerField()),
+                ("title", models.CharField(max_length=255)),
+                ("size", models.PositiveIntegerField()),
+                ("is_snapshot", models.BooleanField()),
+                ("data", models.BinaryField()),
+                ("created", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "article",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="revisions",
+                        to="blog.article",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="articlerevision",
+            constraint=models.UniqueConstraint(
+                fields=("article", "number"), name="blog_revision_article_number"
+            ),
+        ),
+    ]
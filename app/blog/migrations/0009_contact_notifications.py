@@ -0,0 +1,38 @@
+# Generated by Django 4.2.8 on 2026-10-19 06:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_notified(apps, schema_editor):
+    # Requests made so far were notified one by one when they were submitted.
+    ContactRequest = apps.get_model("blog", "ContactRequest")
+    ContactRequest.objects.update(notified_at=F("date"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0008_article_revisions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contactrequest",
+            name="notified_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="The date and time when the notification email was sent.",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(mark_notified, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="contactrequest",
+            index=models.Index(
+                condition=models.Q(("notified_at__isnull", True)),
+                fields=["date"],
+                name="blog_contact_pending_idx",
+            ),
+        ),
+    ]
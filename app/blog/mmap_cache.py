@@ -0,0 +1,323 @@
+"""
+Cache backend storing entries in a memory-mapped file shared by all processes.
+
+The file starts with a header page followed by one region per slab class.
+Each region is an array of fixed-size slots; an entry is stored in the
+smallest class whose slots fit its pickled value. A key hashes to one set of
+ASSOCIATIVITY consecutive slots in each class, so a lookup only inspects a
+handful of slot headers. When a set is full, the least recently used slot of
+the set is evicted, using a global access clock stored in the header.
+
+Every operation holds an exclusive `flock()` on the file, so worker
+processes on the same machine see each other's writes and invalidations
+immediately. The backend relies on `fcntl` and therefore only runs on POSIX
+systems.
+
+Example configuration:
+
+    CACHES = {
+        "default": {
+            "BACKEND": "blog.mmap_cache.MmapCache",
+            "LOCATION": "/var/tmp/mirblog-cache.mmap",
+            "OPTIONS": {"SIZE": 64 * 1024 * 1024},
+        }
+    }
+"""
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+MAGIC = b"MIRCACHE"
+VERSION = 1
+HEADER_SIZE = 4096
+HEADER = struct.Struct("<8sI32s")
+CLOCK = struct.Struct("<Q")
+CLOCK_OFFSET = HEADER.size
+
+# digest, expiry (0 = never), last access clock, value length, flags
+SLOT = struct.Struct("<16sdQII")
+USED = 1
+
+DEFAULT_SIZE = 64 * 1024 * 1024
+DEFAULT_SLAB_SIZES = (512, 2048, 8192, 32768, 131072, 524288)
+DEFAULT_ASSOCIATIVITY = 8
+
+# One mapping per file and process, shared by the per-thread cache instances.
+_mappings = {}
+_mappings_lock = threading.Lock()
+
+
+class _SlabClass:
+    __slots__ = ("slab_size", "stride", "offset", "sets")
+
+    def __init__(self, slab_size, offset, region_size, associativity):
+        self.slab_size = slab_size
+        self.stride = SLOT.size + slab_size
+        self.offset = offset
+        self.sets = region_size // self.stride // associativity
+
+
+class _Mapping:
+    """
+    An open, initialized cache file and its slab layout.
+    """
+
+    def __init__(self, path, size, slab_sizes, associativity):
+        self.associativity = associativity
+        region_size = (size - HEADER_SIZE) // len(slab_sizes)
+        self.classes = []
+        offset = HEADER_SIZE
+        for slab_size in sorted(slab_sizes):
+            slab_class = _SlabClass(slab_size, offset, region_size, associativity)
+            if slab_class.sets:
+                self.classes.append(slab_class)
+            offset += region_size
+        if not self.classes:
+            raise ValueError("The cache SIZE is too small for its SLAB_SIZES.")
+        self.layout = hashlib.blake2b(
+            repr((size, tuple(sorted(slab_sizes)), associativity)).encode(),
+            digest_size=32,
+        ).digest()
+
+        self.lock = threading.Lock()
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self.locked():
+            if os.fstat(self.fd).st_size != size:
+                os.ftruncate(self.fd, size)
+            self.mm = mmap.mmap(self.fd, size)
+            if HEADER.unpack_from(self.mm, 0) != (MAGIC, VERSION, self.layout):
+                self.reset()
+
+    @contextmanager
+    def locked(self):
+        with self.lock:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def reset(self):
+        """
+        Writes an empty layout. Must be called with the lock held.
+        """
+        self.mm[:] = bytes(len(self.mm))
+        HEADER.pack_into(self.mm, 0, MAGIC, VERSION, self.layout)
+
+    def tick(self):
+        clock = CLOCK.unpack_from(self.mm, CLOCK_OFFSET)[0] + 1
+        CLOCK.pack_into(self.mm, CLOCK_OFFSET, clock)
+        return clock
+
+    def slots(self, slab_class, digest):
+        """
+        Returns the offsets of the slots of the set `digest` maps to.
+        """
+        index = int.from_bytes(digest[:8], "little") % slab_class.sets
+        first = slab_class.offset + index * self.associativity * slab_class.stride
+        return range(
+            first, first + self.associativity * slab_class.stride, slab_class.stride
+        )
+
+    def find(self, digest, now):
+        """
+        Returns the offset of the live slot holding `digest`, or None.
+
+        Expired slots found on the way are released.
+        """
+        mm = self.mm
+        for slab_class in self.classes:
+            for offset in self.slots(slab_class, digest):
+                # Released slots have a zeroed digest, so comparing the digest
+                # alone avoids unpacking the header of every probed slot.
+                if mm[offset : offset + 16] != digest:
+                    continue
+                _, expires, _, _, flags = SLOT.unpack_from(mm, offset)
+                if not flags & USED:
+                    continue
+                if expires and expires <= now:
+                    self.release(offset)
+                    return None
+                return offset
+        return None
+
+    def read(self, offset):
+        slot_digest, expires, _, length, flags = SLOT.unpack_from(self.mm, offset)
+        SLOT.pack_into(
+            self.mm, offset, slot_digest, expires, self.tick(), length, flags
+        )
+        start = offset + SLOT.size
+        return self.mm[start : start + length]
+
+    def write(self, digest, payload, expires, now):
+        """
+        Stores `payload`, evicting the least recently used slot of its set if
+        needed. Returns False when the payload is too large for every class.
+        """
+        existing = self.find(digest, now)
+        if existing is not None:
+            self.release(existing)
+        slab_class = next(
+            (item for item in self.classes if item.slab_size >= len(payload)), None
+        )
+        if slab_class is None:
+            return False
+
+        victim, victim_clock = None, None
+        for offset in self.slots(slab_class, digest):
+            _, slot_expires, last_used, _, flags = SLOT.unpack_from(self.mm, offset)
+            if not flags & USED or (slot_expires and slot_expires <= now):
+                victim = offset
+                break
+            if victim is None or last_used < victim_clock:
+                victim, victim_clock = offset, last_used
+
+        start = victim + SLOT.size
+        self.mm[start : start + len(payload)] = payload
+        SLOT.pack_into(
+            self.mm, victim, digest, expires or 0.0, self.tick(), len(payload), USED
+        )
+        return True
+
+    def release(self, offset):
+        SLOT.pack_into(self.mm, offset, bytes(16), 0.0, 0, 0, 0)
+
+    def set_expiry(self, offset, expires):
+        slot_digest, _, last_used, length, flags = SLOT.unpack_from(self.mm, offset)
+        SLOT.pack_into(
+            self.mm, offset, slot_digest, expires or 0.0, last_used, length, flags
+        )
+
+
+def _get_mapping(path, size, slab_sizes, associativity):
+    key = (path, os.getpid())
+    with _mappings_lock:
+        mapping = _mappings.get(key)
+        if mapping is None:
+            mapping = _mappings[key] = _Mapping(path, size, slab_sizes, associativity)
+        return mapping
+
+
+class MmapCache(BaseCache):
+    """
+    Cache backend on a memory-mapped file shared across worker processes.
+
+    LOCATION is the path of the cache file. OPTIONS may contain SIZE (total
+    file size in bytes), SLAB_SIZES (slot sizes of the slab classes) and
+    ASSOCIATIVITY (slots per set). All processes using the same file must
+    use the same options; a file with a different layout is reset.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._path = os.path.abspath(location)
+        self._size = int(options.get("SIZE", DEFAULT_SIZE))
+        self._slab_sizes = tuple(options.get("SLAB_SIZES", DEFAULT_SLAB_SIZES))
+        self._associativity = int(options.get("ASSOCIATIVITY", DEFAULT_ASSOCIATIVITY))
+        self._pid = None
+
+    @property
+    def _mapping(self):
+        # Forked workers must not reuse the mapping of their parent.
+        if self._pid != os.getpid():
+            self._map = _get_mapping(
+                self._path, self._size, self._slab_sizes, self._associativity
+            )
+            self._pid = os.getpid()
+        return self._map
+
+    def _digest(self, key, version):
+        key = self.make_and_validate_key(key, version=version)
+        return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+    def _expiry(self, timeout):
+        return self.get_backend_timeout(timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        digest = self._digest(key, version)
+        payload = pickle.dumps(value, self.pickle_protocol)
+        mapping = self._mapping
+        with mapping.locked():
+            now = time.time()
+            if mapping.find(digest, now) is not None:
+                return False
+            return mapping.write(digest, payload, self._expiry(timeout), now)
+
+    def get(self, key, default=None, version=None):
+        digest = self._digest(key, version)
+        mapping = self._mapping
+        with mapping.locked():
+            offset = mapping.find(digest, time.time())
+            if offset is None:
+                return default
+            payload = mapping.read(offset)
+        return pickle.loads(payload)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        digest = self._digest(key, version)
+        payload = pickle.dumps(value, self.pickle_protocol)
+        mapping = self._mapping
+        with mapping.locked():
+            now = time.time()
+            if not mapping.write(digest, payload, self._expiry(timeout), now):
+                # Too large to cache: make sure no stale value survives.
+                offset = mapping.find(digest, now)
+                if offset is not None:
+                    mapping.release(offset)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        digest = self._digest(key, version)
+        mapping = self._mapping
+        with mapping.locked():
+            offset = mapping.find(digest, time.time())
+            if offset is None:
+                return False
+            mapping.set_expiry(offset, self._expiry(timeout))
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        digest = self._digest(key, version)
+        mapping = self._mapping
+        with mapping.locked():
+            now = time.time()
+            offset = mapping.find(digest, now)
+            if offset is None:
+                raise ValueError("Key '%s' not found" % key)
+            expires = SLOT.unpack_from(mapping.mm, offset)[1]
+            new_value = pickle.loads(mapping.read(offset)) + delta
+            mapping.write(
+                digest, pickle.dumps(new_value, self.pickle_protocol), expires, now
+            )
+        return new_value
+
+    def has_key(self, key, version=None):
+        digest = self._digest(key, version)
+        mapping = self._mapping
+        with mapping.locked():
+            return mapping.find(digest, time.time()) is not None
+
+    def delete(self, key, version=None):
+        digest = self._digest(key, version)
+        mapping = self._mapping
+        with mapping.locked():
+            offset = mapping.find(digest, time.time())
+            if offset is None:
+                return False
+            mapping.release(offset)
+            return True
+
+    def clear(self):
+        mapping = self._mapping
+        with mapping.locked():
+            mapping.reset()
@@ -1,7 +1,175 @@
-from django.db import models
+import math
+from collections import Counter
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.text import slugify
 
+from . import revisions
+from .pagination import CursorPage
+
+
+class ArticleQuerySet(models.QuerySet):
+    """
+    QuerySet for articles with visibility helpers.
+    """
+
+    def online(self, at=None):
+        """
+        Filters the articles visible at a given time.
+
+        An article is visible when it is online, its publish time (if any) has
+        passed and its unpublish time (if any) has not.
+
+        Parameters:
+        - at (datetime): The time to check visibility at; defaults to now.
+
+        Returns:
+        ArticleQuerySet: The visible articles.
+        """
+        at = at or timezone.now()
+        return self.filter(
+            Q(publish_at__isnull=True) | Q(publish_at__lte=at),
+            Q(unpublish_at__isnull=True) | Q(unpublish_at__gt=at),
+            is_online=True,
+        )
+
+    def listed(self, listed=True):
+        """
+        Filters the articles currently listed (or unlisted), using the
+        maintained `is_listed` flag instead of comparing schedules with the
+        current time.
+
+        `is_listed=True` would compile to a bare `WHERE is_listed`, which
+        SQLite cannot match against the (is_listed, ...) indexes; the IN
+        lookup compiles to an equality it can seek on.
+        """
+        return self.filter(is_listed__in=[listed])
+
+    def next_visibility_change(self, after=None):
+        """
+        Returns the first scheduled publish or unpublish time after a given time.
+
+        Only unlisted articles can be published and only listed ones
+        unpublished, so each bound is a single seek on an (is_listed, time) index.
+
+        Parameters:
+        - after (datetime): The time to look after; defaults to now.
+
+        Returns:
+        datetime: The next scheduled change, or None if there is none.
+        """
+        after = after or timezone.now()
+        changes = [
+            self.listed(listed)
+            .filter(**{f"{field}__gt": after})
+            .order_by(field)
+            .values_list(field, flat=True)
+            .first()
+            for listed, field in ((False, "publish_at"), (True, "unpublish_at"))
+        ]
+        return min((change for change in changes if change), default=None)
+
+    def due_for_sync(self, at=None):
+        """
+        Returns the articles whose `is_listed` flag is out of date because
+        their publish or unpublish time has passed since they were saved.
+
+        Only the articles that really change are read: listed articles past
+        their unpublish time, and unlisted articles that are visible now.
+        Offline and expired articles stay unlisted and are never read again.
+
+        Parameters:
+        - at (datetime): The current time; defaults to now.
+
+        Returns:
+        list: The articles, with the fields needed to update the counts.
+        """
+        at = at or timezone.now()
+        fields = ("pk", "author_id", "publication_datetime", "is_online")
+        fields += ("publish_at", "unpublish_at", "is_listed")
+        due = list(self.listed().filter(unpublish_at__lte=at).only(*fields))
+        due += self.listed(False).online(at).filter(publish_at__lte=at).only(*fields)
+        return due
+
+    def sync_listed(self, at=None):
+        """
+        Updates `is_listed` of the articles whose publish or unpublish time has
+        passed since they were saved, and the listing counts with them.
+
+        It is run when the next visibility change is reached. Each flag is
+        flipped with a conditional update, so concurrent runs count every
+        transition once.
+
+        Parameters:
+        - at (datetime): The current time; defaults to now.
+
+        Returns:
+        int: The number of articles whose visibility changed.
+        """
+        at = at or timezone.now()
+        changed = 0
+        for article in self.due_for_sync(at):
+            listed = article.is_visible(at)
+            if listed == article.is_listed:
+                continue
+            flipped = Article.objects.filter(pk=article.pk, is_listed=not listed)
+            if flipped.update(is_listed=listed):
+                article.update_listing_counts(1 if listed else -1)
+                changed += 1
+        return changed
+
+    def touch(self):
+        """
+        Marks the articles as modified now, e.g. when the comments shown under
+        them change, so that their validators change as well.
+        """
+        return self.update(modified_datetime=timezone.now())
+
+    def add_tags(self, tags):
+        """
+        Adds tags to every article of the queryset.
+
+        The missing links are found with one query and inserted in batches,
+        and each tag count is adjusted with a single update, however many
+        articles are selected. The articles given new tags are marked
+        modified. m2m_changed is not sent, so callers must invalidate the
+        cached pages.
+
+        Parameters:
+        - tags (list): The tags to add.
+
+        Returns:
+        int: The number of links created.
+        """
+        through = Article.tags.through
+        tag_ids = [tag.pk for tag in tags]
+        with transaction.atomic():
+            listed = dict(self.values_list("pk", "is_listed"))
+            existing = set(
+                through.objects.filter(
+                    article__in=self.values("pk"), tag__in=tag_ids
+                ).values_list("article_id", "tag_id")
+            )
+            links = [
+                through(article_id=article_id, tag_id=tag_id)
+                for article_id in listed
+                for tag_id in tag_ids
+                if (article_id, tag_id) not in existing
+            ]
+            through.objects.bulk_create(links, batch_size=1000, ignore_conflicts=True)
+            tagged = sorted({link.article_id for link in links})
+            for start in range(0, len(tagged), 1000):
+                Article.objects.filter(pk__in=tagged[start : start + 1000]).touch()
+            counts = Counter(link.tag_id for link in links if listed[link.article_id])
+            for tag_id, count in counts.items():
+                Tag.adjust([tag_id], count)
+        return len(links)
+
 
 class Article(models.Model):
     """
@@ -13,7 +181,13 @@ class Article(models.Model):
         content (str): The content of the article.
         author (User): The author of the article (foreign key to User model).
         publication_datetime (datetime): The date and time when the article was published.
+        modified_datetime (datetime): The date and time when the article was last saved.
         is_online (bool): Indicates whether the article is online or offline.
+        publish_at (datetime): Optional time from which the article is visible.
+        unpublish_at (datetime): Optional time from which the article is no longer visible.
+        is_listed (bool): Whether the article is currently visible; maintained on
+            save and when its schedule passes, and backing the listing indexes.
+        tags (Tag): The tags of the article.
     """
 
     title = models.CharField(
@@ -28,29 +202,669 @@ class Article(models.Model):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        # Covered by the (author, is_listed, publication_datetime) index.
+        db_index=False,
         help_text="Select the author of the article.",
     )
     publication_datetime = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,
         help_text="The date and time when the article was published.",
     )
+    modified_datetime = models.DateTimeField(
+        auto_now=True,
+        help_text="The date and time when the article was last modified.",
+    )
     is_online = models.BooleanField(
         default=True,
         help_text="Check to make the article available online; uncheck to take it offline.",
     )
+    publish_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Optionally schedule when the article goes live.",
+    )
+    unpublish_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Optionally schedule when the article is taken down.",
+    )
+    is_listed = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="Whether the article is currently visible.",
+    )
+    tags = models.ManyToManyField(
+        "Tag",
+        blank=True,
+        related_name="articles",
+        help_text="Select the tags of the article.",
+    )
+
+    objects = ArticleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["is_listed", "publication_datetime"],
+                name="blog_article_listed_pub_idx",
+            ),
+            models.Index(
+                fields=["author", "is_listed", "publication_datetime"],
+                name="blog_article_author_listed_pub",
+            ),
+            models.Index(
+                fields=["is_listed", "publish_at"],
+                name="blog_article_listed_publish",
+            ),
+            models.Index(
+                fields=["is_listed", "unpublish_at"],
+                name="blog_article_listed_unpub",
+            ),
+        ]
+
+    def is_visible(self, at=None):
+        """
+        Returns whether the article is visible at a given time, following the
+        same rules as `ArticleQuerySet.online`.
+        """
+        at = at or timezone.now()
+        return (
+            self.is_online
+            and (self.publish_at is None or self.publish_at <= at)
+            and (self.unpublish_at is None or self.unpublish_at > at)
+        )
+
+    def listing_key(self):
+        """
+        Returns the values that decide which listing counts the article is in.
+        """
+        return (
+            timezone.localtime(self.publication_datetime).strftime("%Y-%m"),
+            self.author_id,
+        )
+
+    def update_listing_counts(self, delta):
+        """
+        Adds `delta` to the materialized counts the article is listed under.
+        """
+        ArchiveMonth.adjust(self.publication_datetime, delta)
+        AuthorStats.adjust(self.author_id, delta)
+        Tag.objects.filter(articles=self).update(
+            article_count=F("article_count") + delta
+        )
+
+    def clean(self):
+        """
+        Validate that the article is not scheduled to go down before it goes live.
+        """
+        if self.publish_at and self.unpublish_at:
+            if self.unpublish_at <= self.publish_at:
+                raise ValidationError(
+                    {
+                        "unpublish_at": "The unpublish time must be after the publish time."
+                    }
+                )
 
     def save(self, *args, **kwargs):
         """
-        Override the save method to automatically generate the slug from the title.
+        Override the save method to automatically generate the slug from the
+        title, and to keep `is_listed` and the listing counts up to date.
         """
         if not self.slug:
             self.slug = slugify(self.title)
-        super().save(*args, **kwargs)
+        self.is_listed = self.is_visible()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "is_listed"}
+
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = (
+                    Article.objects.filter(pk=self.pk)
+                    .only("author_id", "publication_datetime", "is_listed")
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            if previous is not None and previous.is_listed:
+                if self.is_listed and previous.listing_key() == self.listing_key():
+                    return
+                previous.update_listing_counts(-1)
+            if self.is_listed:
+                self.update_listing_counts(1)
 
     def __str__(self):
         return self.title
 
 
+class Tag(models.Model):
+    """
+    Represents an article tag.
+
+    The number of listed articles with the tag is maintained like the
+    ArchiveMonth counts, and when tags are added to or removed from listed
+    articles, so the tag cloud and tag pages never count articles.
+
+    Attributes:
+        name (str): The name of the tag.
+        slug (str): The URL-friendly version of the name (generated from the name).
+        article_count (int): The number of listed articles with the tag.
+    """
+
+    name = models.CharField(
+        max_length=50, unique=True, help_text="Enter the name of the tag."
+    )
+    slug = models.SlugField(
+        max_length=50,
+        unique=True,
+        blank=True,
+        help_text="A URL-friendly version of the name, automatically generated from the name.",
+    )
+    article_count = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        ordering = ["name"]
+
+    @classmethod
+    def adjust(cls, tag_ids, delta):
+        """
+        Adds `delta` to the counts of the tags `tag_ids`.
+        """
+        if delta:
+            cls.objects.filter(pk__in=tag_ids).update(
+                article_count=F("article_count") + delta
+            )
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recomputes every count from the articles, e.g. after bulk inserts.
+        """
+        counts = dict(
+            Article.tags.through.objects.filter(article__is_listed__in=[True])
+            .values("tag")
+            .annotate(article_count=Count("pk"))
+            .order_by()
+            .values_list("tag", "article_count")
+        )
+        with transaction.atomic():
+            tags = list(cls.objects.only("pk"))
+            for tag in tags:
+                tag.article_count = counts.get(tag.pk, 0)
+            cls.objects.bulk_update(tags, ["article_count"], batch_size=500)
+
+    @classmethod
+    def cloud(cls, size):
+        """
+        Returns the tags with the most listed articles, sorted by name.
+
+        Parameters:
+        - size (int): The maximum number of tags.
+
+        Returns:
+        list: Dicts with the name, slug, article_count and a weight from 1 to
+        5, growing logarithmically with the count.
+        """
+        tags = list(
+            cls.objects.filter(article_count__gt=0)
+            .order_by("-article_count", "name")
+            .values("name", "slug", "article_count")[:size]
+        )
+        if not tags:
+            return []
+        low = math.log(tags[-1]["article_count"])
+        spread = math.log(tags[0]["article_count"]) - low
+        for tag in tags:
+            scaled = (math.log(tag["article_count"]) - low) / spread if spread else 0
+            tag["weight"] = 1 + round(scaled * 4)
+        return sorted(tags, key=lambda tag: tag["name"])
+
+    def save(self, *args, **kwargs):
+        """
+        Override the save method to automatically generate the slug from the name.
+        """
+        if not self.slug:
+            self.slug = slugify(self.name)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.name
+
+
+class ArchiveMonth(models.Model):
+    """
+    Materialized number of listed articles published in a month.
+
+    Rows are updated incrementally when articles are saved, deleted or change
+    visibility, so the archive sidebar and pagination never aggregate articles.
+
+    Attributes:
+        year (int): The year of the month.
+        month (int): The month, from 1 to 12.
+        article_count (int): The number of listed articles published in the month.
+    """
+
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    article_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["-year", "-month"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["year", "month"], name="blog_archivemonth_unique"
+            ),
+        ]
+
+    @classmethod
+    def adjust(cls, moment, delta):
+        """
+        Adds `delta` to the count of the month `moment` falls in, in the current time zone.
+        """
+        local = timezone.localtime(moment)
+        rows = cls.objects.filter(year=local.year, month=local.month)
+        if delta > 0:
+            cls.objects.get_or_create(year=local.year, month=local.month)
+        rows.update(article_count=F("article_count") + delta)
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recomputes every count from the articles, e.g. after bulk inserts.
+        """
+        rows = (
+            Article.objects.listed()
+            .annotate(
+                year=ExtractYear("publication_datetime"),
+                month=ExtractMonth("publication_datetime"),
+            )
+            .values("year", "month")
+            .annotate(article_count=Count("pk"))
+            .order_by()
+        )
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(cls(**row) for row in rows)
+
+    @classmethod
+    def total(cls):
+        """
+        Returns the number of listed articles, summed over the months.
+        """
+        return cls.objects.aggregate(total=Sum("article_count"))["total"] or 0
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d}"
+
+
+class AuthorStats(models.Model):
+    """
+    Materialized number of listed articles of an author.
+
+    Rows are updated incrementally like ArchiveMonth, so author pages never
+    count articles.
+
+    Attributes:
+        user (User): The author.
+        article_count (int): The number of listed articles of the author.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="author_stats"
+    )
+    article_count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "author stats"
+
+    @classmethod
+    def adjust(cls, user_id, delta):
+        """
+        Adds `delta` to the count of the author `user_id`.
+        """
+        # Decrements never create rows, so deleting an author, which cascades
+        # to their stats and articles in any order, cannot resurrect the row.
+        if delta > 0:
+            cls.objects.get_or_create(user_id=user_id)
+        cls.objects.filter(user_id=user_id).update(
+            article_count=F("article_count") + delta
+        )
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recomputes every count from the articles, e.g. after bulk inserts.
+        """
+        rows = (
+            Article.objects.listed()
+            .values("author")
+            .annotate(article_count=Count("pk"))
+            .order_by()
+        )
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                cls(user_id=row["author"], article_count=row["article_count"])
+                for row in rows
+            )
+
+    def __str__(self):
+        return f"{self.user}: {self.article_count} articles"
+
+
+def rebuild_listing_counts():
+    """
+    Recomputes all materialized listing counts from the articles.
+    """
+    ArchiveMonth.rebuild()
+    AuthorStats.rebuild()
+    Tag.rebuild()
+
+
+# Every comment path segment is the comment's creation time, in microseconds
+# since the epoch, as a fixed-width base-36 string, so that sorting by path
+# lists a thread depth-first with replies in chronological order.
+COMMENT_PATH_STEP = 10
+COMMENT_MAX_DEPTH = 25
+BASE36_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def comment_path_segment(moment):
+    """
+    Returns the path segment of a comment created at `moment`.
+    """
+    value = int(moment.timestamp() * 1_000_000)
+    digits = []
+    for _ in range(COMMENT_PATH_STEP):
+        value, digit = divmod(value, 36)
+        digits.append(BASE36_DIGITS[digit])
+    return "".join(reversed(digits))
+
+
+class CommentQuerySet(models.QuerySet):
+    """
+    QuerySet for comments with moderation and thread helpers.
+    """
+
+    def approved(self, approved=True):
+        """
+        Filters the approved (or pending) comments, with an IN lookup the
+        (article, is_approved, path) index can be used for.
+        """
+        return self.filter(is_approved__in=[approved])
+
+    def thread(self, start=None, size=100):
+        """
+        Loads a page of a discussion in depth-first order, with one ordered
+        range scan of the comments' paths.
+
+        The parent of each comment is resolved in memory: replies whose
+        parent is on the page but not in the queryset, e.g. awaiting
+        moderation, are left out together with their own replies. Replies
+        whose parent is on an earlier page continue that thread.
+
+        Parameters:
+        - start (str): The path of the first comment of the page; None for the first page.
+        - size (int): The maximum number of comments on the page.
+
+        Returns:
+        CursorPage: The comments, each with a `depth`, and the path the next
+        page starts at.
+        """
+        comments = self.order_by("path")
+        if start:
+            comments = comments.filter(path__gte=start)
+        comments = list(comments[: size + 1])
+        next_start = comments.pop().path if len(comments) > size else None
+        shown = set()
+        page = []
+        for comment in comments:
+            parent_path = comment.path[:-COMMENT_PATH_STEP]
+            if (
+                parent_path
+                and parent_path >= (start or "")
+                and (comment.parent_id not in shown)
+            ):
+                continue
+            shown.add(comment.pk)
+            page.append(comment)
+        return CursorPage(page, next_start)
+
+
+class Comment(models.Model):
+    """
+    Represents a reader comment on an article.
+
+    Comments are moderated like contact requests: they are stored by a single
+    insert and only shown once approved in the admin. Each one stores the
+    materialized path of its thread, so a whole discussion is read with one
+    ordered range scan of the (article, is_approved, path) index.
+
+    Attributes:
+        article (Article): The article commented on.
+        parent (Comment): The comment replied to, if any.
+        path (str): The path segments of the comment's ancestors and its own.
+        email (str): The email address of the commenter.
+        name (str): The name of the commenter.
+        content (str): The content of the comment.
+        date (datetime): The date and time when the comment was posted.
+        is_approved (bool): Whether the comment has been approved for display.
+    """
+
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="comments",
+        # Covered by the (article, is_approved, path) index.
+        db_index=False,
+    )
+    parent = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="replies",
+    )
+    path = models.CharField(
+        max_length=COMMENT_PATH_STEP * COMMENT_MAX_DEPTH, editable=False
+    )
+    email = models.EmailField(help_text="Enter your email address.")
+    name = models.CharField(max_length=255, help_text="Enter your name.")
+    content = models.TextField(help_text="Enter your comment.")
+    date = models.DateTimeField(
+        default=timezone.now, help_text="The date and time of the comment."
+    )
+    is_approved = models.BooleanField(
+        default=False, help_text="Check to show the comment under the article."
+    )
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["article", "is_approved", "path"],
+                name="blog_comment_thread_idx",
+            ),
+        ]
+
+    @property
+    def depth(self):
+        """
+        Returns the nesting level of the comment, 0 for top-level comments.
+        """
+        return len(self.path) // COMMENT_PATH_STEP - 1
+
+    def clean(self):
+        """
+        Validate that a reply belongs to the same article and is not nested too deep.
+        """
+        if self.parent is not None:
+            if self.parent.article_id != self.article_id:
+                raise ValidationError(
+                    {"parent": "Replies must be on the same article."}
+                )
+            if self.parent.depth >= COMMENT_MAX_DEPTH - 1:
+                raise ValidationError({"parent": "This thread is nested too deep."})
+
+    def save(self, *args, **kwargs):
+        """
+        Override the save method to compute the path of a new comment from
+        its parent's, without a second query.
+        """
+        if not self.path:
+            prefix = self.parent.path if self.parent_id else ""
+            self.path = prefix + comment_path_segment(self.date)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"Comment from {self.name} on {self.article}"
+
+
+# A revision is stored as a full snapshot at least every
+# REVISION_SNAPSHOT_INTERVAL revisions and as a delta from the previous
+# revision otherwise, so rebuilding any revision reads and applies at most
+# that many rows.
+REVISION_SNAPSHOT_INTERVAL = 20
+
+
+class ArticleRevisionQuerySet(models.QuerySet):
+    """
+    QuerySet for article revisions with recording and rebuilding helpers.
+    """
+
+    def chain(self, article_id, number):
+        """
+        Loads the rows needed to rebuild a revision with one query: the last
+        snapshot up to it and the deltas after it.
+
+        Returns:
+        list: The revisions, oldest first, ending with revision `number`.
+        """
+        revisions = self.filter(article_id=article_id, number__lte=number).order_by(
+            "-number"
+        )[:REVISION_SNAPSHOT_INTERVAL]
+        chain = []
+        for revision in revisions:
+            chain.append(revision)
+            if revision.is_snapshot:
+                break
+        chain.reverse()
+        if not chain or chain[-1].number != number or not chain[0].is_snapshot:
+            raise ArticleRevision.DoesNotExist(
+                f"Revision {number} of article {article_id} cannot be rebuilt."
+            )
+        return chain
+
+    def record(self, article):
+        """
+        Stores the current title and content of an article as a new revision,
+        unless they did not change since its latest revision.
+
+        The revision is stored as a delta from the latest one, or as a
+        snapshot when REVISION_SNAPSHOT_INTERVAL revisions were stored since
+        the last snapshot or the delta would not be smaller.
+
+        Returns:
+        ArticleRevision: The new revision, or None if nothing changed.
+        """
+        latest = self.filter(article=article).order_by("-number").only("number").first()
+        revision = ArticleRevision(
+            article=article,
+            number=1,
+            title=article.title,
+            size=len(article.content),
+            is_snapshot=True,
+            data=revisions.encode_snapshot(article.content),
+        )
+        if latest is not None:
+            chain = self.chain(article.pk, latest.number)
+            previous = ArticleRevision.rebuild(chain)
+            if previous == article.content and chain[-1].title == article.title:
+                return None
+            revision.number = latest.number + 1
+            if len(chain) < REVISION_SNAPSHOT_INTERVAL:
+                delta = revisions.encode_delta(previous, article.content)
+                if len(delta) < len(revision.data):
+                    revision.is_snapshot = False
+                    revision.data = delta
+        revision.save()
+        return revision
+
+
+class ArticleRevision(models.Model):
+    """
+    Represents a saved version of an article's title and content.
+
+    Attributes:
+        article (Article): The article the revision belongs to.
+        number (int): The number of the revision, counting from 1 per article.
+        title (str): The title of the article in this revision.
+        size (int): The length of the content in this revision.
+        is_snapshot (bool): Whether `data` holds the full content or a delta
+            from the previous revision.
+        data (bytes): The compressed content or delta (see `blog.revisions`).
+        created (datetime): The date and time when the revision was saved.
+    """
+
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="revisions",
+        # Covered by the (article, number) unique constraint.
+        db_index=False,
+    )
+    number = models.PositiveIntegerField()
+    title = models.CharField(max_length=255)
+    size = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField()
+    data = models.BinaryField()
+    created = models.DateTimeField(default=timezone.now)
+
+    objects = ArticleRevisionQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["article", "number"], name="blog_revision_article_number"
+            ),
+        ]
+
+    @staticmethod
+    def rebuild(chain):
+        """
+        Returns the content of the last revision of a chain loaded by
+        `ArticleRevisionQuerySet.chain`.
+        """
+        content = revisions.decode_snapshot(chain[0].data)
+        for revision in chain[1:]:
+            content = revisions.decode_delta(content, revision.data)
+        return content
+
+    def get_content(self):
+        """
+        Returns the content of the article in this revision.
+        """
+        if self.is_snapshot:
+            return revisions.decode_snapshot(self.data)
+        return self.rebuild(ArticleRevision.objects.chain(self.article_id, self.number))
+
+    def __str__(self):
+        return f"Revision {self.number} of {self.title}"
+
+
+class ContactRequestQuerySet(models.QuerySet):
+    """
+    QuerySet for contact requests with notification helpers.
+    """
+
+    def pending(self):
+        """
+        Filters the contact requests no notification was sent for yet.
+        """
+        return self.filter(notified_at__isnull=True)
+
+
 class ContactRequest(models.Model):
     """
     Represents a contact request.
@@ -60,6 +874,8 @@ class ContactRequest(models.Model):
         name (str): The name of the contact requester.
         content (str): The content of the contact request.
         date (datetime): The date and time when the contact request was made.
+        notified_at (datetime): When the notification email about the request
+            was sent, alone or in a digest; None while it is pending.
     """
 
     email = models.EmailField(help_text="Enter your email address.")
@@ -68,6 +884,24 @@ class ContactRequest(models.Model):
     date = models.DateTimeField(
         auto_now_add=True, help_text="The date and time of the contact request."
     )
+    notified_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="The date and time when the notification email was sent.",
+    )
+
+    objects = ContactRequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Only the few pending requests are indexed, oldest first.
+            models.Index(
+                fields=["date"],
+                condition=Q(notified_at__isnull=True),
+                name="blog_contact_pending_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Contact Request from {self.name}"
@@ -0,0 +1,163 @@
+"""
+Contact request notifications.
+
+With CONTACT_NOTIFICATION_MODE = "immediate", every contact request is mailed
+to RECIPIENT_EMAIL as it is submitted. With "digest", requests are left
+pending and mailed together: once CONTACT_DIGEST_SIZE of them are pending, or
+once the oldest has waited CONTACT_DIGEST_INTERVAL seconds. This is checked
+on every submission and by the `send_contact_digest` command, which should
+also run periodically (e.g. from cron) so that a quiet period does not hold
+back the last requests. Requests matching one of CONTACT_URGENT_RULES are
+always mailed right away.
+
+All the emails of a batch are sent over one connection of the configured
+email backend.
+"""
+import logging
+import re
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import ContactRequest
+
+logger = logging.getLogger(__name__)
+
+
+def is_urgent(contact_request):
+    """
+    Returns whether a contact request matches one of CONTACT_URGENT_RULES,
+    (field name, regular expression) pairs searched in the request's fields.
+    """
+    return any(
+        re.search(pattern, getattr(contact_request, field))
+        for field, pattern in getattr(settings, "CONTACT_URGENT_RULES", ())
+    )
+
+
+def contact_message(contact_request):
+    """
+    Returns the notification email about a single contact request.
+    """
+    return EmailMessage(
+        subject="New Contact Request",
+        body=(
+            f"Name: {contact_request.name}\n Reply-To: {contact_request.email}\n"
+            f"Content: {contact_request.content}"
+        ),
+        from_email=settings.EMAIL_HOST_USER,
+        to=settings.RECIPIENT_EMAIL,
+        reply_to=[contact_request.email],
+    )
+
+
+def digest_message(contact_requests):
+    """
+    Returns the notification email listing several contact requests.
+    """
+    entries = [
+        f"Name: {contact_request.name}\nReply-To: {contact_request.email}\n"
+        f"Date: {timezone.localtime(contact_request.date):%Y-%m-%d %H:%M}\n"
+        f"Content: {contact_request.content}"
+        for contact_request in contact_requests
+    ]
+    count = len(contact_requests)
+    return EmailMessage(
+        subject=f"{count} New Contact Request{'s' if count != 1 else ''}",
+        body="\n\n----\n\n".join(entries),
+        from_email=settings.EMAIL_HOST_USER,
+        to=settings.RECIPIENT_EMAIL,
+    )
+
+
+def collect_digest(now=None, force=False):
+    """
+    Marks the pending contact requests notified and returns the digests
+    listing them, if a digest is due.
+
+    Requests are claimed with a conditional update before the digests are
+    built, so that concurrent callers do not mail the same request twice.
+
+    Parameters:
+    - now (datetime): The current time; defaults to now.
+    - force (bool): Whether to collect the pending requests even if no digest is due.
+
+    Returns:
+    tuple: (list of EmailMessage, list of contact request ids), both empty
+    when no digest is due.
+    """
+    now = now or timezone.now()
+    size = getattr(settings, "CONTACT_DIGEST_SIZE", 50)
+    interval = getattr(settings, "CONTACT_DIGEST_INTERVAL", 900)
+    pending = ContactRequest.objects.pending()
+    if not force:
+        oldest = pending.order_by("date").values_list("date", flat=True)[:size]
+        oldest = list(oldest)
+        if not oldest:
+            return [], []
+        due = len(oldest) >= size or (now - oldest[0]).total_seconds() >= interval
+        if not due:
+            return [], []
+
+    ids = list(pending.values_list("pk", flat=True))
+    pending.filter(pk__in=ids).update(notified_at=now)
+    claimed = list(
+        ContactRequest.objects.filter(pk__in=ids, notified_at=now).order_by("date")
+    )
+    messages = [
+        digest_message(claimed[start : start + size])
+        for start in range(0, len(claimed), size)
+    ]
+    return messages, [contact_request.pk for contact_request in claimed]
+
+
+def submit(contact_request, now=None):
+    """
+    Saves a new contact request and returns the notifications to send for it.
+
+    The request is mailed on its own in immediate mode or when it is urgent,
+    and marked notified in the same insert. In digest mode, it is left
+    pending and the digest is returned if one is now due.
+
+    Parameters:
+    - contact_request (ContactRequest): The unsaved contact request.
+    - now (datetime): The current time; defaults to now.
+
+    Returns:
+    tuple: (list of EmailMessage, list of contact request ids) to pass to `deliver`.
+    """
+    now = now or timezone.now()
+    mode = getattr(settings, "CONTACT_NOTIFICATION_MODE", "immediate")
+    if mode != "digest" or is_urgent(contact_request):
+        contact_request.notified_at = now
+        contact_request.save()
+        return [contact_message(contact_request)], [contact_request.pk]
+    contact_request.save()
+    return collect_digest(now)
+
+
+def deliver(messages, contact_request_ids):
+    """
+    Sends notification emails over one connection.
+
+    If sending fails, the contact requests are marked pending again, to be
+    included in the next digest.
+
+    Parameters:
+    - messages (list): The EmailMessage objects to send.
+    - contact_request_ids (list): The ids of the contact requests notified.
+
+    Returns:
+    int: The number of emails sent.
+    """
+    if not messages:
+        return 0
+    try:
+        return get_connection(fail_silently=False).send_messages(messages)
+    except Exception:
+        ContactRequest.objects.filter(pk__in=contact_request_ids).update(
+            notified_at=None
+        )
+        logger.exception("Error sending contact notifications")
+        return 0
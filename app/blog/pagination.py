@@ -0,0 +1,121 @@
+"""
+Paginators that do not count the rows of the listings they paginate.
+"""
+import base64
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.paginator import Paginator
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator taking the number of objects from a materialized count instead
+    of running COUNT(*) over the object list.
+
+    Attributes:
+    - count (int): The total number of objects, given by the caller.
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        # Overrides the cached property computing the count.
+        self.__dict__["count"] = count
+
+
+class InvalidCursor(Exception):
+    """
+    Raised when a pagination cursor cannot be decoded.
+    """
+
+
+def encode_cursor(moment, pk):
+    """
+    Encodes the position after an object as an opaque URL-safe cursor.
+
+    Parameters:
+    - moment (datetime): The object's value of the ordering datetime.
+    - pk (int): The object's primary key, breaking ties between equal datetimes.
+
+    Returns:
+    str: The cursor.
+    """
+    micros = round(moment.timestamp() * 1_000_000)
+    return base64.urlsafe_b64encode(f"{micros}.{pk}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Returns:
+    tuple: The (datetime, pk) position.
+
+    Raises:
+    InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        micros, pk = raw.split(".")
+        moment = datetime.fromtimestamp(int(micros) / 1_000_000, tz=dt_timezone.utc)
+        return moment, int(pk)
+    except (ValueError, OverflowError, OSError, UnicodeDecodeError) as error:
+        raise InvalidCursor(cursor) from error
+
+
+class CursorPage:
+    """
+    One page of a cursor paginated listing.
+
+    Attributes:
+    - object_list (list): The objects of the page.
+    - next_cursor (str): The cursor of the following page, or None on the last page.
+    """
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class CursorPaginator:
+    """
+    Keyset paginator over a queryset in descending (datetime, pk) order.
+
+    Each page is a single index range seek starting after the previous page,
+    so deep pages cost the same as the first one and no COUNT is needed.
+
+    Attributes:
+    - queryset (QuerySet): The objects to paginate, in any order.
+    - per_page (int): The number of objects per page.
+    - field (str): The datetime field the objects are ordered by.
+    """
+
+    def __init__(self, queryset, per_page, field):
+        self.queryset = queryset.order_by(f"-{field}", "-pk")
+        self.per_page = per_page
+        self.field = field
+
+    def page(self, cursor=None):
+        """
+        Returns the page after `cursor`, or the first page.
+
+        Raises:
+        InvalidCursor: If the cursor is malformed.
+        """
+        queryset = self.queryset
+        if cursor:
+            moment, pk = decode_cursor(cursor)
+            # The inclusive bound alone is what the index range seek starts
+            # from; ties with the cursor are then excluded by primary key.
+            queryset = queryset.filter(**{f"{self.field}__lte": moment}).exclude(
+                **{self.field: moment, "pk__gte": pk}
+            )
+        objects = list(queryset[: self.per_page + 1])
+        next_cursor = None
+        if len(objects) > self.per_page:
+            objects = objects[: self.per_page]
+            last = objects[-1]
+            next_cursor = encode_cursor(getattr(last, self.field), last.pk)
+        return CursorPage(objects, next_cursor)
@@ -0,0 +1,97 @@
+"""
+Storage format of article revisions.
+
+A revision is stored either as a snapshot, the zlib-compressed text, or as a
+delta from the previous revision: the zlib-compressed JSON list of the
+operations rebuilding its lines from the previous revision's lines. An
+operation is either a `[start, end]` pair, copying those previous lines, or a
+string, inserting that line. Edits usually change a few lines of an article,
+so their deltas take a few hundred bytes whatever the article's length.
+"""
+import difflib
+import json
+import zlib
+
+COMPRESS_LEVEL = 9
+
+
+def encode_snapshot(text):
+    """
+    Returns the stored form of a full copy of `text`.
+    """
+    return zlib.compress(text.encode(), COMPRESS_LEVEL)
+
+
+def decode_snapshot(data):
+    """
+    Returns the text stored by `encode_snapshot`.
+    """
+    return zlib.decompress(data).decode()
+
+
+def encode_delta(old, new):
+    """
+    Returns the stored form of the changes turning `old` into `new`.
+
+    Parameters:
+    - old (str): The text of the previous revision.
+    - new (str): The text of the new revision.
+
+    Returns:
+    bytes: The compressed operations, see `decode_delta`.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    operations = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            operations.append([i1, i2])
+        else:
+            operations.extend(new_lines[j1:j2])
+    return zlib.compress(
+        json.dumps(operations, separators=(",", ":")).encode(), COMPRESS_LEVEL
+    )
+
+
+def decode_delta(old, data):
+    """
+    Applies stored changes to the text of the previous revision.
+
+    Parameters:
+    - old (str): The text of the previous revision.
+    - data (bytes): The changes, as returned by `encode_delta`.
+
+    Returns:
+    str: The text of the revision.
+    """
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for operation in json.loads(zlib.decompress(data)):
+        if isinstance(operation, str):
+            parts.append(operation)
+        else:
+            parts.extend(old_lines[operation[0] : operation[1]])
+    return "".join(parts)
+
+
+def unified_diff(old, new, old_name="", new_name="", context=3):
+    """
+    Returns the lines of a unified diff between two texts, each with the
+    kind of line it is: "header", "hunk", "added", "removed" or "context".
+    """
+    lines = difflib.unified_diff(
+        old.splitlines(), new.splitlines(), old_name, new_name, lineterm="", n=context
+    )
+    for index, line in enumerate(lines):
+        if index < 2:
+            kind = "header"
+        elif line.startswith("@@"):
+            kind = "hunk"
+        elif line.startswith("+"):
+            kind = "added"
+        elif line.startswith("-"):
+            kind = "removed"
+        else:
+            kind = "context"
+        yield kind, line
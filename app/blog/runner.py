@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from contextlib import ExitStack
+
+from django.core.cache import caches
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from .benchmarking import temporary_caches
+
+
+class ClearCachesResult:
+    """
+    Test result mixin clearing every cache before each test, so that no test
+    is served pages cached by an earlier one.
+    """
+
+    def startTest(self, test):
+        for cache in caches.all():
+            cache.clear()
+        super().startTest(test)
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Test runner giving the test run scratch caches, metrics and load shedding
+    directories in temporary directories, so that `manage.py test` never
+    writes to the cache file, the metrics or the request slots of the site.
+    The caches are cleared before each test.
+    """
+
+    def get_resultclass(self):
+        resultclass = super().get_resultclass() or unittest.TextTestResult
+        return type(resultclass.__name__, (ClearCachesResult, resultclass), {})
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._resources = ExitStack()
+        self._resources.enter_context(temporary_caches())
+        directory = self._resources.enter_context(tempfile.TemporaryDirectory())
+        self._resources.enter_context(
+            override_settings(
+                METRICS_DIR=directory,
+                LOAD_SHEDDING_DIR=os.path.join(directory, "shedding"),
+            )
+        )
+
+    def teardown_test_environment(self, **kwargs):
+        self._resources.close()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,592 @@
+"""
+Synthetic data generation for large, realistic blog databases.
+
+Rows are generated in chunks, optionally in a process pool, and written with
+`executemany()` inside a single transaction, with the secondary indexes of the
+loaded tables dropped until the end. Model `save()`
+methods and signals are bypassed, so slugs are generated up front and are made
+unique by suffixing the row index, and the listing counts are added up from
+the generated rows.
+"""
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from itertools import accumulate
+
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .caching import invalidate_pages
+from .models import (
+    COMMENT_MAX_DEPTH,
+    COMMENT_PATH_STEP,
+    ArchiveMonth,
+    Article,
+    AuthorStats,
+    Comment,
+    ContactRequest,
+    Tag,
+    comment_path_segment,
+)
+
+WORDS = (
+    "performance cache query index latency throughput database template render "
+    "request response server client article author editor publish draft review "
+    "python django sqlite worker process thread memory disk network benchmark "
+    "profile metric histogram percentile bottleneck optimize measure deploy "
+    "release feature bug fix refactor design pattern module package function "
+    "class method object value string number list map set queue stack tree "
+    "graph node edge path search sort merge split join filter reduce stream "
+    "buffer batch chunk page slug title content comment tag archive month year "
+    "the a an of to in on for with and or but not is are was were be been this "
+    "that these those it its we our you your they their from by at as into over "
+    "under between through during before after above below again further then "
+    "once here there when where why how all any both each few more most other "
+    "some such only own same so than too very can will just should now"
+).split()
+
+FIRST_NAMES = (
+    "Anna Ben Clara David Elena Farid Greta Hugo Iris Jonas Kira Leon Mira Nils "
+    "Olga Paul Rosa Sami Tara Uwe Vera Willi Yara Zoe"
+).split()
+
+LAST_NAMES = (
+    "Bauer Cohen Demir Eriksen Fischer Garcia Hoffmann Ito Jensen Klein Lopez "
+    "Meyer Novak Okafor Petrov Quinn Rossi Schmidt Tanaka Urban Vogel Weber"
+).split()
+
+PARAGRAPH_POOL_SIZE = 512
+
+# Article bodies follow a log-normal distribution of paragraph counts: most
+# articles are a few paragraphs long with a long tail of very long ones.
+PARAGRAPHS_MU = 1.2
+PARAGRAPHS_SIGMA = 0.7
+MAX_PARAGRAPHS = 60
+
+
+def _sentence(rng, length):
+    words = rng.choices(WORDS, k=length)
+    return " ".join(words).capitalize() + "."
+
+
+@lru_cache(maxsize=None)
+def _paragraph_pool(seed):
+    rng = random.Random(seed)
+    return [
+        " ".join(_sentence(rng, rng.randint(6, 18)) for _ in range(rng.randint(3, 7)))
+        for _ in range(PARAGRAPH_POOL_SIZE)
+    ]
+
+
+# Each article gets between none and this many tags.
+MAX_TAGS_PER_ARTICLE = 3
+
+
+def _cumulative_zipf_weights(count):
+    # Zipf-like: a few prolific authors write most of the articles, and a few
+    # popular tags are on most of them.
+    return list(accumulate(1 / (rank + 1) for rank in range(count)))
+
+
+def generate_articles(start, count, seed, author_ids, online_ratio, days, now):
+    """
+    Generates `count` article rows starting at row index `start`.
+
+    The function only depends on its arguments, so chunks can be generated in
+    worker processes and the output is reproducible for a given seed.
+
+    Parameters:
+    - start (int): Index of the first row, used to make slugs unique.
+    - count (int): Number of rows to generate.
+    - seed (int): Random seed of the whole run.
+    - author_ids (list): Primary keys of the users to attribute articles to.
+    - online_ratio (float): Fraction of articles that are online.
+    - days (int): Publication dates are spread over this many days before `now`.
+    - now (datetime): Aware datetime of the most recent possible publication.
+
+    Returns:
+    list: (title, slug, content, author_id, publication_datetime, is_online,
+    modified_datetime, is_listed) tuples.
+    """
+    rng = random.Random(seed * 1_000_003 + start)
+    paragraphs = _paragraph_pool(seed)
+    cum_weights = _cumulative_zipf_weights(len(author_ids))
+    authors = rng.choices(author_ids, cum_weights=cum_weights, k=count)
+    span = days * 86400
+    rows = []
+    for offset in range(count):
+        index = start + offset
+        words = rng.choices(WORDS, k=rng.randint(3, 9))
+        title = " ".join(words).capitalize()
+        # The vocabulary is lowercase ASCII, so joining the words is a valid slug.
+        slug = f"{'-'.join(words)[:40].rstrip('-')}-{index}"
+        paragraph_count = min(
+            MAX_PARAGRAPHS,
+            max(1, int(rng.lognormvariate(PARAGRAPHS_MU, PARAGRAPHS_SIGMA))),
+        )
+        content = "\n\n".join(rng.choices(paragraphs, k=paragraph_count))
+        published = now - timedelta(seconds=rng.random() * span)
+        online = rng.random() < online_ratio
+        rows.append(
+            (
+                title,
+                slug,
+                content,
+                authors[offset],
+                published,
+                online,
+                published,
+                online,
+            )
+        )
+    return rows
+
+
+def generate_article_tags(article_ids, tag_ids, seed):
+    """
+    Generates the tag links of the given articles.
+
+    Parameters:
+    - article_ids (list): Primary keys of the articles to tag.
+    - tag_ids (list): Primary keys of the tags, most popular first.
+    - seed (int): Random seed of the whole run.
+
+    Returns:
+    list: (article_id, tag_id) tuples, without duplicates.
+    """
+    rng = random.Random(seed * 1_000_037 + article_ids[0])
+    cum_weights = _cumulative_zipf_weights(len(tag_ids))
+    rows = []
+    for article_id in article_ids:
+        count = rng.randint(0, min(MAX_TAGS_PER_ARTICLE, len(tag_ids)))
+        chosen = set(rng.choices(tag_ids, cum_weights=cum_weights, k=count))
+        rows.extend((article_id, tag_id) for tag_id in sorted(chosen))
+    return rows
+
+
+def generate_comments(article_id, first_pk, count, seed, now):
+    """
+    Generates a discussion of `count` approved comments on one article.
+
+    Comments get explicit primary keys from `first_pk` on, so that replies can
+    reference their parent and extend its path. About a third start a new
+    thread; the others reply to a recent comment, nesting up to
+    COMMENT_MAX_DEPTH levels.
+
+    Returns:
+    list: (id, article_id, parent_id, path, email, name, content, date,
+    is_approved) tuples.
+    """
+    rng = random.Random(seed * 1_000_039 + first_pk)
+    start = now - timedelta(seconds=count)
+    paths = []
+    rows = []
+    for offset in range(count):
+        date = start + timedelta(seconds=offset)
+        parent = None
+        if offset and rng.random() < 0.7:
+            parent = max(0, offset - 1 - int(rng.expovariate(0.2)))
+            if len(paths[parent]) // COMMENT_PATH_STEP >= COMMENT_MAX_DEPTH:
+                parent = None
+        path = (paths[parent] if parent is not None else "") + comment_path_segment(
+            date
+        )
+        paths.append(path)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        content = " ".join(
+            _sentence(rng, rng.randint(5, 20)) for _ in range(rng.randint(1, 4))
+        )
+        rows.append(
+            (
+                first_pk + offset,
+                article_id,
+                first_pk + parent if parent is not None else None,
+                path,
+                f"{first}.{last}.{first_pk + offset}@example.com".lower(),
+                f"{first} {last}",
+                content,
+                date,
+                True,
+            )
+        )
+    return rows
+
+
+def generate_contact_requests(start, count, seed, days, now):
+    """
+    Generates `count` contact request rows starting at row index `start`.
+
+    Returns:
+    list: (email, name, content, date, notified_at) tuples; the requests are
+    marked notified when they were made.
+    """
+    rng = random.Random(seed * 1_000_033 + start)
+    span = days * 86400
+    rows = []
+    for offset in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        content = " ".join(
+            _sentence(rng, rng.randint(5, 20)) for _ in range(rng.randint(1, 6))
+        )
+        date = now - timedelta(seconds=rng.random() * span)
+        rows.append(
+            (
+                f"{first}.{last}.{start + offset}@example.com".lower(),
+                f"{first} {last}",
+                content,
+                date,
+                date,
+            )
+        )
+    return rows
+
+
+def _generate(args):
+    """
+    Generates one chunk of rows. Articles are given the primary keys following
+    `start`, so that their tag links are generated along with them.
+
+    Returns:
+    tuple: (rows, tag link rows).
+    """
+    kind, (start, count, seed, *arguments) = args
+    if kind == "contact":
+        return generate_contact_requests(start, count, seed, *arguments), []
+    tag_ids, *arguments = arguments
+    article_ids = range(start, start + count)
+    rows = generate_articles(start, count, seed, *arguments)
+    links = generate_article_tags(article_ids, tag_ids, seed) if tag_ids else []
+    return [(pk, *row) for pk, row in zip(article_ids, rows)], links
+
+
+def bulk_insert(model, field_names, rows, using=DEFAULT_DB_ALIAS):
+    """
+    Inserts raw row tuples into the table of `model`.
+
+    Datetime values are adapted for the database; all other values must
+    already be in their database representation.
+
+    Parameters:
+    - model (Model): The model whose table receives the rows.
+    - field_names (list): The model field names, in row tuple order.
+    - rows (list): The rows to insert.
+    - using (str): The database alias.
+    """
+    connection = connections[using]
+    fields = [model._meta.get_field(name) for name in field_names]
+    quote = connection.ops.quote_name
+    sql = "INSERT INTO %s (%s) VALUES (%s)" % (
+        quote(model._meta.db_table),
+        ", ".join(quote(field.column) for field in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+    datetime_positions = [
+        position
+        for position, field in enumerate(fields)
+        if field.get_internal_type() == "DateTimeField"
+    ]
+    if datetime_positions:
+        adapt = connection.ops.adapt_datetimefield_value
+        adapted = []
+        for row in rows:
+            row = list(row)
+            # Rows often repeat a datetime, e.g. an article's publication and
+            # modification times, which is then adapted once.
+            last = value = None
+            for position in datetime_positions:
+                if row[position] is not last:
+                    last, value = row[position], adapt(row[position])
+                row[position] = value
+            adapted.append(row)
+        rows = adapted
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+@contextmanager
+def deferred_indexes(models, using=DEFAULT_DB_ALIAS):
+    """
+    Drops the secondary indexes of the tables of `models` for the duration of
+    a bulk load and creates them again afterwards, so that each is built in
+    one pass over the loaded rows instead of being updated row by row.
+    Dropped unique indexes are checked again when they are recreated; primary
+    keys and unique constraints declared with the table are kept. It must be
+    used inside a transaction, which restores the indexes if the load fails.
+
+    Parameters:
+    - models (list): The models whose tables are loaded.
+    - using (str): The database alias.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    indexes = []
+    with connection.cursor() as cursor:
+        for model in models:
+            table = model._meta.db_table
+            constraints = connection.introspection.get_constraints(cursor, table)
+            indexes += [
+                (name, table, constraint["columns"], constraint["unique"])
+                for name, constraint in constraints.items()
+                if constraint["index"] and not constraint["primary_key"]
+            ]
+        for name, *_ in indexes:
+            cursor.execute("DROP INDEX %s" % quote(name))
+    yield
+    with connection.cursor() as cursor:
+        for name, table, columns, unique in indexes:
+            cursor.execute(
+                "CREATE %sINDEX %s ON %s (%s)"
+                % (
+                    "UNIQUE " if unique else "",
+                    quote(name),
+                    quote(table),
+                    ", ".join(map(quote, columns)),
+                )
+            )
+
+
+def _chunks(kind, total, start, batch_size, extra):
+    for offset in range(0, total, batch_size):
+        count = min(batch_size, total - offset)
+        yield kind, (start + offset, count, *extra)
+
+
+def _run(tasks, processes):
+    """
+    Yields the generated chunks in order, in a process pool when requested.
+    """
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            yield from executor.map(_generate, tasks)
+    else:
+        yield from map(_generate, tasks)
+
+
+def add_listing_counts(months, authors, tags):
+    """
+    Adds bulk loaded listed articles to the materialized listing counts, like
+    `Article.update_listing_counts` does for a single article, with one
+    update per month, author and tag instead of recounting every article.
+
+    Parameters:
+    - months (Counter): Listed articles per (year, month), in the current time zone.
+    - authors (Counter): Listed articles per author id.
+    - tags (Counter): Listed articles per tag id.
+    """
+    for (year, month), count in months.items():
+        ArchiveMonth.adjust(timezone.make_aware(datetime(year, month, 1)), count)
+    for author_id, count in authors.items():
+        AuthorStats.adjust(author_id, count)
+    for tag_id, count in tags.items():
+        Tag.adjust([tag_id], count)
+
+
+def seed_users(count):
+    """
+    Creates `count` users with unusable passwords.
+
+    Returns:
+    list: The primary keys of all seeded users, including earlier runs.
+    """
+    first_index = (User.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+    users = []
+    for index in range(first_index, first_index + count):
+        users.append(
+            User(
+                username=f"seed-user-{index}",
+                first_name=FIRST_NAMES[index % len(FIRST_NAMES)],
+                last_name=LAST_NAMES[index % len(LAST_NAMES)],
+                email=f"seed-user-{index}@example.com",
+                password="!",
+            )
+        )
+    User.objects.bulk_create(users, batch_size=1000)
+    return list(
+        User.objects.filter(username__startswith="seed-user-")
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def seed_tags(count):
+    """
+    Creates `count` tags named after the vocabulary.
+
+    Returns:
+    list: The primary keys of all tags, including earlier runs.
+    """
+    vocabulary = sorted(set(WORDS))
+    first_index = (Tag.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+    tags = []
+    for index in range(first_index, first_index + count):
+        word = vocabulary[index % len(vocabulary)]
+        name = f"{word}-{index}"
+        tags.append(Tag(name=name, slug=name))
+    Tag.objects.bulk_create(tags, batch_size=1000)
+    return list(Tag.objects.order_by("pk").values_list("pk", flat=True))
+
+
+def seed_comments(article_id, count, seed=0, batch_size=10_000):
+    """
+    Adds a discussion of `count` approved comments to an article.
+
+    Model `save()` methods and signals are bypassed, so callers must
+    invalidate the cached pages.
+    """
+    now = datetime.now(dt_timezone.utc)
+    first_pk = (Comment.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+    rows = generate_comments(article_id, first_pk, count, seed, now)
+    field_names = ["id", "article", "parent", "path", "email", "name", "content"]
+    field_names += ["date", "is_approved"]
+    with transaction.atomic():
+        for offset in range(0, len(rows), batch_size):
+            bulk_insert(Comment, field_names, rows[offset : offset + batch_size])
+
+
+def seed(
+    users=0,
+    articles=0,
+    tags=0,
+    comments=0,
+    contact_requests=0,
+    online_ratio=0.85,
+    days=5 * 365,
+    processes=0,
+    batch_size=10_000,
+    seed=0,
+    stdout=None,
+):
+    """
+    Populates the database with synthetic users, articles and contact requests.
+
+    Parameters:
+    - users (int): Number of users to create.
+    - articles (int): Number of articles to create.
+    - tags (int): Number of tags to create and spread over the new articles.
+    - comments (int): Number of comments to add as one discussion under the
+      most recent listed article.
+    - contact_requests (int): Number of contact requests to create.
+    - online_ratio (float): Fraction of articles that are online.
+    - days (int): Dates are spread over this many days before now.
+    - processes (int): Size of the generating process pool; 0 or 1 generates in-process.
+    - batch_size (int): Number of rows generated and inserted per chunk.
+    - seed (int): Random seed, making runs reproducible.
+    - stdout (OutputWrapper): Optional stream for progress messages.
+
+    Returns:
+    dict: The number of rows created per model.
+    """
+    now = datetime.now(dt_timezone.utc)
+
+    def progress(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    loaded = [Article, Article.tags.through, ContactRequest]
+    with transaction.atomic(), deferred_indexes(loaded if articles else []):
+        author_ids = seed_users(users) if users else []
+        if articles and not author_ids:
+            author_ids = list(User.objects.order_by("pk").values_list("pk", flat=True))
+            if not author_ids:
+                author_ids = seed_users(1)
+
+        tag_ids = seed_tags(tags) if articles and tags else []
+        if tag_ids:
+            progress(f"tags: {tags}")
+
+        tasks = []
+        last_article = Article.objects.aggregate(last=Max("pk"))["last"] or 0
+        if articles:
+            tasks += _chunks(
+                "article",
+                articles,
+                last_article + 1,
+                batch_size,
+                (seed, tag_ids, author_ids, online_ratio, days, now),
+            )
+        if contact_requests:
+            first_index = (
+                ContactRequest.objects.aggregate(last=Max("pk"))["last"] or 0
+            ) + 1
+            tasks += _chunks(
+                "contact", contact_requests, first_index, batch_size, (seed, days, now)
+            )
+
+        months, authors, tags_used = Counter(), Counter(), Counter()
+        local_timezone = timezone.get_current_timezone()
+        done = {"article": 0, "contact": 0}
+        totals = {"article": articles, "contact": contact_requests}
+        for (kind, _), (rows, links) in zip(tasks, _run(tasks, processes)):
+            if kind == "article":
+                bulk_insert(
+                    Article,
+                    [
+                        "id",
+                        "title",
+                        "slug",
+                        "content",
+                        "author",
+                        "publication_datetime",
+                        "is_online",
+                        "modified_datetime",
+                        "is_listed",
+                    ],
+                    rows,
+                )
+                bulk_insert(Article.tags.through, ["article", "tag"], links)
+                listed_ids = set()
+                for row in rows:
+                    if row[8]:
+                        listed_ids.add(row[0])
+                        published = row[5].astimezone(local_timezone)
+                        months[published.year, published.month] += 1
+                        authors[row[4]] += 1
+                tags_used.update(tag for article, tag in links if article in listed_ids)
+            else:
+                bulk_insert(
+                    ContactRequest,
+                    ["email", "name", "content", "date", "notified_at"],
+                    rows,
+                )
+            done[kind] += len(rows)
+            progress(f"{kind}: {done[kind]}/{totals[kind]}")
+
+        # Explicit primary keys leave the sequences of some databases behind.
+        connection = connections[DEFAULT_DB_ALIAS]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Article]):
+                cursor.execute(sql)
+
+        # The inserts bypass the model logic maintaining the listing counts.
+        add_listing_counts(months, authors, tags_used)
+
+    if comments:
+        article_id = (
+            Article.objects.listed()
+            .order_by("-publication_datetime")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if article_id is not None:
+            seed_comments(article_id, comments, seed, batch_size)
+            progress(f"comment: {comments}/{comments}")
+        else:
+            comments = 0
+
+    # The inserts also bypass the signals that normally invalidate cached pages.
+    if articles or comments:
+        invalidate_pages()
+
+    return {
+        "users": users,
+        "articles": articles,
+        "tags": tags if articles else 0,
+        "comments": comments,
+        "contact_requests": contact_requests,
+    }
@@ -0,0 +1,349 @@
+"""
+Per-route concurrency limits for `LoadSheddingMiddleware`.
+
+Every request runs in one of the slot pools configured in
+LOAD_SHEDDING_POOLS, chosen by the first matching rule of
+LOAD_SHEDDING_ROUTES. A pool admits `limit` concurrent requests. Beyond that,
+at most `max_queue` requests wait up to `queue_timeout` seconds for a slot,
+and all others are shed at once, so that a burst on one route (e.g. contact
+form posts waiting on the SQLite write lock) cannot pile up and slow down the
+others.
+
+Pools are shared by all the worker processes of the machine through one file
+per pool in LOAD_SHEDDING_DIR. Every slot and queue place is a byte of the
+file, taken with a POSIX record lock (`fcntl.lockf`); the kernel releases the
+locks of a process when it exits, so the slots of a crashed worker are free
+again at once. The admitted, queued and shed counters are kept at the start
+of the file and exported through the metrics registry. Like the cache
+backend, this only runs on POSIX systems.
+"""
+import fcntl
+import os
+import struct
+import tempfile
+import threading
+import time
+from fnmatch import fnmatchcase
+
+from django.conf import settings
+
+from .metrics import registry
+
+DEFAULT_POOL = {"limit": 16, "max_queue": 32, "queue_timeout": 1.0, "retry_after": 1}
+
+# How often a queued request looks for a free slot, in seconds.
+POLL_INTERVAL = 0.01
+
+# The admitted, queued and shed counters start the file. Slot `i` is the byte
+# at SLOTS_OFFSET + i and queue place `i` the byte at QUEUE_OFFSET + i; record
+# locks may lie past the end of the file, so these bytes are never written.
+COUNTERS = struct.Struct("<3q")
+ADMITTED, QUEUED, SHED = range(3)
+SLOTS_OFFSET = 4096
+QUEUE_OFFSET = 1 << 30
+
+# One open pool file per path and process, shared by the threads.
+_files = {}
+_files_lock = threading.Lock()
+
+
+class _PoolFile:
+    """
+    An open pool file and the bytes this process holds locked in it.
+
+    Record locks belong to the process, so the threads of a process would not
+    exclude each other: they only lock bytes while holding `lock` and share
+    the bytes they hold in `held`. The file is never closed, since closing any
+    descriptor of it would drop all the locks of the process.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self.lock = threading.Lock()
+        self.held = set()
+
+    def try_lock(self, start, stop):
+        """
+        Locks the first byte of [start, stop) that no process holds.
+
+        Returns:
+        int: The offset of the locked byte, or None if all are held.
+        """
+        for offset in range(start, stop):
+            if offset in self.held:
+                continue
+            try:
+                fcntl.lockf(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, offset)
+            except OSError:
+                continue
+            self.held.add(offset)
+            return offset
+        return None
+
+    def unlock(self, offset):
+        fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, offset)
+        self.held.discard(offset)
+
+    def count_locked(self, start, stop):
+        """
+        Returns the number of bytes of [start, stop) held by any process.
+        """
+        count = 0
+        for offset in range(start, stop):
+            if offset not in self.held:
+                try:
+                    fcntl.lockf(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, offset)
+                except OSError:
+                    pass
+                else:
+                    fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, offset)
+                    continue
+            count += 1
+        return count
+
+    def counters(self):
+        fcntl.lockf(self.fd, fcntl.LOCK_SH, COUNTERS.size, 0)
+        try:
+            data = os.pread(self.fd, COUNTERS.size, 0)
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, COUNTERS.size, 0)
+        return COUNTERS.unpack(data) if len(data) == COUNTERS.size else (0, 0, 0)
+
+    def increment(self, counter):
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, COUNTERS.size, 0)
+        try:
+            data = os.pread(self.fd, COUNTERS.size, 0)
+            values = [0, 0, 0]
+            if len(data) == COUNTERS.size:
+                values = list(COUNTERS.unpack(data))
+            values[counter] += 1
+            os.pwrite(self.fd, COUNTERS.pack(*values), 0)
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, COUNTERS.size, 0)
+
+
+def _get_file(path):
+    key = (path, os.getpid())
+    with _files_lock:
+        pool_file = _files.get(key)
+        if pool_file is None:
+            pool_file = _files[key] = _PoolFile(path)
+        return pool_file
+
+
+def _directory():
+    """
+    Returns LOAD_SHEDDING_DIR, the directory holding the pool files.
+    """
+    return str(
+        getattr(
+            settings,
+            "LOAD_SHEDDING_DIR",
+            os.path.join(tempfile.gettempdir(), "mirblog-shedding"),
+        )
+    )
+
+
+class SlotPool:
+    """
+    A bounded number of request slots with a bounded, time-limited queue,
+    shared by every process using the same pool file.
+
+    Attributes:
+    - name (str): The name of the pool.
+    - limit (int): The number of requests handled at the same time.
+    - max_queue (int): The number of requests allowed to wait for a slot.
+    - queue_timeout (float): How long a request may wait for a slot, in seconds.
+    - retry_after (int): The Retry-After value sent with shed requests, in seconds.
+    - path (str): The pool file, `<directory>/<name>.slots`.
+    - admitted (int): The number of requests given a slot.
+    - queued (int): The number of requests that had to wait for a slot.
+    - shed (int): The number of requests refused a slot.
+    - waiting (int): The number of requests waiting for a slot now.
+    - in_flight (int): The number of requests holding a slot now.
+    """
+
+    def __init__(
+        self,
+        name,
+        limit,
+        max_queue=0,
+        queue_timeout=0.0,
+        retry_after=1,
+        directory=None,
+    ):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.path = os.path.join(directory or _directory(), f"{name}.slots")
+
+    @property
+    def file(self):
+        return _get_file(self.path)
+
+    def acquire(self):
+        """
+        Takes a slot, waiting for one if the queue has room.
+
+        Returns:
+        int: The slot taken, to be passed to `release`, or None if the
+        request is shed.
+        """
+        pool_file = self.file
+        slots = (SLOTS_OFFSET, SLOTS_OFFSET + self.limit)
+        place = None
+        with pool_file.lock:
+            slot = pool_file.try_lock(*slots)
+            if slot is None and self.queue_timeout > 0:
+                place = pool_file.try_lock(QUEUE_OFFSET, QUEUE_OFFSET + self.max_queue)
+            if slot is not None:
+                pool_file.increment(ADMITTED)
+            else:
+                pool_file.increment(SHED if place is None else QUEUED)
+        if place is None:
+            return slot
+        deadline = time.monotonic() + self.queue_timeout
+        while slot is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(POLL_INTERVAL, remaining))
+            with pool_file.lock:
+                slot = pool_file.try_lock(*slots)
+        with pool_file.lock:
+            pool_file.unlock(place)
+            pool_file.increment(SHED if slot is None else ADMITTED)
+        return slot
+
+    def release(self, slot):
+        pool_file = self.file
+        with pool_file.lock:
+            pool_file.unlock(slot)
+
+    def counter(self, counter):
+        pool_file = self.file
+        with pool_file.lock:
+            return pool_file.counters()[counter]
+
+    @property
+    def admitted(self):
+        return self.counter(ADMITTED)
+
+    @property
+    def queued(self):
+        return self.counter(QUEUED)
+
+    @property
+    def shed(self):
+        return self.counter(SHED)
+
+    @property
+    def waiting(self):
+        pool_file = self.file
+        with pool_file.lock:
+            return pool_file.count_locked(QUEUE_OFFSET, QUEUE_OFFSET + self.max_queue)
+
+    @property
+    def in_flight(self):
+        pool_file = self.file
+        with pool_file.lock:
+            return pool_file.count_locked(SLOTS_OFFSET, SLOTS_OFFSET + self.limit)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name):
+    """
+    Returns the pool `name` configured in LOAD_SHEDDING_POOLS, creating it on
+    first use and again when its configuration or LOAD_SHEDDING_DIR changes.
+    """
+    options = {
+        **DEFAULT_POOL,
+        **getattr(settings, "LOAD_SHEDDING_POOLS", {})[name],
+        "directory": _directory(),
+    }
+    with _pools_lock:
+        pool, pool_options = _pools.get(name, (None, None))
+        if pool is None or pool_options != options:
+            pool = SlotPool(name, **options)
+            _pools[name] = (pool, options)
+        return pool
+
+
+def pool_name(match, method):
+    """
+    Returns the name of the pool a request runs in.
+
+    Parameters:
+    - match (ResolverMatch): The resolved URL, or None when it did not resolve.
+    - method (str): The HTTP method of the request.
+
+    Returns:
+    str: The pool of the first LOAD_SHEDDING_ROUTES rule matching the view
+    name and method, or LOAD_SHEDDING_DEFAULT_POOL.
+    """
+    view_name = match.view_name if match else ""
+    for pattern, methods, name in getattr(settings, "LOAD_SHEDDING_ROUTES", ()):
+        if methods and method not in methods:
+            continue
+        if fnmatchcase(view_name, pattern):
+            return name
+    return getattr(settings, "LOAD_SHEDDING_DEFAULT_POOL", "default")
+
+
+# Counters and gauges exported for every pool.
+POOL_METRICS = (
+    (
+        "admitted",
+        "blog_load_shedding_admitted_total",
+        "counter",
+        "Requests given a slot, by pool.",
+    ),
+    (
+        "queued",
+        "blog_load_shedding_queued_total",
+        "counter",
+        "Requests that waited for a slot, by pool.",
+    ),
+    (
+        "shed",
+        "blog_load_shedding_shed_total",
+        "counter",
+        "Requests refused with a 503, by pool.",
+    ),
+    (
+        "waiting",
+        "blog_load_shedding_waiting",
+        "gauge",
+        "Requests waiting for a slot, by pool.",
+    ),
+    (
+        "in_flight",
+        "blog_load_shedding_in_flight",
+        "gauge",
+        "Requests holding a slot, by pool.",
+    ),
+)
+
+
+def collect():
+    """
+    Returns the counters of the configured pools, as shared by all the worker
+    processes, in the Prometheus text exposition format.
+    """
+    names = sorted(getattr(settings, "LOAD_SHEDDING_POOLS", {}))
+    pools = [(name, get_pool(name)) for name in names]
+    lines = []
+    for attribute, metric, kind, help_text in POOL_METRICS:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        for name, pool in pools:
+            lines.append(f'{metric}{{pool="{name}"}} {getattr(pool, attribute)}')
+    return lines
+
+
+registry.register_collector(collect)
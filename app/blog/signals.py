@@ -0,0 +1,138 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .caching import invalidate_pages_on_commit
+from .models import Article, ArticleRevision, Comment, Tag
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_article_pages(sender, **kwargs):
+    """
+    Invalidates the cached article pages whenever an article or tag changes,
+    once the change is committed.
+    """
+    invalidate_pages_on_commit()
+
+
+@receiver(post_save, sender=Article)
+def record_article_revision(sender, instance, update_fields, **kwargs):
+    """
+    Records a revision of a saved article whose title or content may have
+    changed. It runs in the transaction of `Article.save`.
+    """
+    if update_fields is not None and not {"title", "content"} & update_fields:
+        return
+    ArticleRevision.objects.record(instance)
+
+
+@receiver(pre_delete, sender=Article)
+def update_listing_counts_on_delete(sender, instance, **kwargs):
+    """
+    Removes a deleted, listed article from the listing counts.
+
+    It runs before the deletion, while the article's tags can still be read.
+    """
+    if instance.is_listed:
+        instance.update_listing_counts(-1)
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_tag_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keeps the tag counts up to date when tags are added to or removed from
+    listed articles, from either side of the relation.
+
+    Removals are counted before they happen, since only then it is known
+    which of the given rows exist.
+    """
+    links = sender.objects.all()
+    if reverse:
+        links = links.filter(tag=instance)
+    else:
+        links = links.filter(article=instance)
+
+    if action in ("pre_remove", "pre_clear"):
+        if pk_set is not None:
+            links = links.filter(**{"article__in" if reverse else "tag__in": pk_set})
+        if reverse:
+            Tag.adjust(
+                [instance.pk], -links.filter(article__is_listed__in=[True]).count()
+            )
+        elif instance.is_listed:
+            Tag.adjust(list(links.values_list("tag", flat=True)), -1)
+    elif action == "post_add":
+        if reverse:
+            listed = Article.objects.listed().filter(pk__in=pk_set).count()
+            Tag.adjust([instance.pk], listed)
+        elif instance.is_listed:
+            Tag.adjust(pk_set, 1)
+
+    if action.startswith("post_"):
+        invalidate_pages_on_commit()
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def touch_retagged_articles(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Marks the articles whose tags change modified, so that their validators
+    change as well. Removals are handled before they happen, while the
+    articles a tag is cleared from can still be read.
+    """
+    if action not in ("post_add", "pre_remove", "pre_clear") or pk_set == set():
+        return
+    if not reverse:
+        articles = Article.objects.filter(pk=instance.pk)
+    elif pk_set is None:
+        articles = instance.articles.all()
+    else:
+        articles = Article.objects.filter(pk__in=pk_set)
+    articles.touch()
+
+
+@receiver(post_save, sender=Tag)
+def touch_articles_of_renamed_tag(sender, instance, created, **kwargs):
+    """
+    Marks the articles with a changed tag modified, since their pages show
+    the tag's name and link.
+    """
+    if not created:
+        instance.articles.all().touch()
+
+
+@receiver(pre_delete, sender=Tag)
+def touch_articles_of_deleted_tag(sender, instance, **kwargs):
+    """
+    Like `touch_articles_of_renamed_tag`, for deleted tags. It runs before
+    the deletion, while the tag's articles can still be read.
+    """
+    instance.articles.all().touch()
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_comment_pages(sender, instance, created, **kwargs):
+    """
+    Marks the article modified and invalidates the cached pages when the
+    comments shown under it change. Posting a comment that awaits moderation
+    changes no page.
+    """
+    if created and not instance.is_approved:
+        return
+    Article.objects.filter(pk=instance.article_id).touch()
+    invalidate_pages_on_commit()
+
+
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages_on_delete(sender, instance, origin, **kwargs):
+    """
+    Like `invalidate_comment_pages`, for deleted approved comments. Comments
+    deleted along with their article are covered by the article's signals.
+    """
+    # `origin` is the instance or queryset delete() was called on.
+    if getattr(origin, "model", type(origin)) is not Comment:
+        return
+    if instance.is_approved:
+        Article.objects.filter(pk=instance.article_id).touch()
+        invalidate_pages_on_commit()
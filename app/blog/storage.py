@@ -0,0 +1,61 @@
+"""
+Static files storage fingerprinting and pre-compressing assets at collect time.
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+# Extensions of the text assets worth storing a gzipped copy of.
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg", ".txt", ".html", ".json", ".map")
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes a `.gz` copy of every
+    fingerprinted text asset during `collectstatic`.
+
+    Until `collectstatic` has written a manifest (e.g. in development and
+    tests), URLs fall back to the unhashed file names instead of failing.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = []
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if not isinstance(processed, Exception) and hashed_name:
+                hashed_names.append(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for hashed_name in hashed_names:
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        """
+        Writes a gzipped copy of `name` next to it, unless it would not be smaller.
+        """
+        with self.open(name) as original:
+            content = original.read()
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) >= len(content):
+            return
+        gz_name = f"{name}.gz"
+        if self.exists(gz_name):
+            self.delete(gz_name)
+        self._save(gz_name, ContentFile(compressed))
+
+    def is_fingerprinted(self, name):
+        """
+        Returns whether `name` is a hashed name listed in the manifest.
+        """
+        return name in self.hashed_files.values()
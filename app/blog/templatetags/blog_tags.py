@@ -0,0 +1,34 @@
+from django import template
+from django.conf import settings
+
+from blog.caching import get_generation, page_cache
+from blog.models import ArchiveMonth, Tag
+
+register = template.Library()
+
+
+@register.inclusion_tag("archive_sidebar.html")
+def archive_sidebar():
+    """
+    Renders the archive months with their article counts, newest first.
+
+    The counts come from the materialized ArchiveMonth table.
+    """
+    return {"months": ArchiveMonth.objects.filter(article_count__gt=0)}
+
+
+@register.inclusion_tag("tag_cloud.html")
+def tag_cloud():
+    """
+    Renders the tags with the most listed articles, weighted by their counts.
+
+    The counts come from the materialized Tag counts, and the cloud is cached
+    for the current page generation, which changes whenever a count does.
+    """
+    cache = page_cache()
+    key = f"blog:tag-cloud:{get_generation()}"
+    tags = cache.get(key)
+    if tags is None:
+        tags = Tag.cloud(getattr(settings, "TAG_CLOUD_SIZE", 50))
+        cache.set(key, tags, getattr(settings, "PAGE_CACHE_TIMEOUT", 600))
+    return {"tags": tags}
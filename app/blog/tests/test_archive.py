@@ -0,0 +1,197 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import ArchiveMonth, Article
+
+
+class ArchiveMonthTest(TestCase):
+    """
+    Test cases for the materialized monthly article counts.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+        )
+        self.article = Article.objects.create(
+            title="Archived Article",
+            content="Test content",
+            author=self.user,
+        )
+        local = timezone.localtime(self.article.publication_datetime)
+        self.year, self.month = local.year, local.month
+
+    def count(self, year=None, month=None):
+        row = ArchiveMonth.objects.filter(
+            year=year or self.year, month=month or self.month
+        ).first()
+        return row.article_count if row else 0
+
+    def test_create_and_delete_update_counts(self):
+        """
+        Test that creating and deleting listed articles updates the count.
+        """
+        self.assertEqual(self.count(), 1)
+        Article.objects.create(title="Second", content="Test", author=self.user)
+        self.assertEqual(self.count(), 2)
+        self.article.delete()
+        self.assertEqual(self.count(), 1)
+
+    def test_visibility_change_updates_counts(self):
+        """
+        Test that taking an article offline and back online updates the count.
+        """
+        self.article.is_online = False
+        self.article.save()
+        self.assertEqual(self.count(), 0)
+        self.article.is_online = True
+        self.article.save()
+        self.assertEqual(self.count(), 1)
+
+    def test_unchanged_save_keeps_counts(self):
+        """
+        Test that saving an article without moving it leaves the counts alone.
+        """
+        self.article.title = "Renamed"
+        self.article.save()
+        self.assertEqual(self.count(), 1)
+
+    def test_moving_an_article_moves_its_count(self):
+        """
+        Test that changing the publication date moves the article to its new month.
+        """
+        self.article.publication_datetime = datetime(
+            2020, 3, 15, tzinfo=dt_timezone.utc
+        )
+        self.article.save()
+        self.assertEqual(self.count(), 0)
+        self.assertEqual(self.count(2020, 3), 1)
+
+    def test_scheduled_articles_are_counted_when_published(self):
+        """
+        Test that a scheduled article is only counted once its publish time passes.
+        """
+        now = timezone.now()
+        scheduled = Article.objects.create(
+            title="Scheduled",
+            content="Test",
+            author=self.user,
+            publish_at=now + timedelta(hours=1),
+        )
+        self.assertFalse(scheduled.is_listed)
+        self.assertEqual(self.count(), 1)
+        self.assertEqual(Article.objects.sync_listed(now), 0)
+        self.assertEqual(Article.objects.sync_listed(now + timedelta(hours=2)), 1)
+        self.assertEqual(Article.objects.sync_listed(now + timedelta(hours=2)), 0)
+        self.assertEqual(self.count(), 2)
+
+    def test_rebuild_matches_incremental_counts(self):
+        """
+        Test that rebuilding the counts gives the incrementally maintained values.
+        """
+        Article.objects.create(title="Second", content="Test", author=self.user)
+        expected = list(
+            ArchiveMonth.objects.values_list("year", "month", "article_count")
+        )
+        ArchiveMonth.rebuild()
+        self.assertEqual(
+            list(ArchiveMonth.objects.values_list("year", "month", "article_count")),
+            expected,
+        )
+
+
+class ArticleArchiveViewTest(TestCase):
+    """
+    Test cases for the article archive views.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+        )
+        self.article = Article.objects.create(
+            title="March Article", content="Test content", author=self.user
+        )
+        self.article.publication_datetime = datetime(
+            2021, 3, 10, tzinfo=dt_timezone.utc
+        )
+        self.article.save()
+        Article.objects.create(
+            title="Current Article", content="Test content", author=self.user
+        )
+
+    def test_month_archive(self):
+        """
+        Test that the month archive lists the articles of that month only.
+        """
+        url = reverse("article_archive_month", kwargs={"year": 2021, "month": 3})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, "March Article")
+        self.assertNotContains(response, "Current Article")
+        self.assertEqual(response.context["paginator"].count, 1)
+        self.assertFalse(
+            any(
+                "COUNT(" in query["sql"] and "blog_article" in query["sql"]
+                for query in queries.captured_queries
+            )
+        )
+
+    def test_year_archive(self):
+        """
+        Test that the year archive lists the articles of the year.
+        """
+        response = self.client.get(
+            reverse("article_archive_year", kwargs={"year": 2021})
+        )
+        self.assertContains(response, "March Article")
+
+    def test_sidebar_lists_months_with_counts(self):
+        """
+        Test that the sidebar links each month with its article count.
+        """
+        response = self.client.get(reverse("article_list"))
+        self.assertContains(
+            response,
+            reverse("article_archive_month", kwargs={"year": 2021, "month": 3}),
+        )
+
+    def test_empty_and_invalid_periods_are_not_found(self):
+        """
+        Test that periods without articles and invalid months return 404.
+        """
+        for kwargs in (
+            {"year": 1999},
+            {"year": 2021, "month": 4},
+            {"year": 2021, "month": 13},
+        ):
+            name = (
+                "article_archive_month" if "month" in kwargs else "article_archive_year"
+            )
+            self.assertEqual(
+                self.client.get(reverse(name, kwargs=kwargs)).status_code, 404
+            )
+
+    def test_archive_is_public(self):
+        """
+        Test that the archive is served by the cookie-free public stack.
+        """
+        response = self.client.get(
+            reverse("article_archive_year", kwargs={"year": 2021})
+        )
+        self.assertEqual(len(response.cookies), 0)
+        self.assertIn("public", response["Cache-Control"])
@@ -5,6 +5,8 @@ from blog.models import Article
 from django.utils import timezone
 from django.test.client import Client
 from django.core.paginator import Paginator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 
 class ArticleModelTest(TestCase):
@@ -214,6 +216,24 @@ class ArticleListViewTest(TestCase):
             1,
         )  # Since we only have one online article
 
+    def test_article_list_is_ordered_without_counting(self):
+        """
+        Test that the list is newest first and its pages are not counted.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            newer = Article.objects.create(
+                title="TestArticleNewer", content="Test content", author=self.user
+            )
+        # The first request fills the page state.
+        self.client.get(reverse("article_list"))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("article_list") + "?page=1")
+        self.assertEqual(
+            list(response.context["articles"]), [newer, self.online_article]
+        )
+        self.assertEqual(response.context["paginator"].count, 2)
+        self.assertFalse(any("COUNT(" in q["sql"] for q in queries))
+
 
 class ArticleDetailViewTest(TestCase):
     """
@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Article, AuthorStats
+from blog.pagination import CursorPaginator, decode_cursor, encode_cursor
+
+
+class AuthorStatsTest(TestCase):
+    """
+    Test cases for the materialized per-author article counts.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+        )
+        self.other = User.objects.create_user(
+            username="otheruser",
+            password="testpassword",
+        )
+        self.article = Article.objects.create(
+            title="Author Article", content="Test content", author=self.user
+        )
+
+    def count(self, user):
+        stats = AuthorStats.objects.filter(user=user).first()
+        return stats.article_count if stats else 0
+
+    def test_counts_follow_saves_and_deletes(self):
+        """
+        Test that the count follows creation, visibility changes and deletion.
+        """
+        self.assertEqual(self.count(self.user), 1)
+        self.article.is_online = False
+        self.article.save()
+        self.assertEqual(self.count(self.user), 0)
+        self.article.is_online = True
+        self.article.save()
+        self.article.delete()
+        self.assertEqual(self.count(self.user), 0)
+
+    def test_changing_author_moves_the_count(self):
+        """
+        Test that reassigning an article moves it to the new author's count.
+        """
+        self.article.author = self.other
+        self.article.save()
+        self.assertEqual(self.count(self.user), 0)
+        self.assertEqual(self.count(self.other), 1)
+
+    def test_deleting_an_author(self):
+        """
+        Test that deleting an author with articles removes their stats.
+        """
+        self.user.delete()
+        self.assertFalse(AuthorStats.objects.exists())
+        self.assertFalse(Article.objects.exists())
+
+
+class CursorPaginatorTest(TestCase):
+    """
+    Test cases for the cursor paginator.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+        )
+        moment = datetime(2022, 1, 1, tzinfo=dt_timezone.utc)
+        for index in range(7):
+            article = Article.objects.create(
+                title=f"Article {index}", content="Test content", author=self.user
+            )
+            # Two articles share each timestamp to exercise the tie-breaker.
+            article.publication_datetime = moment + timedelta(hours=index // 2)
+            article.save()
+
+    def test_pages_cover_all_articles_once(self):
+        """
+        Test that following the cursors visits every article once, newest first.
+        """
+        paginator = CursorPaginator(Article.objects.all(), 3, "publication_datetime")
+        seen, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            seen += page.object_list
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len({article.pk for article in seen}), 7)
+        keys = [(article.publication_datetime, article.pk) for article in seen]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_cursor_round_trip(self):
+        """
+        Test that a cursor decodes to the position it encodes.
+        """
+        moment = datetime(2022, 1, 1, 12, 30, 0, 123456, tzinfo=dt_timezone.utc)
+        self.assertEqual(decode_cursor(encode_cursor(moment, 42)), (moment, 42))
+
+
+class AuthorDetailViewTest(TestCase):
+    """
+    Test cases for the author pages.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(
+                username="testuser",
+                password="testpassword",
+                first_name="Test",
+                last_name="Author",
+            )
+            for index in range(7):
+                Article.objects.create(
+                    title=f"Author Article {index}",
+                    content="Test content",
+                    author=self.user,
+                )
+            self.url = reverse("author_detail", kwargs={"username": "testuser"})
+
+    def test_author_page_lists_articles_without_counting(self):
+        """
+        Test that the author page lists the newest articles and shows the
+        materialized count without a COUNT query.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertContains(response, "Test Author")
+        self.assertContains(response, "7 articles")
+        self.assertContains(response, "Author Article 6")
+        self.assertNotContains(response, "Author Article 1<")
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries.captured_queries)
+        )
+
+    def test_next_page(self):
+        """
+        Test that the cursor link leads to the older articles.
+        """
+        response = self.client.get(self.url)
+        cursor = response.context["page"].next_cursor
+        older = self.client.get(self.url, {"cursor": cursor})
+        self.assertContains(older, "Author Article 1")
+        self.assertFalse(older.context["page"].has_next())
+
+    def test_invalid_cursor_and_unknown_author(self):
+        """
+        Test that malformed cursors and authors without articles return 404.
+        """
+        self.assertEqual(self.client.get(self.url, {"cursor": "!!"}).status_code, 404)
+        User.objects.create_user(username="nobody", password="testpassword")
+        response = self.client.get(
+            reverse("author_detail", kwargs={"username": "nobody"})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_article_pages_link_to_the_author(self):
+        """
+        Test that the article list links to the author page.
+        """
+        self.assertContains(self.client.get(reverse("article_list")), self.url)
@@ -0,0 +1,207 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from blog.benchmarking import compare, percentile, summarize, temporary_caches
+from blog.models import Article, ArticleRevision, Comment, Tag
+
+
+class BenchmarkHelpersTest(TestCase):
+    """
+    Test cases for the benchmark helpers.
+    """
+
+    def test_percentile(self):
+        """
+        Test the nearest-rank percentile.
+        """
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_summarize(self):
+        """
+        Test the summary of a run.
+        """
+        summary = summarize([0.001, 0.002, 0.003, 0.004], elapsed=2.0, queries=8)
+        self.assertEqual(summary["requests"], 4)
+        self.assertEqual(summary["throughput"], 2.0)
+        self.assertEqual(summary["queries_per_request"], 2.0)
+        self.assertAlmostEqual(summary["p50_ms"], 2.0)
+
+    def test_compare_reports_regressions_as_positive(self):
+        """
+        Test that lower throughput and higher latency both count as regressions.
+        """
+        baseline = {
+            "endpoints": {"article_list": {"throughput": 100.0, "p95_ms": 10.0}}
+        }
+        current = {"endpoints": {"article_list": {"throughput": 50.0, "p95_ms": 20.0}}}
+        rows = {row[1]: row[4] for row in compare(current, baseline)}
+        self.assertEqual(rows["throughput"], 50.0)
+        self.assertEqual(rows["p95_ms"], 100.0)
+
+    def test_temporary_caches(self):
+        """
+        Test that the tests and temporary caches do not share the site's cache file.
+        """
+        site_cache = os.path.abspath(settings.BASE_DIR / "cache.mmap")
+        self.assertNotEqual(caches["default"]._path, site_cache)
+        caches["default"].set("benchmark:key", "outer")
+        with temporary_caches():
+            self.assertNotEqual(caches["default"]._path, site_cache)
+            self.assertIsNone(caches["default"].get("benchmark:key"))
+            caches["default"].set("benchmark:key", "inner")
+        self.assertEqual(caches["default"].get("benchmark:key"), "outer")
+
+
+class BenchmarkCommandTest(TestCase):
+    """
+    Test cases for the benchmark management command.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        user = User.objects.create_user(username="testuser", password="testpassword")
+        tag = Tag.objects.create(name="Benchmark")
+        for index in range(3):
+            article = Article.objects.create(
+                title=f"Benchmark {index}", content="Test content", author=user
+            )
+            article.tags.add(tag)
+        Comment.objects.create(
+            article=article,
+            email="reader@example.com",
+            name="Reader",
+            content="Test comment",
+            is_approved=True,
+        )
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.output = os.path.join(self.directory, "results.json")
+
+    def run_benchmark(self, **options):
+        call_command(
+            "benchmark",
+            existing=True,
+            requests=4,
+            concurrency=1,
+            host="testserver",
+            output=self.output,
+            stdout=StringIO(),
+            **options,
+        )
+        with open(self.output) as handle:
+            return json.load(handle)
+
+    def test_benchmark_writes_results(self):
+        """
+        Test that every endpoint is benchmarked and saved to JSON.
+        """
+        results = self.run_benchmark()
+        self.assertEqual(results["articles"], 3)
+        for name in (
+            "article_list",
+            "article_detail",
+            "article_thread",
+            "archive_month",
+            "author_detail",
+            "tag_detail",
+            "contact_form",
+        ):
+            self.assertEqual(results["endpoints"][name]["requests"], 4)
+            self.assertEqual(results["endpoints"][name]["errors"], 0)
+            self.assertEqual(results["endpoints"][f"{name}:cold"]["errors"], 0)
+        # The untimed warm-up request fills the page cache, which the cold
+        # run does without.
+        self.assertEqual(results["endpoints"]["article_list"]["queries_per_request"], 0)
+        self.assertGreater(
+            results["endpoints"]["article_list:cold"]["queries_per_request"], 0
+        )
+
+    def test_benchmark_fails_on_regression(self):
+        """
+        Test that a regression beyond --max-regression fails the command.
+        """
+        baseline_path = os.path.join(self.directory, "baseline.json")
+        with open(baseline_path, "w") as handle:
+            json.dump(
+                {
+                    "endpoints": {
+                        "contact_form": {"queries_per_request": 0.0, "p95_ms": 0.0001}
+                    }
+                },
+                handle,
+            )
+        with self.assertRaises(CommandError):
+            self.run_benchmark(
+                endpoints=["contact_form"],
+                baseline=baseline_path,
+                max_regression=10,
+            )
+
+
+class BenchmarkCacheCommandTest(TestCase):
+    """
+    Test cases for the cache backend benchmark command.
+    """
+
+    def test_benchmark_cache(self):
+        """
+        Test that every backend is benchmarked and saved to JSON.
+        """
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        output = os.path.join(directory, "cache.json")
+        call_command(
+            "benchmark_cache",
+            keys=10,
+            operations=50,
+            value_size=128,
+            output=output,
+            stdout=StringIO(),
+        )
+        with open(output) as handle:
+            results = json.load(handle)
+        self.assertEqual(set(results["backends"]), {"mmap", "locmem", "filebased"})
+        self.assertEqual(results["backends"]["mmap"]["requests"], 50)
+
+
+class BenchmarkRevisionsCommandTest(TestCase):
+    """
+    Test cases for the article revision benchmark command.
+    """
+
+    def test_benchmark_revisions(self):
+        """
+        Test that every edit is saved, rebuilt and reported, and that the
+        benchmark article is removed afterwards.
+        """
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        output = os.path.join(directory, "revisions.json")
+        call_command(
+            "benchmark_revisions",
+            existing=True,
+            edits=30,
+            paragraphs=10,
+            output=output,
+            stdout=StringIO(),
+        )
+        with open(output) as handle:
+            results = json.load(handle)
+        self.assertEqual(results["storage"]["revisions"], 31)
+        self.assertEqual(results["storage"]["snapshots"], 2)
+        self.assertLess(results["storage"]["ratio"], 0.5)
+        self.assertEqual(results["operations"]["save"]["requests"], 31)
+        self.assertEqual(results["operations"]["rebuild"]["requests"], 31)
+        self.assertFalse(ArticleRevision.objects.exists())
@@ -0,0 +1,197 @@
+import gzip
+import threading
+import zlib
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog.caching import (
+    GENERATION_KEY,
+    PAGE_FORMAT,
+    get_generation,
+    invalidate_pages,
+    page_cache,
+)
+from blog.models import Article
+
+
+class PageCacheTest(TestCase):
+    """
+    Test cases for the article page cache.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article = Article.objects.create(
+                title="Cached Article",
+                content="Test content",
+                author=self.user,
+            )
+
+    def hold_lock(self, url):
+        """
+        Takes the regeneration lock of a page, as a concurrent request would.
+        """
+        lock_key = f"blog:pages:v{PAGE_FORMAT}:{url}:lock"
+        page_cache().add(lock_key, True, 30)
+        self.addCleanup(page_cache().delete, lock_key)
+
+    def test_list_is_served_from_the_cache(self):
+        """
+        Test that a second request is answered without rendering.
+        """
+        first = self.client.get(reverse("article_list"))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse("article_list"))
+        self.assertIsNone(second.context)
+        self.assertEqual(first.content, second.content)
+
+    def test_article_save_invalidates_pages(self):
+        """
+        Test that saving an article invalidates the cached pages.
+        """
+        self.client.get(reverse("article_list"))
+        generation = get_generation()
+        self.article.title = "Renamed Article"
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.article.save()
+            # Pages are only invalidated once the change is committed.
+            self.assertEqual(get_generation(), generation)
+        self.assertTrue(callbacks)
+        self.assertNotEqual(get_generation(), generation)
+        self.assertContains(self.client.get(reverse("article_list")), "Renamed Article")
+
+    def test_article_delete_invalidates_pages(self):
+        """
+        Test that deleting an article invalidates the cached pages.
+        """
+        url = reverse(
+            "article_detail", kwargs={"slug": self.article.slug, "pk": self.article.pk}
+        )
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_missing_generation_is_recreated(self):
+        """
+        Test that a lost generation counter is recreated.
+        """
+        page_cache().delete(GENERATION_KEY)
+        self.assertIsNotNone(get_generation())
+
+    def test_stale_page_is_served_while_another_request_regenerates(self):
+        """
+        Test that a stale page is served without rendering while the
+        regeneration lock is held by another request.
+        """
+        url = reverse("article_list")
+        first = self.client.get(url)
+        invalidate_pages()
+        self.hold_lock(url)
+        with self.assertNumQueries(0):
+            stale = self.client.get(url)
+        self.assertIsNone(stale.context)
+        self.assertEqual(stale.content, first.content)
+
+    def test_stale_page_is_regenerated_by_one_request(self):
+        """
+        Test that the request winning the lock regenerates a stale page and
+        releases the lock.
+        """
+        url = reverse("article_list")
+        self.client.get(url)
+        self.article.title = "Renamed Article"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.save()
+        self.assertContains(self.client.get(url), "Renamed Article")
+        self.assertFalse(page_cache().has_key(f"blog:pages:v{PAGE_FORMAT}:{url}:lock"))
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(url), "Renamed Article")
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_expired_page_is_stale(self):
+        """
+        Test that a page past its freshness lifetime is regenerated.
+        """
+        url = reverse("article_list")
+        self.client.get(url)
+        self.assertIsNotNone(self.client.get(url).context)
+
+    @override_settings(PAGE_CACHE_LOCK_WAIT=0.05)
+    def test_cold_miss_is_busy_while_lock_is_held(self):
+        """
+        Test that a request without any cached copy does not render the page
+        while another request holds the lock, nor releases that lock.
+        """
+        url = reverse("article_list")
+        page_cache().delete(f"blog:pages:v{PAGE_FORMAT}:{url}")
+        self.hold_lock(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertTrue(page_cache().has_key(f"blog:pages:v{PAGE_FORMAT}:{url}:lock"))
+
+    def test_cold_miss_takes_over_a_released_lock(self):
+        """
+        Test that a waiting request renders the page itself once the lock is
+        released without the page being stored.
+        """
+        url = reverse("article_list")
+        page_cache().delete(f"blog:pages:v{PAGE_FORMAT}:{url}")
+        self.hold_lock(url)
+        lock_key = f"blog:pages:v{PAGE_FORMAT}:{url}:lock"
+        timer = threading.Timer(0.05, page_cache().delete, [lock_key])
+        timer.start()
+        self.addCleanup(timer.cancel)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.context)
+        self.assertFalse(page_cache().has_key(lock_key))
+
+    def test_cached_page_is_sent_compressed(self):
+        """
+        Test that cached pages are sent gzip or deflate encoded to clients
+        accepting it, with the same content as the identity response.
+        """
+        url = reverse("article_list")
+        plain = self.client.get(url)
+        gzipped = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        deflated = self.client.get(url, HTTP_ACCEPT_ENCODING="deflate")
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertEqual(deflated["Content-Encoding"], "deflate")
+        self.assertEqual(gzip.decompress(gzipped.content), plain.content)
+        self.assertEqual(zlib.decompress(deflated.content), plain.content)
+        for response in (plain, gzipped, deflated):
+            self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertNotEqual(plain["ETag"], gzipped["ETag"])
+
+    def test_rendered_page_is_sent_compressed(self):
+        """
+        Test that a freshly rendered page is compressed as well.
+        """
+        invalidate_pages()
+        response = self.client.get(reverse("article_list"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertIsNotNone(response.context)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn(b"Cached Article", gzip.decompress(response.content))
+
+    def test_refused_encoding_is_not_used(self):
+        """
+        Test that codings with a zero quality are not used.
+        """
+        url = reverse("article_list")
+        self.client.get(url)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip;q=0, identity")
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertContains(response, "Cached Article")
@@ -0,0 +1,260 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog.caching import get_generation
+from blog.models import COMMENT_PATH_STEP, Article, Comment, comment_path_segment
+
+
+class CommentThreadTest(TestCase):
+    """
+    Test cases for storing and loading comment threads.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(
+                username="testuser",
+                password="testpassword",
+            )
+            self.article = Article.objects.create(
+                title="Discussed Article", content="Test content", author=self.user
+            )
+            self.start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+            self.minutes = 0
+
+    def comment(self, parent=None, approved=True):
+        self.minutes += 1
+        return Comment.objects.create(
+            article=self.article,
+            parent=parent,
+            email="reader@example.com",
+            name="Reader",
+            content="Test comment",
+            date=self.start + timedelta(minutes=self.minutes),
+            is_approved=approved,
+        )
+
+    def test_path_segments_sort_chronologically(self):
+        """
+        Test that path segments have a fixed width and sort like their times.
+        """
+        first = comment_path_segment(self.start)
+        second = comment_path_segment(self.start + timedelta(microseconds=1))
+        self.assertEqual(len(first), COMMENT_PATH_STEP)
+        self.assertLess(first, second)
+
+    def test_thread_is_depth_first_in_one_query(self):
+        """
+        Test that a thread is loaded with one query, depth-first and oldest first.
+        """
+        first = self.comment()
+        second = self.comment()
+        reply = self.comment(parent=first)
+        nested = self.comment(parent=reply)
+        late_reply = self.comment(parent=first)
+        with self.assertNumQueries(1):
+            page = self.article.comments.approved().thread()
+        self.assertEqual(page.object_list, [first, reply, nested, late_reply, second])
+        self.assertEqual([c.depth for c in page.object_list], [0, 1, 2, 1, 0])
+        self.assertFalse(page.has_next())
+
+    def test_replies_to_hidden_comments_are_left_out(self):
+        """
+        Test that approved replies under a comment awaiting moderation are hidden.
+        """
+        pending = self.comment(approved=False)
+        reply = self.comment(parent=pending)
+        self.comment(parent=reply)
+        shown = self.comment()
+        page = self.article.comments.approved().thread()
+        self.assertEqual(page.object_list, [shown])
+
+    def test_pages_continue_threads(self):
+        """
+        Test that a page starting inside a thread shows the remaining replies.
+        """
+        first = self.comment()
+        reply = self.comment(parent=first)
+        nested = self.comment(parent=reply)
+        second = self.comment()
+        comments = self.article.comments.approved()
+        page = comments.thread(size=2)
+        self.assertEqual(page.object_list, [first, reply])
+        self.assertEqual(page.next_cursor, nested.path)
+        page = comments.thread(page.next_cursor, size=2)
+        self.assertEqual(page.object_list, [nested, second])
+        self.assertFalse(page.has_next())
+
+    def test_detail_page_shows_approved_comments(self):
+        """
+        Test that the detail page lists approved comments only.
+        """
+        self.comment()
+        Comment.objects.create(
+            article=self.article,
+            email="reader@example.com",
+            name="Pending Reader",
+            content="Pending",
+            is_approved=False,
+        )
+        url = reverse(
+            "article_detail", kwargs={"slug": self.article.slug, "pk": self.article.pk}
+        )
+        response = self.client.get(url)
+        self.assertContains(response, "Test comment")
+        self.assertNotContains(response, "Pending Reader")
+        response = self.client.get(f"{url}?comments=not-a-path")
+        self.assertEqual(response.status_code, 404)
+
+
+class CommentPostingTest(TestCase):
+    """
+    Test cases for posting and moderating comments.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_superuser(
+                username="testuser",
+                password="testpassword",
+            )
+            self.article = Article.objects.create(
+                title="Discussed Article", content="Test content", author=self.user
+            )
+            self.kwargs = {"slug": self.article.slug, "pk": self.article.pk}
+            self.data = {
+                "email": "reader@example.com",
+                "name": "Reader",
+                "content": "A thoughtful comment",
+            }
+
+    def test_posting_awaits_moderation(self):
+        """
+        Test that a posted comment is stored pending, without invalidating pages.
+        """
+        generation = get_generation()
+        response = self.client.post(
+            reverse("comment_form", kwargs=self.kwargs), self.data
+        )
+        self.assertRedirects(response, reverse("comment_success", kwargs=self.kwargs))
+        comment = Comment.objects.get()
+        self.assertFalse(comment.is_approved)
+        self.assertEqual(comment.depth, 0)
+        self.assertEqual(get_generation(), generation)
+
+    @override_settings(COMMENTS_REQUIRE_APPROVAL=False)
+    def test_posting_without_moderation(self):
+        """
+        Test that comments are shown right away when approval is not required.
+        """
+        self.client.post(reverse("comment_form", kwargs=self.kwargs), self.data)
+        response = self.client.get(reverse("article_detail", kwargs=self.kwargs))
+        self.assertContains(response, "A thoughtful comment")
+
+    def test_replying(self):
+        """
+        Test that replies extend their parent's path and must be on the same article.
+        """
+        parent = Comment.objects.create(
+            article=self.article, is_approved=True, **self.data
+        )
+        url = reverse("comment_form", kwargs=self.kwargs)
+        response = self.client.get(url, {"parent": parent.pk})
+        self.assertContains(response, f'value="{parent.pk}"')
+        self.client.post(url, {**self.data, "parent": parent.pk})
+        reply = Comment.objects.get(parent=parent)
+        self.assertTrue(reply.path.startswith(parent.path))
+        self.assertEqual(reply.depth, 1)
+
+        other = Article.objects.create(
+            title="Other Article", content="Test content", author=self.user
+        )
+        url = reverse("comment_form", kwargs={"slug": other.slug, "pk": other.pk})
+        response = self.client.post(url, {**self.data, "parent": parent.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["form"].errors["parent"])
+
+    def test_comments_on_hidden_articles_are_404(self):
+        """
+        Test that offline articles cannot be commented on.
+        """
+        self.article.is_online = False
+        self.article.save()
+        response = self.client.get(reverse("comment_form", kwargs=self.kwargs))
+        self.assertEqual(response.status_code, 404)
+
+    def test_admin_moderation(self):
+        """
+        Test that approving shows comments and unapproving hides their replies too.
+        """
+        parent = Comment.objects.create(article=self.article, **self.data)
+        reply = Comment.objects.create(
+            article=self.article, parent=parent, is_approved=True, **self.data
+        )
+        modified = Article.objects.get(pk=self.article.pk).modified_datetime
+        self.client.force_login(self.user)
+        url = reverse("admin:blog_comment_changelist")
+        self.client.post(url, {"action": "approve", "_selected_action": [parent.pk]})
+        parent.refresh_from_db()
+        self.assertTrue(parent.is_approved)
+        self.assertGreater(
+            Article.objects.get(pk=self.article.pk).modified_datetime, modified
+        )
+        self.client.logout()
+        response = self.client.get(reverse("article_detail", kwargs=self.kwargs))
+        self.assertContains(response, "A thoughtful comment", count=2)
+
+        self.client.force_login(self.user)
+        self.client.post(url, {"action": "unapprove", "_selected_action": [parent.pk]})
+        reply.refresh_from_db()
+        self.assertFalse(reply.is_approved)
+
+    def unapprove(self, query="", **data):
+        self.client.force_login(self.user)
+        url = reverse("admin:blog_comment_changelist")
+        return self.client.post(f"{url}{query}", {"action": "unapprove", **data})
+
+    def test_admin_unapprove_empty_selection(self):
+        """
+        Test that unapproving a selection that no longer exists changes nothing.
+        """
+        Comment.objects.create(article=self.article, is_approved=True, **self.data)
+        self.unapprove(_selected_action=[0])
+        self.assertEqual(Comment.objects.filter(is_approved=True).count(), 1)
+
+    def test_admin_unapprove_many_threads(self):
+        """
+        Test that unapproving more threads than fit in one query unapproves
+        them all, with their replies, and only them.
+        """
+        start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        comments = Comment.objects.bulk_create(
+            Comment(
+                article=self.article,
+                is_approved=True,
+                path=comment_path_segment(start + timedelta(seconds=index)),
+                **self.data,
+            )
+            for index in range(1500)
+        )
+        Comment.objects.create(
+            article=self.article, parent=comments[0], is_approved=True, **self.data
+        )
+        kept = Comment.objects.create(
+            article=self.article,
+            is_approved=True,
+            email="other@example.com",
+            name="Other",
+            content="Another comment",
+        )
+        self.unapprove("?q=reader", select_across=1, _selected_action=[comments[0].pk])
+        self.assertEqual(list(Comment.objects.filter(is_approved=True)), [kept])
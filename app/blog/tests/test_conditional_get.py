@@ -0,0 +1,150 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from blog.caching import invalidate_pages_on_commit
+from blog.models import Article, Tag
+
+
+class ConditionalGetTest(TestCase):
+    """
+    Test cases for the conditional GET support of the article pages.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(
+                username="testuser",
+                password="testpassword",
+            )
+            self.article = Article.objects.create(
+                title="Conditional Article",
+                content="Test content",
+                author=self.user,
+            )
+            self.detail_url = reverse(
+                "article_detail",
+                kwargs={"slug": self.article.slug, "pk": self.article.pk},
+            )
+
+    def test_modified_datetime_tracks_saves(self):
+        """
+        Test that saving an article updates its modification time.
+        """
+        modified = self.article.modified_datetime
+        self.article.title = "Renamed Article"
+        self.article.save()
+        self.assertGreater(self.article.modified_datetime, modified)
+        self.assertEqual(
+            self.article.publication_datetime,
+            Article.objects.get(pk=self.article.pk).publication_datetime,
+        )
+
+    def test_detail_if_none_match(self):
+        """
+        Test that a matching If-None-Match is answered with 304 after a single
+        primary key lookup and without rendering.
+        """
+        response = self.client.get(self.detail_url)
+        self.assertIn("Last-Modified", response.headers)
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(
+                self.detail_url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertIsNone(not_modified.context)
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+
+    def test_detail_if_modified_since(self):
+        """
+        Test that an unchanged article is answered with 304 for If-Modified-Since.
+        """
+        response = self.client.get(self.detail_url)
+        not_modified = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_detail_changes_after_save(self):
+        """
+        Test that saving the article invalidates the validators.
+        """
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.article.content = "Updated content"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Updated content")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail_changes_after_tag_changes(self):
+        """
+        Test that tagging the article, renaming or deleting its tag, and bulk
+        tagging all invalidate the validators, and not only the cached pages.
+        """
+        tag = Tag.objects.create(name="Django")
+        changes = [
+            lambda: self.article.tags.add(tag),
+            lambda: Tag.objects.filter(pk=tag.pk).first().save(),
+            lambda: tag.articles.clear(),
+            lambda: Article.objects.filter(pk=self.article.pk).add_tags([tag]),
+            lambda: tag.delete(),
+        ]
+        for change in changes:
+            etag = self.client.get(self.detail_url)["ETag"]
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+                invalidate_pages_on_commit()
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+
+    def test_detail_of_offline_article_is_not_modified(self):
+        """
+        Test that an article taken offline is not answered with 304.
+        """
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.article.is_online = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_if_none_match_without_queries(self):
+        """
+        Test that the article list is revalidated without any query, and
+        changes when an article is saved.
+        """
+        url = reverse("article_list")
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(
+                title="Another Article", content="Test content", author=self.user
+            )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Another Article")
+
+    def test_etag_depends_on_encoding(self):
+        """
+        Test that the identity ETag does not validate the gzip representation.
+        """
+        etag = self.client.get(self.detail_url)["ETag"]
+        response = self.client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        not_modified = self.client.get(
+            self.detail_url,
+            HTTP_IF_NONE_MATCH=response["ETag"],
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+        self.assertEqual(not_modified.status_code, 304)
@@ -0,0 +1,157 @@
+import multiprocessing
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from blog.shedding import SlotPool, get_pool, pool_name
+
+
+def _hold_slot(pool, taken, done):
+    pool.acquire()
+    taken.set()
+    done.wait(5)
+
+
+WRITES_FULL = {
+    "writes": {"limit": 0, "max_queue": 0, "retry_after": 7},
+    "reads": {"limit": 4},
+    "admin": {"limit": 4},
+    "default": {"limit": 4},
+}
+
+
+class SlotPoolTest(SimpleTestCase):
+    """
+    Test cases for the request slot pools.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+
+    def pool(self, **options):
+        return SlotPool("test", directory=self.directory, **options)
+
+    def test_requests_beyond_the_queue_are_shed(self):
+        """
+        Test that a full pool with a full queue refuses requests at once.
+        """
+        pool = self.pool(limit=1, max_queue=0, queue_timeout=1.0)
+        slot = pool.acquire()
+        self.assertIsNotNone(slot)
+        start = time.monotonic()
+        self.assertIsNone(pool.acquire())
+        self.assertLess(time.monotonic() - start, 0.5)
+        pool.release(slot)
+        self.assertEqual((pool.admitted, pool.queued, pool.shed), (1, 0, 1))
+        self.assertEqual(pool.in_flight, 0)
+
+    def test_queued_requests_get_released_slots(self):
+        """
+        Test that a waiting request is admitted when a slot is released.
+        """
+        pool = self.pool(limit=1, max_queue=1, queue_timeout=5.0)
+        slot = pool.acquire()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(pool.acquire()))
+        waiter.start()
+        while not pool.waiting:
+            time.sleep(0.001)
+        pool.release(slot)
+        waiter.join()
+        self.assertEqual(results, [slot])
+        self.assertEqual((pool.admitted, pool.queued, pool.shed), (2, 1, 0))
+
+    def test_queue_timeout(self):
+        """
+        Test that a request waiting longer than the queue timeout is shed.
+        """
+        pool = self.pool(limit=1, max_queue=1, queue_timeout=0.05)
+        self.assertIsNotNone(pool.acquire())
+        self.assertIsNone(pool.acquire())
+        self.assertEqual((pool.queued, pool.shed, pool.waiting), (1, 1, 0))
+
+    def test_slots_are_shared_between_processes(self):
+        """
+        Test that a slot taken by another process counts against the limit,
+        and is freed when that process exits without releasing it.
+        """
+        pool = self.pool(limit=2)
+        context = multiprocessing.get_context("fork")
+        taken, done = context.Event(), context.Event()
+        process = context.Process(target=_hold_slot, args=(pool, taken, done))
+        process.start()
+        self.assertTrue(taken.wait(5))
+        slot = pool.acquire()
+        self.assertIsNotNone(slot)
+        self.assertIsNone(pool.acquire())
+        self.assertEqual((pool.in_flight, pool.admitted, pool.shed), (2, 2, 1))
+        done.set()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(pool.in_flight, 1)
+        self.assertIsNotNone(pool.acquire())
+
+    def test_routes(self):
+        """
+        Test that requests are mapped to pools by view name and method.
+        """
+        contact = resolve(reverse("contact_form"))
+        self.assertEqual(pool_name(contact, "POST"), "writes")
+        self.assertEqual(pool_name(contact, "GET"), "default")
+        self.assertEqual(pool_name(resolve(reverse("article_list")), "GET"), "reads")
+        self.assertEqual(pool_name(resolve(reverse("admin:index")), "GET"), "admin")
+        self.assertEqual(pool_name(None, "GET"), "default")
+
+    def test_pools_follow_configuration(self):
+        """
+        Test that a pool is recreated when its configuration changes.
+        """
+        pool = get_pool("writes")
+        self.assertIs(get_pool("writes"), pool)
+        with self.settings(LOAD_SHEDDING_POOLS=WRITES_FULL):
+            self.assertEqual(get_pool("writes").limit, 0)
+        with self.settings(LOAD_SHEDDING_DIR=self.directory):
+            self.assertTrue(get_pool("writes").path.startswith(self.directory))
+
+
+class LoadSheddingMiddlewareTest(TestCase):
+    """
+    Test cases for the load-shedding middleware.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(LOAD_SHEDDING_DIR=directory))
+
+    @override_settings(LOAD_SHEDDING_POOLS=WRITES_FULL)
+    def test_full_pool_sheds_with_retry_after(self):
+        """
+        Test that requests to a full pool get a 503 while other pools still serve.
+        """
+        response = self.client.post(reverse("contact_form"), {})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "7")
+        self.assertIn("no-store", response["Cache-Control"])
+        self.assertEqual(self.client.get(reverse("contact_form")).status_code, 200)
+        self.assertEqual(self.client.get(reverse("article_list")).status_code, 200)
+
+        metrics = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn('blog_load_shedding_shed_total{pool="writes"} 1', metrics)
+        self.assertIn('blog_load_shedding_admitted_total{pool="reads"}', metrics)
+
+    @override_settings(LOAD_SHEDDING_ENABLED=False, LOAD_SHEDDING_POOLS=WRITES_FULL)
+    def test_disabled(self):
+        """
+        Test that no request is shed when load shedding is disabled.
+        """
+        response = self.client.post(reverse("contact_form"), {})
+        self.assertEqual(response.status_code, 200)
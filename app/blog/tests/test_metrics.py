@@ -0,0 +1,187 @@
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog.metrics import RequestMetrics, MetricsRegistry, registry
+from blog.models import Article
+
+
+class ServerTimingMiddlewareTest(TestCase):
+    """
+    Test cases for the per-request instrumentation middleware.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(
+                username="testuser",
+                password="testpassword",
+            )
+            Article.objects.create(
+                title="Test Article",
+                content="Test content",
+                author=self.user,
+            )
+            registry.reset()
+
+    def test_server_timing_header(self):
+        """
+        Test that responses carry the Server-Timing header.
+        """
+        response = self.client.get(reverse("article_list"))
+        header = response.headers["Server-Timing"]
+        self.assertRegex(header, r'db;desc="[1-9]\d* queries";dur=')
+        self.assertIn("tpl;dur=", header)
+        self.assertIn('cache;desc="0 hits, 1 misses"', header)
+        self.assertIn("total;dur=", header)
+
+    def test_server_timing_reports_cache_hits(self):
+        """
+        Test that a page served from the cache is reported as a hit.
+        """
+        self.client.get(reverse("article_list"))
+        response = self.client.get(reverse("article_list"))
+        header = response.headers["Server-Timing"]
+        self.assertIn('db;desc="0 queries"', header)
+        self.assertIn('cache;desc="1 hits, 0 misses"', header)
+
+    def test_metrics_endpoint(self):
+        """
+        Test that finished requests show up on the metrics endpoint.
+        """
+        self.client.get(reverse("article_list"))
+        self.client.get(reverse("article_list"))
+
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn(
+            'blog_requests_total{view="article_list",method="GET",status="200"} 2',
+            body,
+        )
+        self.assertIn(
+            'blog_request_duration_seconds_count{view="article_list"} 2', body
+        )
+        self.assertIn('blog_db_queries_total{view="article_list"}', body)
+
+
+class MetricsRegistryTest(TestCase):
+    """
+    Test cases for the metrics registry.
+    """
+
+    def test_histogram_buckets_are_cumulative(self):
+        """
+        Test that histogram buckets are rendered cumulatively.
+        """
+        metrics_registry = MetricsRegistry(buckets=(0.1, 1.0))
+        for duration in (0.05, 0.5, 5.0):
+            metrics_registry.observe("view", "GET", 200, duration, RequestMetrics())
+
+        body = metrics_registry.render()
+        self.assertIn(
+            'blog_request_duration_seconds_bucket{view="view",le="0.1"} 1', body
+        )
+        self.assertIn(
+            'blog_request_duration_seconds_bucket{view="view",le="1.0"} 2', body
+        )
+        self.assertIn(
+            'blog_request_duration_seconds_bucket{view="view",le="+Inf"} 3', body
+        )
+
+    def test_shared_registry_adds_up_processes(self):
+        """
+        Test that a shared registry renders the requests of every process,
+        without a forked process reporting those of its parent again.
+        """
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(METRICS_DIR=directory))
+        metrics_registry = MetricsRegistry(buckets=(0.1,), shared=True)
+        metrics_registry.observe("view", "GET", 200, 0.05, RequestMetrics())
+        pid = os.fork()
+        if pid == 0:
+            try:
+                metrics_registry.observe("view", "GET", 500, 0.5, RequestMetrics())
+                metrics_registry.flush()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+
+        body = metrics_registry.render()
+        for status in (200, 500):
+            self.assertIn(
+                f'blog_requests_total{{view="view",method="GET",status="{status}"}} 1',
+                body,
+            )
+        self.assertIn(
+            'blog_request_duration_seconds_bucket{view="view",le="0.1"} 1', body
+        )
+        self.assertIn('blog_request_duration_seconds_count{view="view"} 2', body)
+
+    def test_shared_registry_resumes_exited_process(self):
+        """
+        Test that a process reusing the pid of an exited one keeps its counts.
+        """
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(METRICS_DIR=directory))
+        exited = MetricsRegistry(shared=True)
+        exited.observe("view", "GET", 200, 0.05, RequestMetrics())
+        exited.flush()
+
+        metrics_registry = MetricsRegistry(shared=True)
+        metrics_registry.observe("view", "GET", 200, 0.05, RequestMetrics())
+        metrics_registry.flush()
+        self.assertIn(
+            'blog_requests_total{view="view",method="GET",status="200"} 2',
+            metrics_registry.render(),
+        )
+
+    def test_unknown_methods_share_one_label(self):
+        """
+        Test that methods outside REQUEST_METHODS are counted as "other".
+        """
+        metrics_registry = MetricsRegistry()
+        for method in ("GET", "FOO", "BAR"):
+            metrics_registry.observe("view", method, 200, 0.05, RequestMetrics())
+        body = metrics_registry.render()
+        self.assertIn(
+            'blog_requests_total{view="view",method="other",status="200"} 2', body
+        )
+        self.assertNotIn('method="FOO"', body)
+
+    def test_exited_processes_are_archived(self):
+        """
+        Test that the files of exited processes are merged into the archive,
+        keeping their counts.
+        """
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(METRICS_DIR=directory))
+        metrics_registry = MetricsRegistry(shared=True)
+        for status in (200, 404):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    metrics_registry.observe(
+                        "view", "GET", status, 0.05, RequestMetrics()
+                    )
+                    metrics_registry.flush()
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+            body = metrics_registry.render()
+
+        self.assertEqual(
+            set(os.listdir(directory)),
+            {"archive.lock", "archive.pickle", f"{os.getpid()}.pickle"},
+        )
+        for status in (200, 404):
+            self.assertIn(
+                f'blog_requests_total{{view="view",method="GET",status="{status}"}} 1',
+                body,
+            )
@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+import tempfile
+import time
+
+from django.test import SimpleTestCase
+
+from blog.mmap_cache import MmapCache
+
+
+PARAMS = {"OPTIONS": {"SIZE": 8 * 1024 * 1024}}
+
+
+def _set_in_child(location, key, value):
+    MmapCache(location, PARAMS).set(key, value)
+
+
+class MmapCacheTest(SimpleTestCase):
+    """
+    Test cases for the memory-mapped cache backend.
+    """
+
+    def setUp(self):
+        """
+        Set up a cache on a fresh file.
+        """
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.location = os.path.join(directory, "cache.mmap")
+        self.cache = MmapCache(self.location, PARAMS)
+
+    def test_set_get_delete(self):
+        """
+        Test the basic cache operations.
+        """
+        self.cache.set("key", {"value": [1, 2, 3]})
+        self.assertEqual(self.cache.get("key"), {"value": [1, 2, 3]})
+        self.assertTrue(self.cache.has_key("key"))
+        self.assertTrue(self.cache.delete("key"))
+        self.assertIsNone(self.cache.get("key"))
+        self.assertEqual(self.cache.get("key", "default"), "default")
+
+    def test_add_and_incr(self):
+        """
+        Test that add does not overwrite and incr is applied in place.
+        """
+        self.assertTrue(self.cache.add("counter", 1))
+        self.assertFalse(self.cache.add("counter", 5))
+        self.assertEqual(self.cache.incr("counter", 2), 3)
+        self.assertEqual(self.cache.get("counter"), 3)
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+
+    def test_overwrite_with_a_larger_value(self):
+        """
+        Test that a value moving to another slab class replaces the old one.
+        """
+        self.cache.set("key", "small")
+        self.cache.set("key", "x" * 5000)
+        self.assertEqual(self.cache.get("key"), "x" * 5000)
+        self.cache.set("key", "small again")
+        self.assertEqual(self.cache.get("key"), "small again")
+
+    def test_too_large_values_are_not_stored(self):
+        """
+        Test that a value larger than the largest slab is dropped.
+        """
+        self.cache.set("key", "old")
+        self.cache.set("key", "x" * (2 * 1024 * 1024))
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_expiry_and_touch(self):
+        """
+        Test that entries expire and touch extends them.
+        """
+        self.cache.set("gone", 1, timeout=0)
+        self.assertIsNone(self.cache.get("gone"))
+        self.cache.set("key", 1, timeout=0.05)
+        self.assertTrue(self.cache.touch("key", None))
+        time.sleep(0.1)
+        self.assertEqual(self.cache.get("key"), 1)
+
+    def test_lru_eviction(self):
+        """
+        Test that a full set evicts its least recently used entry.
+        """
+        cache = MmapCache(
+            self.location,
+            {
+                "OPTIONS": {
+                    "SIZE": 4096 + 8 * 600,
+                    "SLAB_SIZES": [512],
+                    "ASSOCIATIVITY": 8,
+                }
+            },
+        )
+        for index in range(8):
+            cache.set(f"key{index}", index)
+        cache.get("key0")
+        cache.set("key8", 8)
+        self.assertEqual(cache.get("key0"), 0)
+        self.assertIsNone(cache.get("key1"))
+        self.assertEqual(cache.get("key8"), 8)
+
+    def test_clear(self):
+        """
+        Test that clear removes every entry.
+        """
+        self.cache.set_many({"a": 1, "b": 2})
+        self.cache.clear()
+        self.assertEqual(self.cache.get_many(["a", "b"]), {})
+
+    def test_shared_between_processes(self):
+        """
+        Test that a value written by another process is visible.
+        """
+        self.cache.set("key", "parent")
+        process = multiprocessing.get_context("fork").Process(
+            target=_set_in_child, args=(self.location, "key", "child")
+        )
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(self.cache.get("key"), "child")
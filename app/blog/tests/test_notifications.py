@@ -0,0 +1,212 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import ContactRequest
+from blog.notifications import collect_digest, deliver, submit
+
+
+class CountingEmailBackend(EmailBackend):
+    """
+    Local-memory email backend counting the connections created.
+    """
+
+    opened = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingEmailBackend.opened += 1
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    """
+    Email backend failing like an unreachable mail relay.
+    """
+
+    def send_messages(self, email_messages):
+        raise SMTPException("Connection refused")
+
+
+@override_settings(
+    CONTACT_NOTIFICATION_MODE="digest",
+    CONTACT_DIGEST_SIZE=3,
+    CONTACT_DIGEST_INTERVAL=600,
+    CONTACT_URGENT_RULES=[("content", r"(?i)\burgent\b")],
+    RECIPIENT_EMAIL=["team@example.com"],
+)
+class ContactDigestTest(TestCase):
+    """
+    Test cases for the contact request notifications.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.now = timezone.now()
+
+    def submit(self, number, content="Hello", now=None):
+        return submit(
+            ContactRequest(
+                email=f"sender{number}@example.com",
+                name=f"Sender {number}",
+                content=content,
+            ),
+            now or self.now,
+        )
+
+    def test_immediate_mode(self):
+        """
+        Test that every request is mailed on its own in immediate mode.
+        """
+        with self.settings(CONTACT_NOTIFICATION_MODE="immediate"):
+            messages, ids = self.submit(1)
+        self.assertEqual(deliver(messages, ids), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, "New Contact Request")
+        self.assertEqual(mail.outbox[0].to, ["team@example.com"])
+        self.assertEqual(mail.outbox[0].reply_to, ["sender1@example.com"])
+        self.assertFalse(ContactRequest.objects.pending().exists())
+
+    def test_digest_is_sent_at_size_threshold(self):
+        """
+        Test that requests are held until CONTACT_DIGEST_SIZE are pending.
+        """
+        self.assertEqual(self.submit(1), ([], []))
+        self.assertEqual(self.submit(2), ([], []))
+        self.assertEqual(ContactRequest.objects.pending().count(), 2)
+        messages, ids = self.submit(3)
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(len(ids), 3)
+        deliver(messages, ids)
+        self.assertEqual(mail.outbox[0].subject, "3 New Contact Requests")
+        for number in (1, 2, 3):
+            self.assertIn(f"Reply-To: sender{number}@example.com", mail.outbox[0].body)
+        self.assertFalse(ContactRequest.objects.pending().exists())
+
+    def test_digest_is_sent_after_interval(self):
+        """
+        Test that a pending request is mailed once it waited CONTACT_DIGEST_INTERVAL.
+        """
+        self.submit(1)
+        ContactRequest.objects.update(date=self.now)
+        self.assertEqual(collect_digest(self.now + timedelta(seconds=599)), ([], []))
+        messages, ids = collect_digest(self.now + timedelta(seconds=600))
+        self.assertEqual(len(ids), 1)
+        self.assertEqual(messages[0].subject, "1 New Contact Request")
+
+    def test_urgent_requests_are_mailed_at_once(self):
+        """
+        Test that requests matching an urgent rule skip the digest.
+        """
+        self.submit(1)
+        messages, ids = self.submit(2, content="URGENT: the site is down")
+        self.assertEqual(
+            [message.subject for message in messages], ["New Contact Request"]
+        )
+        self.assertEqual(ContactRequest.objects.pending().count(), 1)
+
+    @override_settings(
+        EMAIL_BACKEND="blog.tests.test_notifications.CountingEmailBackend"
+    )
+    def test_backlog_is_sent_over_one_connection(self):
+        """
+        Test that a large backlog is split into digests sent over one connection.
+        """
+        for number in range(2):
+            self.submit(number)
+        ContactRequest.objects.create(
+            email="late@example.com", name="Late", content="Hi"
+        )
+        ContactRequest.objects.create(
+            email="late@example.com", name="Late", content="Hi"
+        )
+        messages, ids = self.submit(9)
+        self.assertEqual(len(ids), 5)
+        CountingEmailBackend.opened = 0
+        self.assertEqual(deliver(messages, ids), 2)
+        self.assertEqual(CountingEmailBackend.opened, 1)
+        self.assertEqual(
+            [message.subject for message in mail.outbox],
+            ["3 New Contact Requests", "2 New Contact Requests"],
+        )
+
+    @override_settings(
+        EMAIL_BACKEND="blog.tests.test_notifications.FailingEmailBackend"
+    )
+    def test_failed_digest_is_retried(self):
+        """
+        Test that requests of a digest that could not be sent are pending again.
+        """
+        for number in range(3):
+            messages, ids = self.submit(number)
+        with self.assertLogs("blog.notifications", "ERROR") as logs:
+            self.assertEqual(deliver(messages, ids), 0)
+        self.assertIn("Error sending contact notifications", logs.output[0])
+        self.assertEqual(ContactRequest.objects.pending().count(), 3)
+
+    def test_contact_form_leaves_request_pending(self):
+        """
+        Test that a submission through the contact form waits for the digest.
+        """
+        response = self.client.post(
+            reverse("contact_form"),
+            {"email": "test@example.com", "name": "Test User", "content": "Hello"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(ContactRequest.objects.pending().count(), 1)
+        self.assertEqual(mail.outbox, [])
+
+
+@override_settings(CONTACT_NOTIFICATION_MODE="digest", CONTACT_DIGEST_SIZE=10)
+class SendContactDigestCommandTest(TestCase):
+    """
+    Test cases for the send_contact_digest management command.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        for number in range(2):
+            ContactRequest.objects.create(
+                email=f"sender{number}@example.com", name="Sender", content="Hello"
+            )
+
+    def test_nothing_due(self):
+        """
+        Test that nothing is sent before a digest is due.
+        """
+        out = StringIO()
+        call_command("send_contact_digest", stdout=out)
+        self.assertIn("Sent 0 contact requests in 0 emails.", out.getvalue())
+        self.assertEqual(mail.outbox, [])
+
+    def test_force(self):
+        """
+        Test that --force mails all pending requests.
+        """
+        out = StringIO()
+        call_command("send_contact_digest", force=True, stdout=out)
+        self.assertIn("Sent 2 contact requests in 1 emails.", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(
+        EMAIL_BACKEND="blog.tests.test_notifications.FailingEmailBackend"
+    )
+    def test_failure(self):
+        """
+        Test that a failed delivery fails the command and keeps the requests pending.
+        """
+        with self.assertRaises(CommandError), self.assertLogs("blog.notifications"):
+            call_command("send_contact_digest", force=True, stdout=StringIO())
+        self.assertEqual(ContactRequest.objects.pending().count(), 2)
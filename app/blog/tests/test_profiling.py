@@ -0,0 +1,117 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from blog.models import Article
+
+
+class ProfilingMiddlewareTest(TestCase):
+    """
+    Test cases for the sampled profiling middleware.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.directory = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.create_user(
+                username="testuser", password="testpassword"
+            )
+            Article.objects.create(title="Test Article", content="Test", author=user)
+
+    def test_disabled_by_default(self):
+        """
+        Test that nothing is written unless profiling is enabled.
+        """
+        with self.settings(PROFILING_DIR=self.directory):
+            self.client.get(reverse("article_list"))
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_sampled_request_is_dumped(self):
+        """
+        Test that a sampled request writes a profile and its details.
+        """
+        with self.settings(
+            PROFILING_ENABLED=True,
+            PROFILING_SAMPLE_RATE=1.0,
+            PROFILING_DIR=self.directory,
+        ):
+            self.client.get(reverse("article_list"))
+
+        profiles = list(self.directory.glob("*.prof"))
+        self.assertEqual(len(profiles), 1)
+        with open(profiles[0].with_suffix(".json")) as handle:
+            details = json.load(handle)
+        self.assertEqual(details["path"], reverse("article_list"))
+        self.assertEqual(details["view"], "article_list")
+        self.assertEqual(details["reason"], "sampled")
+        self.assertGreater(details["query_count"], 0)
+        self.assertTrue(
+            any("blog_article" in query["sql"] for query in details["queries"])
+        )
+
+    def test_slow_threshold_keeps_only_slow_requests(self):
+        """
+        Test that with a latency threshold only slower requests are kept.
+        """
+        with self.settings(
+            PROFILING_ENABLED=True,
+            PROFILING_SAMPLE_RATE=0.0,
+            PROFILING_DIR=self.directory,
+        ):
+            with self.settings(PROFILING_SLOW_THRESHOLD=60):
+                self.client = self.client_class()
+                self.client.get(reverse("article_list"))
+            self.assertEqual(list(self.directory.glob("*.prof")), [])
+
+            with self.settings(PROFILING_SLOW_THRESHOLD=0):
+                self.client = self.client_class()
+                self.client.get(reverse("article_list"))
+            self.assertEqual(len(list(self.directory.glob("*.prof"))), 1)
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0)
+    def test_dumps_are_rotated(self):
+        """
+        Test that only the newest PROFILING_MAX_DUMPS dumps are kept.
+        """
+        with self.settings(PROFILING_DIR=self.directory, PROFILING_MAX_DUMPS=2):
+            for _ in range(4):
+                self.client.get(reverse("article_list"))
+        self.assertEqual(len(list(self.directory.glob("*.prof"))), 2)
+        self.assertEqual(len(list(self.directory.glob("*.json"))), 2)
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0)
+    def test_profile_summary(self):
+        """
+        Test the profile summary command.
+        """
+        with self.settings(PROFILING_DIR=self.directory):
+            self.client.get(reverse("article_list"))
+            self.client.get(reverse("contact_form"))
+
+        out = StringIO()
+        call_command("profile_summary", dir=str(self.directory), stdout=out)
+        self.assertIn("2 profiled requests", out.getvalue())
+        self.assertIn("Hot functions:", out.getvalue())
+
+        out = StringIO()
+        call_command(
+            "profile_summary", dir=str(self.directory), view="contact_form", stdout=out
+        )
+        self.assertIn("1 profiled requests", out.getvalue())
+
+    def test_profile_summary_without_dumps(self):
+        """
+        Test that summarizing an empty directory fails cleanly.
+        """
+        with self.assertRaises(CommandError):
+            call_command("profile_summary", dir=str(self.directory), stdout=StringIO())
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from blog.models import Article
+
+
+class PublicProfileTest(TestCase):
+    """
+    Test cases for the cookie-free public serving profile.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+        )
+        self.article = Article.objects.create(
+            title="TestArticleOnline",
+            content="Test content",
+            author=self.user,
+        )
+
+    def assertPublic(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.cookies), 0)
+        self.assertNotIn("Cookie", response.headers.get("Vary", ""))
+        self.assertIn("public", response.headers["Cache-Control"])
+        self.assertIn("max-age=", response.headers["Cache-Control"])
+        self.assertTrue(response.headers["ETag"].startswith('"'))
+
+    def test_article_list_is_public(self):
+        """
+        Test that the article list is served without cookies and is cacheable.
+        """
+        self.assertPublic(self.client.get(reverse("article_list")))
+
+    def test_article_detail_is_public(self):
+        """
+        Test that the article detail is served without cookies and is cacheable.
+        """
+        self.assertPublic(
+            self.client.get(
+                reverse(
+                    "article_detail",
+                    kwargs={"slug": self.article.slug, "pk": self.article.pk},
+                )
+            )
+        )
+
+    def test_logged_in_users_get_the_public_profile(self):
+        """
+        Test that a session cookie does not make article pages private.
+        """
+        self.client.login(username="testuser", password="testpassword")
+        self.assertPublic(self.client.get(reverse("article_list")))
+
+    def test_etag_revalidation(self):
+        """
+        Test that a matching If-None-Match is answered with 304.
+        """
+        response = self.client.get(reverse("article_list"))
+        response = self.client.get(
+            reverse("article_list"), HTTP_IF_NONE_MATCH=response.headers["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_contact_form_keeps_csrf_protection(self):
+        """
+        Test that the contact form still runs the full middleware stack.
+        """
+        response = self.client.get(reverse("contact_form"))
+        self.assertIn("csrftoken", response.cookies)
+        self.assertNotIn("public", response.headers.get("Cache-Control", ""))
+
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.post(
+            reverse("contact_form"),
+            {"email": "test@example.com", "name": "Test", "content": "Test"},
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_keeps_authentication(self):
+        """
+        Test that the admin still requires a login.
+        """
+        response = self.client.get(reverse("admin:blog_article_changelist"))
+        self.assertEqual(response.status_code, 302)
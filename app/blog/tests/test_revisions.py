@@ -0,0 +1,192 @@
+import random
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from blog.models import REVISION_SNAPSHOT_INTERVAL, Article, ArticleRevision
+from blog.revisions import decode_delta, encode_delta, encode_snapshot, unified_diff
+from blog.seeding import WORDS
+
+
+def paragraphs(count, marker=""):
+    rng = random.Random(count)
+    texts = [" ".join(rng.choices(WORDS, k=40)) for _ in range(count)]
+    texts[count // 2] += marker
+    return "\n\n".join(texts)
+
+
+class RevisionFormatTest(SimpleTestCase):
+    """
+    Test cases for the revision storage format.
+    """
+
+    def test_delta_round_trip(self):
+        """
+        Test that a delta rebuilds the new text from the old one.
+        """
+        pairs = [
+            (paragraphs(50), paragraphs(50, " (edited)")),
+            ("", "First line\nSecond line"),
+            ("No newline", "No newline\n"),
+            ("Removed\nKept\n", "Kept\n"),
+        ]
+        for old, new in pairs:
+            self.assertEqual(decode_delta(old, encode_delta(old, new)), new)
+
+    def test_delta_of_small_edit_is_small(self):
+        """
+        Test that a one-paragraph edit of a long text is stored in a fraction
+        of the space of a copy.
+        """
+        old, new = paragraphs(200), paragraphs(200, " (edited)")
+        self.assertLess(len(encode_delta(old, new)), len(encode_snapshot(new)) // 20)
+
+    def test_unified_diff(self):
+        """
+        Test that the diff lines are classified.
+        """
+        lines = list(unified_diff("a\nb\n", "a\nc\n", "old", "new"))
+        self.assertEqual(
+            lines,
+            [
+                ("header", "--- old"),
+                ("header", "+++ new"),
+                ("hunk", "@@ -1,2 +1,2 @@"),
+                ("context", " a"),
+                ("removed", "-b"),
+                ("added", "+c"),
+            ],
+        )
+
+
+class ArticleRevisionTest(TestCase):
+    """
+    Test cases for recording and rebuilding article revisions.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+        )
+        self.article = Article.objects.create(
+            title="Revised Article", content=paragraphs(30), author=self.user
+        )
+
+    def test_first_revision_is_a_snapshot(self):
+        """
+        Test that creating an article records a snapshot of it.
+        """
+        revision = self.article.revisions.get()
+        self.assertEqual(revision.number, 1)
+        self.assertTrue(revision.is_snapshot)
+        self.assertEqual(revision.get_content(), self.article.content)
+
+    def test_unchanged_saves_are_not_recorded(self):
+        """
+        Test that saves not changing the title or content record nothing.
+        """
+        self.article.is_online = False
+        self.article.save()
+        self.article.save(update_fields=["is_online"])
+        self.assertEqual(self.article.revisions.count(), 1)
+        self.article.title = "Renamed Article"
+        self.article.save()
+        self.assertEqual(
+            self.article.revisions.latest("number").title, "Renamed Article"
+        )
+
+    def test_edits_are_stored_as_deltas_with_periodic_snapshots(self):
+        """
+        Test that every revision is rebuilt, with a snapshot at least every
+        REVISION_SNAPSHOT_INTERVAL revisions.
+        """
+        contents = [self.article.content]
+        for number in range(2 * REVISION_SNAPSHOT_INTERVAL + 5):
+            self.article.content = paragraphs(30, f" edit {number}")
+            self.article.save()
+            contents.append(self.article.content)
+
+        revisions = list(self.article.revisions.order_by("number"))
+        self.assertEqual(len(revisions), len(contents))
+        snapshots = [revision.number for revision in revisions if revision.is_snapshot]
+        self.assertEqual(snapshots, [1, 21, 41])
+        delta = revisions[-1]
+        self.assertLess(len(delta.data), len(revisions[0].data) // 5)
+        for revision, content in zip(revisions, contents):
+            with self.assertNumQueries(0 if revision.is_snapshot else 1):
+                self.assertEqual(revision.get_content(), content)
+
+    def test_revisions_are_deleted_with_the_article(self):
+        """
+        Test that deleting an article deletes its revisions.
+        """
+        self.article.delete()
+        self.assertFalse(ArticleRevision.objects.exists())
+
+
+class ArticleRevisionAdminTest(TestCase):
+    """
+    Test cases for the article revision admin views.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.admin_user = User.objects.create_user(
+            username="admin",
+            password="adminpassword",
+            is_staff=True,
+            is_superuser=True,
+        )
+        self.client.login(username="admin", password="adminpassword")
+        self.article = Article.objects.create(
+            title="Revised Article",
+            content=paragraphs(10) + "\nOriginal line",
+            author=self.admin_user,
+        )
+        self.article.content = paragraphs(10) + "\nEdited line"
+        self.article.save()
+
+    def test_revision_list(self):
+        """
+        Test that the revisions are listed and linked from the change form.
+        """
+        url = reverse("admin:blog_article_revisions", args=[self.article.pk])
+        change = self.client.get(
+            reverse("admin:blog_article_change", args=[self.article.pk])
+        )
+        self.assertContains(change, url)
+        response = self.client.get(url)
+        self.assertContains(response, "snapshot")
+        self.assertContains(response, "delta")
+
+    def test_revision_diff(self):
+        """
+        Test that the diff view shows the changed lines.
+        """
+        response = self.client.get(
+            reverse("admin:blog_article_revision_diff", args=[self.article.pk, 2])
+        )
+        self.assertContains(response, '<div class="removed">-Original line</div>')
+        self.assertContains(response, '<div class="added">+Edited line</div>')
+        response = self.client.get(
+            reverse("admin:blog_article_revision_diff", args=[self.article.pk, 1])
+        )
+        self.assertContains(response, '<div class="added">+Original line</div>')
+
+    def test_unknown_revision(self):
+        """
+        Test that unknown revisions and articles return 404.
+        """
+        url = reverse("admin:blog_article_revision_diff", args=[self.article.pk, 3])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        url = reverse("admin:blog_article_revision_diff", args=[self.article.pk, 2])
+        self.assertEqual(self.client.get(url, {"against": "x"}).status_code, 404)
+        url = reverse("admin:blog_article_revisions", args=[0])
+        self.assertEqual(self.client.get(url).status_code, 404)
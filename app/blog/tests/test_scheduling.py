@@ -0,0 +1,145 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.caching import GENERATION_KEY, get_page_state, page_cache
+from blog.models import Article
+
+
+class ScheduledPublishingTest(TestCase):
+    """
+    Test cases for scheduled publishing and unpublishing of articles.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+        )
+        self.now = timezone.now()
+
+    def create_article(self, title, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Article.objects.create(
+                title=title, content="Test content", author=self.user, **kwargs
+            )
+
+    def test_online_filters_on_schedule(self):
+        """
+        Test that only articles within their schedule are visible.
+        """
+        self.create_article("Unscheduled")
+        self.create_article("Live", publish_at=self.now - timedelta(days=1))
+        self.create_article("Scheduled", publish_at=self.now + timedelta(days=1))
+        self.create_article("Expired", unpublish_at=self.now - timedelta(days=1))
+        self.create_article("Offline", is_online=False)
+        self.assertQuerySetEqual(
+            Article.objects.online(at=self.now).order_by("title"),
+            ["Live", "Unscheduled"],
+            transform=str,
+        )
+        self.assertIn(
+            "Scheduled",
+            [str(a) for a in Article.objects.online(at=self.now + timedelta(days=2))],
+        )
+
+    def test_next_visibility_change(self):
+        """
+        Test that the next change is the earliest future publish or unpublish time.
+        """
+        publish = self.now + timedelta(hours=2)
+        unpublish = self.now + timedelta(hours=1)
+        self.create_article("Scheduled", publish_at=publish)
+        self.create_article("Expiring", unpublish_at=unpublish)
+        self.create_article("Past", publish_at=self.now - timedelta(hours=1))
+        self.assertEqual(Article.objects.next_visibility_change(self.now), unpublish)
+        self.assertIsNone(
+            Article.objects.next_visibility_change(self.now + timedelta(hours=3))
+        )
+        self.assertEqual(get_page_state()[1], unpublish.timestamp())
+
+    def test_cached_list_expires_at_publish_time(self):
+        """
+        Test that a cached list page changes as soon as a scheduled article
+        goes live, without any article being saved.
+        """
+        url = reverse("article_list")
+        self.create_article(
+            "Scheduled Article", publish_at=timezone.now() + timedelta(seconds=0.5)
+        )
+        self.assertNotContains(self.client.get(url), "Scheduled Article")
+        generation = get_page_state()[0]
+        time.sleep(0.6)
+        self.assertContains(self.client.get(url), "Scheduled Article")
+        self.assertNotEqual(get_page_state()[0], generation)
+
+    def test_single_request_moves_past_a_change(self):
+        """
+        Test that while one request moves to a new generation after a change,
+        the others keep the current state without updating the articles.
+        """
+        article = self.create_article(
+            "Scheduled Article", publish_at=timezone.now() + timedelta(seconds=0.2)
+        )
+        state = get_page_state()
+        time.sleep(0.3)
+        lock_key = f"{GENERATION_KEY}:lock"
+        page_cache().add(lock_key, True)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_page_state(), state)
+        page_cache().delete(lock_key)
+        self.assertNotEqual(get_page_state(), state)
+        article.refresh_from_db()
+        self.assertTrue(article.is_listed)
+
+    def test_only_due_articles_are_synced(self):
+        """
+        Test that syncing reads only the articles whose visibility changes,
+        not offline or expired ones.
+        """
+        past = self.now - timedelta(hours=1)
+        self.create_article("Offline", is_online=False, publish_at=past)
+        self.create_article("Expired", unpublish_at=past)
+        self.create_article("Due", publish_at=self.now + timedelta(hours=1))
+        self.create_article("Ending", unpublish_at=self.now + timedelta(hours=1))
+        at = self.now + timedelta(hours=2)
+        self.assertEqual(
+            sorted(str(article) for article in Article.objects.due_for_sync(at)),
+            ["Due", "Ending"],
+        )
+        self.assertEqual(Article.objects.sync_listed(at), 2)
+        self.assertEqual(Article.objects.due_for_sync(at), [])
+
+    def test_max_age_ends_at_next_change(self):
+        """
+        Test that the public max-age does not extend past the next change.
+        """
+        self.create_article("Live")
+        self.create_article(
+            "Scheduled Article", publish_at=timezone.now() + timedelta(seconds=60)
+        )
+        response = self.client.get(reverse("article_list"))
+        max_age = int(response["Cache-Control"].split("max-age=")[1].split(",")[0])
+        self.assertLessEqual(max_age, 60)
+
+    def test_unpublish_must_follow_publish(self):
+        """
+        Test that an article cannot be unpublished before it is published.
+        """
+        article = Article(
+            title="Invalid",
+            content="Test content",
+            author=self.user,
+            publish_at=self.now,
+            unpublish_at=self.now - timedelta(hours=1),
+        )
+        with self.assertRaises(ValidationError):
+            article.full_clean()
@@ -0,0 +1,174 @@
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase
+
+from blog.models import (
+    COMMENT_PATH_STEP,
+    ArchiveMonth,
+    Article,
+    AuthorStats,
+    Comment,
+    ContactRequest,
+    Tag,
+    rebuild_listing_counts,
+)
+from blog.seeding import generate_articles, seed
+
+
+class GenerateArticlesTest(TestCase):
+    """
+    Test cases for the article row generator.
+    """
+
+    def test_generation_is_reproducible(self):
+        """
+        Test that the same seed produces the same rows.
+        """
+        now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        first = generate_articles(1, 20, 7, [1, 2], 0.5, 30, now)
+        second = generate_articles(1, 20, 7, [1, 2], 0.5, 30, now)
+        self.assertEqual(first, second)
+
+    def test_slugs_are_unique_and_valid(self):
+        """
+        Test that generated slugs are unique and fit the slug field.
+        """
+        now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        rows = generate_articles(1, 500, 0, [1], 0.5, 30, now)
+        slugs = [row[1] for row in rows]
+        self.assertEqual(len(set(slugs)), 500)
+        self.assertTrue(
+            all(
+                len(slug) <= Article._meta.get_field("slug").max_length
+                for slug in slugs
+            )
+        )
+
+
+class SeedTest(TestCase):
+    """
+    Test cases for seeding the database.
+    """
+
+    def test_seed_creates_rows(self):
+        """
+        Test that the requested number of rows is created.
+        """
+        seed(users=3, articles=50, contact_requests=10, online_ratio=0.5, batch_size=7)
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Article.objects.count(), 50)
+        self.assertEqual(ContactRequest.objects.count(), 10)
+        online = Article.objects.filter(is_online=True).count()
+        self.assertGreater(online, 0)
+        self.assertLess(online, 50)
+        self.assertEqual(Article.objects.listed().count(), online)
+        self.assertEqual(
+            ArchiveMonth.objects.aggregate(total=Sum("article_count"))["total"], online
+        )
+
+    def test_seed_twice_keeps_slugs_unique(self):
+        """
+        Test that seeding an already seeded database does not clash on slugs.
+        """
+        seed(users=1, articles=20)
+        seed(articles=20)
+        self.assertEqual(Article.objects.count(), 40)
+
+    def test_seed_tags(self):
+        """
+        Test that seeded tags are spread over the new articles and counted.
+        """
+        seed(users=1, articles=40, tags=5, online_ratio=0.5, batch_size=9)
+        self.assertEqual(Tag.objects.count(), 5)
+        links = Article.tags.through.objects.filter(article__is_listed__in=[True])
+        self.assertGreater(links.count(), 0)
+        self.assertEqual(
+            Tag.objects.aggregate(total=Sum("article_count"))["total"], links.count()
+        )
+
+    def test_seed_counts_match_rebuild(self):
+        """
+        Test that the listing counts added by repeated seeding match a rebuild,
+        and that the dropped indexes are restored.
+        """
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(
+                cursor, Article._meta.db_table
+            )
+        seed(users=2, articles=30, tags=4, online_ratio=0.5, batch_size=8)
+        seed(articles=25, tags=3, online_ratio=0.5, seed=1)
+
+        def counts():
+            return [
+                set(model.objects.filter(article_count__gt=0).values_list(*fields))
+                for model, fields in (
+                    (ArchiveMonth, ["year", "month", "article_count"]),
+                    (AuthorStats, ["user", "article_count"]),
+                    (Tag, ["pk", "article_count"]),
+                )
+            ]
+
+        seeded = counts()
+        rebuild_listing_counts()
+        self.assertEqual(seeded, counts())
+        with connection.cursor() as cursor:
+            self.assertEqual(
+                connection.introspection.get_constraints(
+                    cursor, Article._meta.db_table
+                ),
+                indexes,
+            )
+
+    def test_seed_comments(self):
+        """
+        Test that seeded comments form one discussion with consistent paths.
+        """
+        seed(users=1, articles=3, comments=60, online_ratio=1)
+        self.assertEqual(Comment.objects.count(), 60)
+        self.assertEqual(Comment.objects.values("article").distinct().count(), 1)
+        for comment in Comment.objects.filter(parent__isnull=False).select_related(
+            "parent"
+        ):
+            self.assertEqual(comment.path[:-COMMENT_PATH_STEP], comment.parent.path)
+        article = Comment.objects.first().article
+        page = article.comments.approved().thread(size=100)
+        self.assertEqual(len(page.object_list), 60)
+
+    def test_seeded_articles_are_served(self):
+        """
+        Test that seeded articles can be loaded through the models.
+        """
+        seed(users=1, articles=5, online_ratio=1)
+        article = Article.objects.first()
+        self.assertIsNotNone(article.publication_datetime)
+        self.assertTrue(article.content)
+
+
+class SeedCommandTest(TestCase):
+    """
+    Test cases for the seed management command.
+    """
+
+    def test_seed_command(self):
+        """
+        Test the seed command output.
+        """
+        out = StringIO()
+        call_command("seed", users=2, articles=10, contact_requests=4, stdout=out)
+        self.assertIn(
+            "Created 2 users, 10 articles, 0 tags, 0 comments and 4 contact requests",
+            out.getvalue(),
+        )
+
+    def test_seed_command_rejects_invalid_ratio(self):
+        """
+        Test that an online ratio outside [0, 1] is rejected.
+        """
+        with self.assertRaises(CommandError):
+            call_command("seed", articles=1, online_ratio=2, stdout=StringIO())
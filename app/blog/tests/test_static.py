@@ -0,0 +1,88 @@
+import gzip
+import os
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase, override_settings
+
+
+class StaticFilesTest(SimpleTestCase):
+    """
+    Test cases for the fingerprinted, pre-compressed static files.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Set up the necessary data for the tests.
+        """
+        super().setUpClass()
+        cls.root = cls.enterClassContext(tempfile.TemporaryDirectory())
+        cls.enterClassContext(override_settings(STATIC_ROOT=cls.root))
+        call_command("collectstatic", interactive=False, verbosity=0)
+        cls.hashed_name = staticfiles_storage.stored_name("css/styles.css")
+
+    def test_collectstatic_fingerprints_and_compresses(self):
+        """
+        Test that collectstatic writes a hashed copy and its gzipped version.
+        """
+        self.assertNotEqual(self.hashed_name, "css/styles.css")
+        path = os.path.join(self.root, self.hashed_name)
+        with open(path, "rb") as original, open(f"{path}.gz", "rb") as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), original.read())
+
+    def test_templates_reference_the_hashed_name(self):
+        """
+        Test that the static tag resolves to the fingerprinted file.
+        """
+        self.assertIn(self.hashed_name, render_to_string("base.html"))
+
+    def test_fingerprinted_file_is_immutable(self):
+        """
+        Test that fingerprinted files are served gzipped with immutable caching.
+        """
+        response = self.client.get(
+            f"/static/{self.hashed_name}", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+        self.assertIn("Accept-Encoding", response["Vary"])
+        with open(os.path.join(self.root, self.hashed_name), "rb") as original:
+            self.assertEqual(
+                gzip.decompress(b"".join(response.streaming_content)),
+                original.read(),
+            )
+        response.close()
+
+    def test_refused_gzip_is_not_sent(self):
+        """
+        Test that gzip is only sent to clients accepting it with a nonzero quality.
+        """
+        for accept_encoding in ("gzip;q=0", "x-gzip", "deflate, gzip;q=0.0"):
+            response = self.client.get(
+                f"/static/{self.hashed_name}", HTTP_ACCEPT_ENCODING=accept_encoding
+            )
+            self.assertNotIn("Content-Encoding", response.headers)
+            response.close()
+
+    def test_unhashed_file_is_not_immutable(self):
+        """
+        Test that files under their original name get a short max-age.
+        """
+        response = self.client.get("/static/css/styles.css")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertNotIn("immutable", response["Cache-Control"])
+        response.close()
+
+    def test_path_traversal_is_not_served(self):
+        """
+        Test that paths outside STATIC_ROOT are not served.
+        """
+        response = self.client.get("/static/../manage.py")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,244 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Article, Tag, rebuild_listing_counts
+
+
+class TagCountTest(TestCase):
+    """
+    Test cases for the materialized per-tag article counts.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+        )
+        self.tag = Tag.objects.create(name="Django Tips")
+        self.other = Tag.objects.create(name="Python")
+        self.article = Article.objects.create(
+            title="Tagged Article", content="Test content", author=self.user
+        )
+
+    def count(self, tag):
+        return Tag.objects.get(pk=tag.pk).article_count
+
+    def test_slug_is_generated(self):
+        """
+        Test that the slug is generated from the name.
+        """
+        self.assertEqual(self.tag.slug, "django-tips")
+
+    def test_adding_and_removing_tags(self):
+        """
+        Test that the counts follow tags added to and removed from an article.
+        """
+        self.article.tags.add(self.tag, self.other)
+        self.article.tags.add(self.tag)
+        self.assertEqual(self.count(self.tag), 1)
+        self.assertEqual(self.count(self.other), 1)
+        self.article.tags.remove(self.tag)
+        self.article.tags.remove(self.tag)
+        self.assertEqual(self.count(self.tag), 0)
+        self.article.tags.clear()
+        self.assertEqual(self.count(self.other), 0)
+
+    def test_reverse_side_changes(self):
+        """
+        Test that changes made from the tag side only count listed articles.
+        """
+        offline = Article.objects.create(
+            title="Offline", content="Test", author=self.user, is_online=False
+        )
+        self.tag.articles.add(self.article, offline)
+        self.assertEqual(self.count(self.tag), 1)
+        self.tag.articles.remove(offline)
+        self.assertEqual(self.count(self.tag), 1)
+        self.tag.articles.clear()
+        self.assertEqual(self.count(self.tag), 0)
+
+    def test_visibility_changes_and_deletion(self):
+        """
+        Test that the counts follow the visibility and deletion of tagged articles.
+        """
+        self.article.tags.add(self.tag)
+        self.article.is_online = False
+        self.article.save()
+        self.assertEqual(self.count(self.tag), 0)
+        self.article.tags.add(self.other)
+        self.assertEqual(self.count(self.other), 0)
+        self.article.is_online = True
+        self.article.save()
+        self.assertEqual(self.count(self.tag), 1)
+        self.assertEqual(self.count(self.other), 1)
+        self.article.delete()
+        self.assertEqual(self.count(self.tag), 0)
+        self.assertEqual(self.count(self.other), 0)
+
+    def test_bulk_add_tags(self):
+        """
+        Test that bulk tagging skips existing links and counts listed articles only.
+        """
+        Article.objects.create(
+            title="Offline", content="Test", author=self.user, is_online=False
+        )
+        self.article.tags.add(self.tag)
+        created = Article.objects.all().add_tags([self.tag, self.other])
+        self.assertEqual(created, 3)
+        self.assertEqual(self.count(self.tag), 1)
+        self.assertEqual(self.count(self.other), 1)
+        self.assertEqual(Article.tags.through.objects.count(), 4)
+
+    def test_rebuild(self):
+        """
+        Test that rebuilding recomputes the counts from the articles.
+        """
+        self.article.tags.add(self.tag)
+        Tag.objects.update(article_count=42)
+        rebuild_listing_counts()
+        self.assertEqual(self.count(self.tag), 1)
+        self.assertEqual(self.count(self.other), 0)
+
+    def test_cloud_weights(self):
+        """
+        Test that the cloud holds tags with articles, sorted by name and weighted.
+        """
+        self.article.tags.add(self.tag, self.other)
+        for index in range(3):
+            Article.objects.create(
+                title=f"Python {index}", content="Test", author=self.user
+            ).tags.add(self.other)
+        Tag.objects.create(name="Empty")
+        cloud = Tag.cloud(10)
+        self.assertEqual([tag["name"] for tag in cloud], ["Django Tips", "Python"])
+        self.assertEqual([tag["weight"] for tag in cloud], [1, 5])
+
+
+class TagViewsTest(TestCase):
+    """
+    Test cases for the tag pages, tag listing and bulk tagging action.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_superuser(
+                username="testuser",
+                password="testpassword",
+            )
+            self.tag = Tag.objects.create(name="Django")
+            self.article = Article.objects.create(
+                title="Tagged Article", content="Test content", author=self.user
+            )
+            self.article.tags.add(self.tag)
+
+    def add_tagged_articles(self, count):
+        for index in range(count):
+            article = Article.objects.create(
+                title=f"Article {index}", content="Test", author=self.user
+            )
+            article.tags.add(
+                *(Tag.objects.create(name=f"Tag {index}-{n}") for n in range(3))
+            )
+
+    def count_queries(self, path):
+        # The first request fills the page state; the second, through another
+        # cache key, renders the page.
+        self.client.get(path)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"{path}?page=1")
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_tag_page(self):
+        """
+        Test that the tag page lists the listed articles with the tag.
+        """
+        Article.objects.create(
+            title="Untagged Article", content="Test content", author=self.user
+        )
+        response = self.client.get(reverse("tag_detail", kwargs={"slug": "django"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Tagged Article")
+        self.assertNotContains(response, "Untagged Article")
+        self.assertEqual(response.context["paginator"].count, 1)
+
+    def test_unknown_or_empty_tag_is_404(self):
+        """
+        Test that tags without listed articles have no page.
+        """
+        Tag.objects.create(name="Empty")
+        for slug in ("empty", "missing"):
+            response = self.client.get(reverse("tag_detail", kwargs={"slug": slug}))
+            self.assertEqual(response.status_code, 404)
+
+    def test_tags_are_shown(self):
+        """
+        Test that the list and detail pages link the article's tags and the tag cloud.
+        """
+        url = reverse("tag_detail", kwargs={"slug": "django"})
+        response = self.client.get(reverse("article_list"))
+        self.assertContains(response, f'href="{url}"', count=2)
+        response = self.client.get(
+            reverse(
+                "article_detail",
+                kwargs={"slug": self.article.slug, "pk": self.article.pk},
+            )
+        )
+        self.assertContains(response, f'href="{url}"')
+
+    def test_tags_load_in_fixed_queries(self):
+        """
+        Test that the number of queries does not grow with the articles and tags listed.
+        """
+        paths = [
+            reverse("article_list"),
+            reverse("author_detail", kwargs={"username": "testuser"}),
+        ]
+        before = [self.count_queries(path) for path in paths]
+        self.add_tagged_articles(4)
+        caches["default"].clear()
+        after = [self.count_queries(path) for path in paths]
+        self.assertEqual(before, after)
+
+    def test_tag_cloud_is_cached_per_generation(self):
+        """
+        Test that the tag cloud is computed once per generation.
+        """
+        path = reverse("article_list")
+        self.client.get(path)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f"{path}?page=1")
+        cloud_sql = 'ORDER BY "blog_tag"."article_count" DESC'
+        self.assertFalse(any(cloud_sql in q["sql"] for q in queries))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.tags.add(Tag.objects.create(name="Python"))
+        response = self.client.get(path)
+        self.assertContains(response, "Python")
+
+    def test_admin_bulk_tagging(self):
+        """
+        Test that the admin action asks for tags and then adds them.
+        """
+        self.client.force_login(self.user)
+        other = Article.objects.create(title="Other", content="Test", author=self.user)
+        python = Tag.objects.create(name="Python")
+        url = reverse("admin:blog_article_changelist")
+        data = {"action": "add_tags", "_selected_action": [self.article.pk, other.pk]}
+        response = self.client.post(url, data)
+        self.assertContains(response, "2 selected articles")
+        response = self.client.post(
+            url, {**data, "apply": "1", "tags": [self.tag.pk, python.pk]}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Tag.objects.get(pk=self.tag.pk).article_count, 2)
+        self.assertEqual(Tag.objects.get(pk=python.pk).article_count, 2)
@@ -0,0 +1,116 @@
+import time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import TestCase
+from django.urls import reverse
+
+from blog.benchmarking import WSGIDriver
+from blog.models import Article
+from blog.warming import (
+    RateLimiter,
+    article_detail_paths,
+    article_list_paths,
+    warm_pages,
+)
+
+
+class RateLimiterTest(TestCase):
+    """
+    Test cases for the rate limiter spacing out warming requests.
+    """
+
+    def test_calls_are_spaced_out(self):
+        """
+        Test that calls beyond the rate wait for their turn.
+        """
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - start, 0.075)
+
+    def test_zero_rate_does_not_wait(self):
+        """
+        Test that a rate of 0 disables the limit.
+        """
+        limiter = RateLimiter(0)
+        start = time.monotonic()
+        for _ in range(100):
+            limiter.wait()
+        self.assertLess(time.monotonic() - start, 0.05)
+
+
+class WarmCacheTest(TestCase):
+    """
+    Test cases for warming the page cache.
+    """
+
+    def setUp(self):
+        """
+        Set up the necessary data for the tests.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.create_user(
+                username="testuser", password="testpassword"
+            )
+            self.articles = [
+                Article.objects.create(
+                    title=f"Warm Article {index}", content="Test content", author=user
+                )
+                for index in range(7)
+            ]
+            self.driver = WSGIDriver(get_wsgi_application(), host="testserver")
+
+    def test_paths(self):
+        """
+        Test that only existing list pages and the newest articles are chosen.
+        """
+        list_url = reverse("article_list")
+        self.assertEqual(article_list_paths(5), [list_url, f"{list_url}?page=2"])
+        newest = self.articles[-1]
+        self.assertEqual(
+            article_detail_paths(1),
+            [reverse("article_detail", kwargs={"slug": newest.slug, "pk": newest.pk})],
+        )
+
+    def test_pages_are_rendered_then_cached(self):
+        """
+        Test that warming renders the pages once, after which they are cache hits.
+        """
+        paths = article_list_paths(2) + article_detail_paths(3)
+        results = warm_pages(self.driver, paths, concurrency=1)
+        self.assertEqual([result["path"] for result in results], paths)
+        self.assertTrue(all(result["status"] == 200 for result in results))
+        self.assertTrue(all(result["cache"] == "miss" for result in results))
+        results = warm_pages(self.driver, paths, concurrency=1)
+        self.assertTrue(all(result["cache"] == "hit" for result in results))
+        self.assertTrue(all(result["queries"] == 0 for result in results))
+
+    def test_command(self):
+        """
+        Test that the command reports every warmed page.
+        """
+        out = StringIO()
+        call_command(
+            "warm_cache",
+            list_pages=1,
+            articles=2,
+            concurrency=1,
+            rate=0,
+            host="testserver",
+            stdout=out,
+        )
+        output = out.getvalue()
+        self.assertIn(reverse("article_list"), output)
+        self.assertIn("Warmed 3 pages (3 rendered, 0 errors)", output)
+
+    def test_command_validates_arguments(self):
+        """
+        Test that invalid concurrency is rejected.
+        """
+        with self.assertRaises(CommandError):
+            call_command("warm_cache", concurrency=0, stdout=StringIO())
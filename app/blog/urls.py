@@ -1,7 +1,15 @@
 from django.urls import path
 from django.views.generic import TemplateView
 
-from .views import ArticleListView, ArticleDetailView, ContactView
+from .views import (
+    ArticleArchiveView,
+    ArticleDetailView,
+    ArticleListView,
+    AuthorDetailView,
+    CommentView,
+    ContactView,
+    TagDetailView,
+)
 
 urlpatterns = [
     path("articles/", ArticleListView.as_view(), name="article_list"),
@@ -10,6 +18,32 @@ urlpatterns = [
         ArticleDetailView.as_view(),
         name="article_detail",
     ),
+    path(
+        "articles/<slug:slug>-<int:pk>/comment/",
+        CommentView.as_view(),
+        name="comment_form",
+    ),
+    path(
+        "articles/<slug:slug>-<int:pk>/comment/success/",
+        TemplateView.as_view(template_name="comment_success.html"),
+        name="comment_success",
+    ),
+    path(
+        "archive/<int:year>/",
+        ArticleArchiveView.as_view(),
+        name="article_archive_year",
+    ),
+    path(
+        "archive/<int:year>/<int:month>/",
+        ArticleArchiveView.as_view(),
+        name="article_archive_month",
+    ),
+    path(
+        "authors/<str:username>/",
+        AuthorDetailView.as_view(),
+        name="author_detail",
+    ),
+    path("tags/<slug:slug>/", TagDetailView.as_view(), name="tag_detail"),
     path("contact/", ContactView.as_view(), name="contact_form"),
     path(
         "contact/success/",
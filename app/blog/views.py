@@ -1,16 +1,51 @@
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import Sum
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from django.views import View
 from django.views.generic import ListView, DetailView
 from django.views.generic.edit import FormView
-from django.urls import reverse_lazy
-from django.core.mail import send_mail
-from .models import Article
-from .forms import ContactForm
-from app import settings
+from django.shortcuts import get_object_or_404
+from django.urls import reverse, reverse_lazy
+from .models import (
+    COMMENT_MAX_DEPTH,
+    COMMENT_PATH_STEP,
+    ArchiveMonth,
+    Article,
+    AuthorStats,
+    Comment,
+    Tag,
+)
+from .forms import CommentForm, ContactForm
+from . import notifications
+from .caching import CachedPageMixin
+from .pagination import CountedPaginator, CursorPaginator, InvalidCursor
+from .metrics import registry
+from django.conf import settings
 from threading import Thread
 
 
-class ArticleListView(ListView):
+# A comment path, as passed to start a page of comments at.
+COMMENT_PATH_PATTERN = re.compile(r"(?:[0-9a-z]{%d})+" % COMMENT_PATH_STEP)
+
+
+class GenerationValidatorsMixin:
+    """
+    Mixin for cached listing pages whose validators are derived from the page
+    generation, which changes on every article save, delete or scheduled
+    visibility change, so revalidating needs no query.
+    """
+
+    def get_validators(self, generation):
+        modified = datetime.fromtimestamp(generation / 1e9, tz=dt_timezone.utc)
+        return str(generation), modified
+
+
+class ArticleListView(GenerationValidatorsMixin, CachedPageMixin, ListView):
     """
-    View for displaying a list of articles.
+    View for displaying a list of articles. Rendered pages are served from the page cache.
 
     Attributes:
     - model (Article): The model used for retrieving the list of articles.
@@ -26,15 +61,30 @@ class ArticleListView(ListView):
 
     def get_queryset(self):
         """
-        Override the queryset to include only online articles.
+        Override the queryset to include only the listed articles, newest
+        first, with their authors and tags loaded in a fixed number of queries.
         """
 
-        return self.model.objects.filter(is_online=True)
+        return (
+            self.model.objects.listed()
+            .select_related("author")
+            .prefetch_related("tags")
+            .order_by("-publication_datetime", "-pk")
+        )
+
+    def get_paginator(self, queryset, per_page, orphans=0, **kwargs):
+        """
+        Take the number of articles from the materialized ArchiveMonth counts
+        instead of counting them.
+        """
+        return CountedPaginator(
+            queryset, per_page, ArchiveMonth.total(), orphans=orphans, **kwargs
+        )
 
 
-class ArticleDetailView(DetailView):
+class ArticleDetailView(CachedPageMixin, DetailView):
     """
-    View for displaying the details of a single article.
+    View for displaying the details of a single article. Rendered pages are served from the page cache.
 
     Attributes:
     - model (Article): The model used for retrieving the article details.
@@ -48,76 +98,244 @@ class ArticleDetailView(DetailView):
 
     def get_queryset(self):
         """
-        Override the queryset to include only online articles.
+        Override the queryset to include only the listed articles.
         """
-        return self.model.objects.filter(is_online=True)
+        return self.model.objects.listed()
 
+    def get_object(self, queryset=None):
+        """
+        Return the article with its author and tags.
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+        return super().get_object(
+            queryset.select_related("author").prefetch_related("tags")
+        )
 
-class ContactView(FormView):
+    def get_context_data(self, **kwargs):
+        """
+        Add a page of the approved comments, loaded with one query in thread order.
+        """
+        context = super().get_context_data(**kwargs)
+        start = self.request.GET.get("comments")
+        if start is not None and not COMMENT_PATH_PATTERN.fullmatch(start):
+            raise Http404("Invalid comment page.")
+        context["comment_page"] = self.object.comments.approved().thread(
+            start, getattr(settings, "COMMENTS_PER_PAGE", 100)
+        )
+        context["max_comment_depth"] = COMMENT_MAX_DEPTH - 1
+        return context
+
+    def get_validators(self, generation):
+        """
+        Derive the validators from the article's modification time. Before
+        rendering, it is read with a primary key lookup of that column only.
+        """
+        if hasattr(self, "object"):
+            modified = self.object.modified_datetime
+        else:
+            modified = (
+                self.get_queryset()
+                .filter(pk=self.kwargs["pk"])
+                .values_list("modified_datetime", flat=True)
+                .first()
+            )
+            if modified is None:
+                return None
+        return f"{modified.timestamp():.6f}", modified
+
+
+class ArticleArchiveView(GenerationValidatorsMixin, CachedPageMixin, ListView):
     """
-    A view for handling contact form submissions and sending emails asynchronously.
+    View listing the articles published in a year, or in a month when the URL
+    has one. Rendered pages are served from the page cache.
+
+    The articles are read with a range seek on the (is_listed,
+    publication_datetime) index, and the paginator takes the number of
+    articles from the materialized ArchiveMonth counts.
+
+    Attributes:
+    - template_name (str): The name of the template to be rendered.
+    - context_object_name (str): The name of the variable to use in the template for the list of articles.
+    - paginate_by (int): The number of articles to display per page.
     """
 
-    template_name = "contact_form.html"
-    form_class = ContactForm
-    success_url = reverse_lazy("contact_success.html")
+    template_name = "article_archive.html"
+    context_object_name = "articles"
+    paginate_by = 5
 
-    @staticmethod
-    def send_contact_email(name, email, content):
+    def get_period(self):
         """
-        Sends a contact email in a separate thread.
+        Returns the start and end of the requested period, in the current time zone.
 
-        Parameters:
-        - name (str): The name of the person making the contact request.
-        - email (str): The email address of the person making the contact request.
-        - content (str): The content or message of the contact request.
+        Raises:
+        Http404: If the year or month is out of range.
+        """
+        year, month = self.kwargs["year"], self.kwargs.get("month")
+        if not 1 <= year <= 9998 or (month is not None and not 1 <= month <= 12):
+            raise Http404("Invalid archive period.")
+        tz = timezone.get_current_timezone()
+        if month is None:
+            return (
+                datetime(year, 1, 1, tzinfo=tz),
+                datetime(year + 1, 1, 1, tzinfo=tz),
+            )
+        end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=tz)
+        return datetime(year, month, 1, tzinfo=tz), end
 
-        Returns:
-        None
+    def get_article_count(self):
+        months = ArchiveMonth.objects.filter(year=self.kwargs["year"])
+        if self.kwargs.get("month") is not None:
+            months = months.filter(month=self.kwargs["month"])
+        return months.aggregate(total=Sum("article_count"))["total"] or 0
+
+    def get_queryset(self):
+        """
+        Return the listed articles of the period, newest first.
         """
-        # Email subject
-        subject = "New Contact Request"
+        start, end = self.get_period()
+        return (
+            Article.objects.listed()
+            .filter(publication_datetime__gte=start, publication_datetime__lt=end)
+            .select_related("author")
+            .prefetch_related("tags")
+            .order_by("-publication_datetime", "-pk")
+        )
 
-        # Email message body with name, email, and content
-        message = f"Name: {name}\n Reply-To: {email}\nContent: {content}"
+    def get_paginator(self, queryset, per_page, orphans=0, **kwargs):
+        count = self.get_article_count()
+        if not count:
+            raise Http404("No articles in this period.")
+        return CountedPaginator(queryset, per_page, count, orphans=orphans, **kwargs)
 
-        try:
-            # Send email using Django's send_mail function
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.EMAIL_HOST_USER,
-                recipient_list=settings.RECIPIENT_EMAIL,
-                fail_silently=False,
-            )
-        except Exception as e:
-            # todo
-            #  Handle exceptions based on your requirements
-            print(f"Error sending email: {e}")
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        start, _ = self.get_period()
+        month = self.kwargs.get("month")
+        context["period"] = start.strftime("%B %Y") if month else str(start.year)
+        return context
+
+
+class AuthorDetailView(GenerationValidatorsMixin, CachedPageMixin, DetailView):
+    """
+    View listing the listed articles of an author, newest first. Rendered pages
+    are served from the page cache.
+
+    The articles are paginated with a cursor over the (author, is_listed,
+    publication_datetime) index, and the article count comes from the
+    materialized AuthorStats row, so no page counts articles.
 
-    def send_contact_email_threaded(self, sender_name, sender_email, message_content):
+    Attributes:
+    - template_name (str): The name of the template to be rendered.
+    - context_object_name (str): The name of the variable to use in the template for the author's stats.
+    - paginate_by (int): The number of articles to display per page.
+    """
+
+    template_name = "author_detail.html"
+    context_object_name = "author_stats"
+    paginate_by = 5
+
+    def get_object(self, queryset=None):
+        """
+        Return the stats of the requested author, who must have listed articles.
         """
-        Sends a contact email in a separate thread.
+        stats = (
+            AuthorStats.objects.select_related("user")
+            .filter(user__username=self.kwargs["username"], article_count__gt=0)
+            .first()
+        )
+        if stats is None:
+            raise Http404("No such author.")
+        return stats
 
-        Parameters:
-        - sender_name (str): The name of the person making the contact request.
-        - sender_email (str): The email address of the person making the contact request.
-        - message_content (str): The content or message of the contact request.
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        paginator = CursorPaginator(
+            Article.objects.listed()
+            .filter(author=self.object.user)
+            .prefetch_related("tags"),
+            self.paginate_by,
+            "publication_datetime",
+        )
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise Http404("Invalid page cursor.")
+        # Every article of the page has the same author.
+        for article in page.object_list:
+            article.author = self.object.user
+        context.update(author=self.object.user, articles=page.object_list, page=page)
+        return context
 
-        Returns:
-        None
+
+class TagDetailView(GenerationValidatorsMixin, CachedPageMixin, ListView):
+    """
+    View listing the listed articles with a tag, newest first. Rendered pages
+    are served from the page cache.
+
+    The paginator takes the number of articles from the materialized tag
+    count, and the tags of a page of articles are loaded with one query.
+
+    Attributes:
+    - template_name (str): The name of the template to be rendered.
+    - context_object_name (str): The name of the variable to use in the template for the list of articles.
+    - paginate_by (int): The number of articles to display per page.
+    """
+
+    template_name = "tag_detail.html"
+    context_object_name = "articles"
+    paginate_by = 5
+
+    def get_tag(self):
+        """
+        Return the requested tag, which must have listed articles.
+        """
+        if not hasattr(self, "tag"):
+            self.tag = Tag.objects.filter(
+                slug=self.kwargs["slug"], article_count__gt=0
+            ).first()
+            if self.tag is None:
+                raise Http404("No such tag.")
+        return self.tag
+
+    def get_queryset(self):
         """
-        thread = Thread(
-            target=self.send_contact_email,
-            args=(sender_name, sender_email, message_content),
+        Return the listed articles with the tag, newest first.
+        """
+        return (
+            Article.objects.listed()
+            .filter(tags=self.get_tag())
+            .select_related("author")
+            .prefetch_related("tags")
+            .order_by("-publication_datetime", "-pk")
         )
-        thread.start()
+
+    def get_paginator(self, queryset, per_page, orphans=0, **kwargs):
+        return CountedPaginator(
+            queryset, per_page, self.get_tag().article_count, orphans=orphans, **kwargs
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["tag"] = self.get_tag()
+        return context
+
+
+class ContactView(FormView):
+    """
+    A view for handling contact form submissions and sending emails asynchronously.
+    """
+
+    template_name = "contact_form.html"
+    form_class = ContactForm
+    success_url = reverse_lazy("contact_success.html")
 
     def form_valid(self, form):
         """
         Handles a valid form submission.
 
-        Saves the contact request to the database and sends a contact email in a separate thread.
+        Saves the contact request to the database and sends the notification
+        emails due, if any, in a separate thread (see `blog.notifications`).
 
         Parameters:
         - form (ContactForm): The validated contact form.
@@ -125,13 +343,72 @@ class ContactView(FormView):
         Returns:
         HttpResponse: The HTTP response for the successful form submission.
         """
-        # Save contact request to the database
-        contact_request = form.save()
+        messages, contact_request_ids = notifications.submit(form.save(commit=False))
+        if messages:
+            Thread(
+                target=notifications.deliver, args=(messages, contact_request_ids)
+            ).start()
+        return super().form_valid(form)
+
+
+class CommentView(FormView):
+    """
+    A view for posting comments on an article.
+
+    Like contact requests, comments are saved with a single insert and await
+    moderation in the admin (unless COMMENTS_REQUIRE_APPROVAL is False), so
+    posting one does not invalidate any cached page.
+    """
+
+    template_name = "comment_form.html"
+    form_class = CommentForm
+
+    def get_article(self):
+        """
+        Return the commented article, which must be visible.
+        """
+        if not hasattr(self, "article"):
+            self.article = get_object_or_404(
+                Article.objects.listed(), pk=self.kwargs["pk"], slug=self.kwargs["slug"]
+            )
+        return self.article
+
+    def get_initial(self):
+        return {"parent": self.request.GET.get("parent")}
 
-        # Send contact email in a separate thread
-        self.send_contact_email_threaded(
-            contact_request.name,
-            contact_request.email,
-            contact_request.content,
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["instance"] = Comment(
+            article=self.get_article(),
+            is_approved=not getattr(settings, "COMMENTS_REQUIRE_APPROVAL", True),
         )
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["article"] = self.get_article()
+        return context
+
+    def form_valid(self, form):
+        """
+        Saves the comment and redirects to the confirmation page.
+        """
+        form.save()
         return super().form_valid(form)
+
+    def get_success_url(self):
+        article = self.get_article()
+        return reverse(
+            "comment_success", kwargs={"slug": article.slug, "pk": article.pk}
+        )
+
+
+class MetricsView(View):
+    """
+    Exposes the aggregated request metrics in the Prometheus text format.
+    """
+
+    def get(self, request):
+        return HttpResponse(
+            registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
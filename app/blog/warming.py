@@ -0,0 +1,147 @@
+"""
+Page cache warming.
+
+Pages are requested through the project's WSGI application, like the
+benchmarks do, so that they are rendered and stored by the page cache exactly
+as for a visitor. Requests are spread over a bounded pool of threads and
+started no faster than a given rate, so that warming a cold cache does not
+itself overload the database.
+"""
+import math
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from django.urls import reverse
+
+from .models import ArchiveMonth, Article
+from .views import ArticleListView
+
+SERVER_TIMING_QUERIES = re.compile(r'db;desc="(\d+) queries"')
+SERVER_TIMING_CACHE = re.compile(r'cache;desc="(\d+) hits, (\d+) misses"')
+
+
+def article_list_paths(pages):
+    """
+    Returns the paths of the first `pages` article list pages that exist.
+    """
+    listed = ArchiveMonth.total()
+    last_page = max(1, math.ceil(listed / ArticleListView.paginate_by))
+    path = reverse("article_list")
+    return [path] + [
+        f"{path}?page={page}" for page in range(2, min(pages, last_page) + 1)
+    ]
+
+
+def article_detail_paths(count):
+    """
+    Returns the paths of the `count` most recently published listed articles.
+    """
+    articles = (
+        Article.objects.listed()
+        .order_by("-publication_datetime")
+        .values_list("slug", "pk")[:count]
+    )
+    return [
+        reverse("article_detail", kwargs={"slug": slug, "pk": pk})
+        for slug, pk in articles
+    ]
+
+
+class RateLimiter:
+    """
+    Spaces out calls to `wait` across threads so that at most `rate` of them
+    return per second.
+
+    Attributes:
+    - interval (float): The minimum time between two calls, in seconds; 0 disables the limit.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def warm_page(driver, path, headers=None):
+    """
+    Requests one page and reports how it was served.
+
+    Parameters:
+    - driver (WSGIDriver): The client used to issue the request.
+    - path (str): The request path.
+    - headers (dict): Extra WSGI environ entries sent with the request.
+
+    Returns:
+    dict: The path, status, duration in milliseconds, number of queries and
+    whether the page was rendered ("miss") or already cached ("hit").
+    """
+    start = time.perf_counter()
+    status, response_headers = driver.fetch(path, headers=headers)
+    elapsed = time.perf_counter() - start
+    timing = response_headers.get("Server-Timing", "")
+    queries = SERVER_TIMING_QUERIES.search(timing)
+    cache = SERVER_TIMING_CACHE.search(timing)
+    return {
+        "path": path,
+        "status": status,
+        "ms": elapsed * 1000,
+        "queries": int(queries.group(1)) if queries else None,
+        "cache": ("miss" if int(cache.group(2)) else "hit") if cache else None,
+    }
+
+
+def warm_pages(driver, paths, concurrency=4, rate=0, headers=None):
+    """
+    Requests every path once from `concurrency` threads, at most `rate`
+    requests per second.
+
+    Parameters:
+    - driver (WSGIDriver): The client used to issue the requests.
+    - paths (list): The request paths.
+    - concurrency (int): The number of concurrent requests.
+    - rate (float): The maximum number of requests started per second; 0 for no limit.
+    - headers (dict): Extra WSGI environ entries sent with every request.
+
+    Returns:
+    list: The `warm_page` results, in the order of `paths`.
+    """
+    pending = queue.SimpleQueue()
+    for index, path in enumerate(paths):
+        pending.put((index, path))
+    limiter = RateLimiter(rate)
+    results = [None] * len(paths)
+
+    def worker():
+        try:
+            while True:
+                try:
+                    index, path = pending.get_nowait()
+                except queue.Empty:
+                    return
+                limiter.wait()
+                results[index] = warm_page(driver, path, headers)
+        finally:
+            if concurrency > 1:
+                connections.close_all()
+
+    if concurrency == 1:
+        worker()
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(worker) for _ in range(concurrency)]:
+                future.result()
+    return results